@@ -1,5 +1,5 @@
-from flask import Flask, jsonify
-from flask_cors import CORS
+import argparse
+import json
 import os
 import sys
 from dotenv import load_dotenv
@@ -10,20 +10,55 @@ load_dotenv()
 # Add the src directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.routes.system_routes import system_bp
-from src.routes.process_routes import process_bp
-from src.routes.storage_routes import storage_bp
-from src.routes.network_routes import network_bp
-from src.routes.gpu_routes import gpu_bp
+def create_app(background=True):
+    """Build the Flask app; ``background=False`` skips the sampler, alerting and snapshots
+
+    The Werkzeug reloader runs this module twice, once in a watching parent
+    that never serves, so only the serving process should start the
+    background machinery.
+    """
+    # Flask, the blueprints and the collectors they use are only imported
+    # when a server is built, so `--once` and plain imports stay fast
+    from flask import Flask, jsonify
+    from flask_cors import CORS
+
+    from src.routes.system_routes import system_bp
+    from src.routes.process_routes import process_bp
+    from src.routes.storage_routes import storage_bp
+    from src.routes.network_routes import network_bp
+    from src.routes.gpu_routes import gpu_bp
+    from src.routes.alert_routes import alert_bp
+    from src.routes.collector_routes import collector_bp
+    from src.routes.debug_routes import debug_bp
+    from src.utils import instrumentation, rate_limit
+    from src.utils.adaptive import adaptive_scheduler
+    from src.utils.alerts import alert_engine
+    from src.utils.json_provider import RecordJSONProvider
+    from src.utils.sampler import sampler
+    from src.utils.shared_snapshot import shared_snapshot
+    from src.utils.snapshot import snapshot_store
 
-def create_app():
     app = Flask(__name__)
+    # Collectors keep compact records; dicts are only built while encoding
+    app.json = RecordJSONProvider(app)
     # Get allowed origins from env, default to '*'
     allowed_origins = os.getenv('CORS_ALLOWED_ORIGINS', '*')
     if allowed_origins == '*' or allowed_origins.strip() == '':
         CORS(app, supports_credentials=True)
     else:
         CORS(app, origins=[origin.strip() for origin in allowed_origins.split(',')], supports_credentials=True)
+
+    # Behind N reverse proxies, take the client address from X-Forwarded-For
+    # so rate limits and profiling see the client instead of the proxy
+    trusted_proxies = int(os.getenv('TRUSTED_PROXY_COUNT', 0))
+    if trusted_proxies:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=trusted_proxies, x_proto=trusted_proxies)
+
+    # Per-route latency histograms, JSON encoding time and ?profile=1
+    instrumentation.init_app(app)
+    # Per-client and global token buckets per endpoint cost class
+    rate_limit.init_app(app)
     
     # Register blueprints
     app.register_blueprint(system_bp, url_prefix='/api/system')
@@ -31,6 +66,34 @@ def create_app():
     app.register_blueprint(storage_bp, url_prefix='/api/storage')
     app.register_blueprint(network_bp, url_prefix='/api/network')
     app.register_blueprint(gpu_bp, url_prefix='/api/gpu')
+    app.register_blueprint(alert_bp, url_prefix='/api/alerts')
+    app.register_blueprint(collector_bp, url_prefix='/api/collectors')
+    app.register_blueprint(debug_bp, url_prefix='/api/debug')
+
+    if background:
+        # Alert rules are evaluated in-process on every background sample
+        alert_engine.configure_from_env()
+        alert_engine.attach(sampler)
+        # With SAMPLER_ADAPTIVE the interval follows activity, alerts and the CPU budget
+        if alert_engine.triggered not in adaptive_scheduler.conditions:
+            adaptive_scheduler.conditions.append(alert_engine.triggered)
+        adaptive_scheduler.attach(sampler)
+        if shared_snapshot.enabled:
+            # Multi-process mode: one process samples, persists and notifies; the
+            # others serve its published samples. Roles are taken on the first
+            # request, after any pre-fork
+            def become_writer():
+                alert_engine.notify = True
+                snapshot_store.attach(sampler)
+
+            alert_engine.notify = False
+            shared_snapshot.attach(sampler, become_writer)
+            app.before_request(shared_snapshot.join)
+        else:
+            # Restore history and counter baselines from SNAPSHOT_DIR and keep them persisted
+            snapshot_store.attach(sampler)
+            if alert_engine.rules or snapshot_store.enabled or os.getenv('SAMPLER_ENABLED', 'False').lower() in ['1', 'true', 'yes']:
+                sampler.start()
     
     @app.route('/api/health')
     def health_check():
@@ -50,14 +113,59 @@ def create_app():
                 'processes': '/api/processes',
                 'storage': '/api/storage',
                 'network': '/api/network',
-                'gpu': '/api/gpu'
+                'gpu': '/api/gpu',
+                'alerts': '/api/alerts',
+                'collectors': '/api/collectors',
+                'debug': '/api/debug/stats',
+                'stream': '/api/system/stream'
             }
         })
     
     return app
 
+def print_snapshot(collectors, output_format='json'):
+    """Collect one snapshot and print it, without starting a web server"""
+    from src.utils.collectors import registry
+    from src.utils.records import json_default
+    from src.utils.sampler import sampler
+    from src.utils.snapshot import snapshot_store
+    from src.utils.system_monitor import SystemMonitor
+
+    # Persisted counter baselines spare the first CPU/process reading its sleep
+    snapshot_store.attach(sampler)
+    snapshot = registry.collect(collectors)
+    snapshot['timestamp'] = SystemMonitor.get_timestamp()
+    indent = 2 if output_format == 'pretty' else None
+    print(json.dumps(snapshot, default=json_default, indent=indent))
+    snapshot_store.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='System monitoring API server')
+    parser.add_argument('--once', action='store_true',
+                        help='print one snapshot to stdout and exit instead of serving')
+    parser.add_argument('--format', choices=['json', 'pretty'], default='json',
+                        help='output format for --once (default: json)')
+    parser.add_argument('--collectors', default='system,cpu,memory,disk,network,gpu',
+                        help='comma-separated collectors included by --once')
+    args = parser.parse_args(argv)
+    if args.once:
+        from src.utils.collectors import registry
+
+        unknown = [name.strip() for name in args.collectors.split(',') if name.strip() and name.strip() not in registry.names()]
+        if unknown:
+            parser.error(f"unknown collectors: {', '.join(unknown)} (available: {', '.join(sorted(registry.names()))})")
+    return args
+
+
 if __name__ == '__main__':
-    app = create_app()
+    args = parse_args()
+    if args.once:
+        print_snapshot([name.strip() for name in args.collectors.split(',') if name.strip()], args.format)
+        sys.exit(0)
     port = int(os.getenv('PORT', 5000))
     debug = os.getenv('FLASK_DEBUG', 'True').lower() in ['1', 'true', 'yes']
-    app.run(host='0.0.0.0', port=port, debug=debug) 
\ No newline at end of file
+    # In debug mode the reloader parent only watches files; the child it
+    # spawns (WERKZEUG_RUN_MAIN=true) serves and runs the sampler
+    app = create_app(background=not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true')
+    app.run(host='0.0.0.0', port=port, debug=debug)
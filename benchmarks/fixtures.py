@@ -0,0 +1,224 @@
+"""Synthetic procfs/sysfs trees and stub GPU tools for benchmarks.
+
+``build_fixture`` writes a fake ``/proc`` with N processes, M mounted disks,
+K network interfaces and S sockets, a fake ``/sys`` with thermal and DRM
+entries, and a ``bin`` directory of stub ``nvidia-smi``/``rocm-smi``/
+``vcgencmd``/``lshw``/``glxinfo`` scripts. ``activate`` points psutil,
+``SystemMonitor`` and ``PATH`` at it.
+
+Things psutil reads through C calls rather than files (interface addresses
+and link stats) still come from the host.
+"""
+import os
+import shutil
+import stat
+import tempfile
+import time
+from typing import Dict, Optional
+
+import psutil
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+CPU_COUNT = 4
+
+STUB_TOOLS = {
+    'nvidia-smi': '''#!/bin/sh
+case "$*" in
+  *--query-compute-apps*)
+    echo "1000, 512"
+    echo "1001, 256"
+    ;;
+  *)
+    echo "NVIDIA Fake GPU 0, 8192, 1024, 7168, 55, 30"
+    echo "NVIDIA Fake GPU 1, 8192, 2048, 6144, 61, 75"
+    ;;
+esac
+''',
+    'rocm-smi': '''#!/bin/sh
+echo '{"card0": {"Card SKU": "FAKE-AMD", "GPU use (%)": "12", "Temperature (Sensor edge) (C)": "50.0"}}'
+''',
+    'vcgencmd': '''#!/bin/sh
+case "$1" in
+  get_mem) echo "$2=76M" ;;
+  measure_clock) echo "frequency(0)=500000000" ;;
+  measure_temp) echo "temp=45.0'C" ;;
+  get_throttled) echo "throttled=0x50000" ;;
+  measure_volts) echo "volt=0.8500V" ;;
+  get_config) echo "gpu_freq=500" ;;
+  *) exit 1 ;;
+esac
+''',
+    'lshw': '''#!/bin/sh
+echo '[{"id": "display", "class": "display", "product": "Fake Display Controller", "vendor": "Fake Vendor"}]'
+''',
+    'glxinfo': '''#!/bin/sh
+echo "OpenGL vendor string: Fake"
+echo "OpenGL renderer string: Fake Renderer"
+echo "OpenGL version string: 4.6"
+'''
+}
+
+
+def _write(path: str, content: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+def _cpu_line(name: str, scale: int) -> str:
+    return f'{name} {1000 * scale} {20 * scale} {300 * scale} {50000 * scale} {100 * scale} 0 {10 * scale} 0 0 0\n'
+
+
+def _write_system_files(proc: str, boot_time: int) -> None:
+    lines = [_cpu_line('cpu', CPU_COUNT)]
+    lines += [_cpu_line(f'cpu{index}', 1) for index in range(CPU_COUNT)]
+    lines += [
+        'intr 123456 0 0\n',
+        'ctxt 987654\n',
+        f'btime {boot_time}\n',
+        'processes 10000\n',
+        'procs_running 2\n',
+        'procs_blocked 0\n',
+        'softirq 4567 0 0\n'
+    ]
+    _write(os.path.join(proc, 'stat'), ''.join(lines))
+    _write(os.path.join(proc, 'meminfo'), ''.join(f'{key}: {value} kB\n' for key, value in (
+        ('MemTotal', 4096000), ('MemFree', 1024000), ('MemAvailable', 2048000),
+        ('Buffers', 102400), ('Cached', 819200), ('SwapCached', 0),
+        ('Active', 1228800), ('Inactive', 614400), ('Active(file)', 409600),
+        ('Inactive(file)', 409600), ('SwapTotal', 1048576), ('SwapFree', 1048576),
+        ('Dirty', 128), ('Writeback', 0), ('Shmem', 20480), ('Slab', 102400),
+        ('SReclaimable', 51200), ('SUnreclaim', 51200)
+    )))
+    _write(os.path.join(proc, 'vmstat'), 'pgfault 1000000\npgmajfault 1200\npswpin 0\npswpout 0\n')
+    _write(os.path.join(proc, 'loadavg'), '0.52 0.48 0.40 2/512 12345\n')
+    _write(os.path.join(proc, 'schedstat'), 'version 15\ntimestamp 4295000000\n' + ''.join(
+        f'cpu{index} 0 0 0 0 0 0 {5000000000 + index} {120000000 + index} 40000\n' for index in range(CPU_COUNT)))
+    for resource in ('cpu', 'memory', 'io'):
+        _write(os.path.join(proc, 'pressure', resource),
+               'some avg10=1.50 avg60=1.20 avg300=0.80 total=123456789\n'
+               'full avg10=0.00 avg60=0.00 avg300=0.00 total=0\n')
+    _write(os.path.join(proc, 'uptime'), f'{int(time.time()) - boot_time}.00 1000.00\n')
+    _write(os.path.join(proc, 'cpuinfo'), ''.join(
+        f'processor\t: {index}\nmodel name\t: Fake CPU\ncpu MHz\t\t: 1500.000\n\n' for index in range(CPU_COUNT)))
+
+
+def _write_processes(proc: str, count: int, boot_time: int) -> None:
+    uid = os.getuid()
+    started = int((time.time() - boot_time - 60) * CLOCK_TICKS)
+    for index in range(count):
+        pid = 1000 + index
+        base = os.path.join(proc, str(pid))
+        name = f'worker{index % 97}'
+        threads = 1 + index % 8
+        fields = ['S', '1', str(pid), str(pid), '0', '-1', '4194304', '100', '0', '0', '0',
+                  str(index % 500), str(index % 50), '0', '0', '20', '0', str(threads), '0',
+                  str(started + index), str(10485760 + index * 4096), str(256 + index % 1024)]
+        fields += ['0'] * 30
+        os.makedirs(os.path.join(base, 'fd'))
+        _write(os.path.join(base, 'stat'), f'{pid} ({name}) ' + ' '.join(fields) + '\n')
+        _write(os.path.join(base, 'task', str(pid), 'stat'), f'{pid} ({name}) ' + ' '.join(fields) + '\n')
+        _write(os.path.join(base, 'status'), (
+            f'Name:\t{name}\nState:\tS (sleeping)\nTgid:\t{pid}\nPid:\t{pid}\nPPid:\t1\n'
+            f'Uid:\t{uid}\t{uid}\t{uid}\t{uid}\nGid:\t0\t0\t0\t0\nThreads:\t{threads}\n'
+            'voluntary_ctxt_switches:\t10\nnonvoluntary_ctxt_switches:\t1\n'))
+        _write(os.path.join(base, 'statm'), f'{2560 + index} {256 + index % 1024} 100 10 0 500 0\n')
+        _write(os.path.join(base, 'cmdline'), f'{name}\0--fake\0')
+        _write(os.path.join(base, 'io'), (
+            f'rchar: {index * 1000}\nwchar: {index * 500}\nsyscr: {index}\nsyscw: {index}\n'
+            f'read_bytes: {index * 4096}\nwrite_bytes: {index * 2048}\ncancelled_write_bytes: 0\n'))
+
+
+def _write_mounts(root: str, proc: str, disks: int) -> None:
+    mounts = []
+    diskstats = []
+    for index in range(disks):
+        mountpoint = os.path.join(root, 'mnt', f'disk{index}')
+        os.makedirs(mountpoint)
+        mounts.append(f'/dev/fakedisk{index} {mountpoint} ext4 rw,relatime 0 0\n')
+        diskstats.append(f'   8 {index * 16} fakedisk{index} 100 0 2000 50 200 0 4000 80 0 100 130 0 0 0 0\n')
+    _write(os.path.join(proc, 'self', 'mounts'), ''.join(mounts))
+    _write(os.path.join(proc, 'filesystems'), 'nodev\tproc\nnodev\tsysfs\n\text4\n')
+    _write(os.path.join(proc, 'diskstats'), ''.join(diskstats))
+
+
+def _write_network(proc: str, interfaces: int, sockets: int) -> None:
+    header = ('Inter-|   Receive                                                |  Transmit\n'
+              ' face |bytes    packets errs drop fifo frame compressed multicast|'
+              'bytes    packets errs drop fifo colls carrier compressed\n')
+    lines = [f'  eth{index}: {index * 100000} {index * 100} 0 0 0 0 0 0 {index * 50000} {index * 50} 0 0 0 0 0 0\n'
+             for index in range(interfaces)]
+    _write(os.path.join(proc, 'net', 'dev'), header + ''.join(lines))
+
+    tcp_header = '  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode\n'
+    with open(os.path.join(proc, 'net', 'tcp'), 'w') as f:
+        f.write(tcp_header)
+        for index in range(sockets):
+            port = 1024 + index % 60000
+            state = '0A' if index % 10 == 0 else '01'
+            f.write(f'{index:4d}: 0100007F:{port:04X} 0100007F:1F90 {state} 00000000:00000000 '
+                    f'00:00000000 00000000     0        0 {100000 + index} 1 0000000000000000 100 0 0 10 0\n')
+    for name in ('tcp6', 'udp', 'udp6'):
+        _write(os.path.join(proc, 'net', name), tcp_header)
+    _write(os.path.join(proc, 'net', 'unix'), 'Num       RefCount Protocol Flags    Type St Inode Path\n')
+
+
+def _write_sysfs(sys_root: str) -> None:
+    _write(os.path.join(sys_root, 'class', 'thermal', 'thermal_zone0', 'temp'), '45000\n')
+    _write(os.path.join(sys_root, 'devices', 'platform', 'soc', 'soc:firmware', 'get_throttled'), '50000\n')
+    _write(os.path.join(sys_root, 'class', 'drm', 'card0', 'device', 'gpu_busy_percent'), '12\n')
+    for node in range(2):
+        _write(os.path.join(sys_root, 'devices', 'system', 'node', f'node{node}', 'meminfo'), ''.join(
+            f'Node {node} {key}: {value} kB\n' for key, value in (
+                ('MemTotal', 2048000), ('MemFree', 512000), ('MemUsed', 1536000), ('FilePages', 409600),
+                ('AnonPages', 614400), ('Slab', 51200), ('Dirty', 64), ('Writeback', 0))) +
+            f'Node {node} HugePages_Total: 0\nNode {node} HugePages_Free: 0\nNode {node} HugePages_Surp: 0\n')
+
+
+def _write_stub_tools(bin_dir: str) -> None:
+    os.makedirs(bin_dir, exist_ok=True)
+    for name, script in STUB_TOOLS.items():
+        path = os.path.join(bin_dir, name)
+        _write(path, script)
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+def build_fixture(processes: int = 100, disks: int = 4, interfaces: int = 2, sockets: int = 1000,
+                  root: Optional[str] = None) -> Dict[str, str]:
+    """Write a synthetic host under ``root`` (a new temp dir by default) and return its paths"""
+    root = root or tempfile.mkdtemp(prefix='remote-stats-bench-')
+    proc = os.path.join(root, 'proc')
+    sys_root = os.path.join(root, 'sys')
+    bin_dir = os.path.join(root, 'bin')
+    boot_time = int(time.time()) - 86400
+
+    _write_system_files(proc, boot_time)
+    _write_processes(proc, processes, boot_time)
+    _write_mounts(root, proc, disks)
+    _write_network(proc, interfaces, sockets)
+    _write_sysfs(sys_root)
+    _write_stub_tools(bin_dir)
+    return {'root': root, 'proc': proc, 'sys': sys_root, 'bin': bin_dir}
+
+
+def activate(fixture: Dict[str, str]) -> Dict[str, str]:
+    """Point psutil, SystemMonitor and PATH at a fixture; returns the previous settings"""
+    from src.utils.system_monitor import SystemMonitor
+
+    previous = {'proc': psutil.PROCFS_PATH, 'sys': SystemMonitor.SYSFS_PATH, 'path': os.environ.get('PATH', '')}
+    psutil.PROCFS_PATH = fixture['proc']
+    SystemMonitor.SYSFS_PATH = fixture['sys']
+    os.environ['PATH'] = fixture['bin'] + os.pathsep + previous['path']
+    return previous
+
+
+def deactivate(previous: Dict[str, str]) -> None:
+    from src.utils.system_monitor import SystemMonitor
+
+    psutil.PROCFS_PATH = previous['proc']
+    SystemMonitor.SYSFS_PATH = previous['sys']
+    os.environ['PATH'] = previous['path']
+
+
+def remove_fixture(fixture: Dict[str, str]) -> None:
+    shutil.rmtree(fixture['root'], ignore_errors=True)
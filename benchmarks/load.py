@@ -0,0 +1,372 @@
+"""Load test and soak run for the HTTP API with concurrent pollers and stream subscribers.
+
+The server is built with ``create_app()`` and served by a threaded Werkzeug
+server in a child process, so the monitor's own CPU and RSS can be measured
+separately from the load generator. Against it run:
+
+- ``--pollers`` dashboard-like clients, each requesting the next endpoint of
+  the mix every ``--poll-interval`` seconds (0 for back-to-back requests),
+- ``--subscribers`` clients holding ``/api/system/stream`` open.
+
+The report has client-side latency percentiles per endpoint, errors and
+rate-limited responses, stream event counts and gaps, the server's own
+route latency histograms (from ``/api/debug/stats``), and the monitor
+process's CPU and RSS over the run::
+
+    # Ten minutes, 50 dashboards and 5 streams against the real host
+    python -m benchmarks.load --pollers 50 --subscribers 5 --duration 600
+
+    # Fail when the monitor used more than 5% of a core or grew by 20 MiB
+    python -m benchmarks.load --duration 3600 --cpu-budget 5 --rss-growth-budget 20
+
+``--scenario`` serves a synthetic host from ``fixtures.py`` instead, and
+``--env`` sets server configuration (e.g. ``--env SAMPLER_ADAPTIVE=1``).
+"""
+import argparse
+import http.client
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psutil
+
+from benchmarks.run import ENDPOINTS, MIXED_WORKLOAD, SCENARIOS, git_commit, percentile, summarize
+
+SCHEMA_VERSION = 1
+MIXES = {'dashboard': MIXED_WORKLOAD, 'all': ENDPOINTS}
+# Seconds a client waits for a response (streams get a keepalive every 15 s)
+CLIENT_TIMEOUT = 30
+STREAM_TIMEOUT = 20
+
+
+def _serve(conn, env: Dict[str, str], scenario: Optional[str]) -> None:
+    """Child process: build the app and serve it until terminated"""
+    os.environ.update(env)
+    fixture = None
+    if scenario is not None:
+        from benchmarks.fixtures import activate, build_fixture
+        fixture = build_fixture(**SCENARIOS[scenario])
+        activate(fixture)
+
+    def stop(signum, frame):
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    # One access log line per request would dominate the server's own CPU time
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    try:
+        from werkzeug.serving import make_server
+        from app import create_app
+
+        server = make_server('127.0.0.1', 0, create_app(), threaded=True)
+        conn.send(server.server_port)
+        server.serve_forever()
+    finally:
+        if fixture is not None:
+            from benchmarks.fixtures import remove_fixture
+            remove_fixture(fixture)
+
+
+class LoadTest:
+    def __init__(self, args: argparse.Namespace, port: int, server: psutil.Process):
+        self.args = args
+        self.port = port
+        self.server = server
+        self.mix = MIXES[args.mix]
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.measure_from = self.started + args.warmup
+        self.latencies: Dict[str, List[float]] = {endpoint: [] for endpoint in self.mix}
+        self.errors: Dict[str, int] = {endpoint: 0 for endpoint in self.mix}
+        self.rate_limited = 0
+        self.streams: List[Dict[str, Any]] = []
+        self.resources: List[Dict[str, float]] = []
+        self._connections: List[http.client.HTTPConnection] = []
+
+    def request(self, path: str, timeout: float = CLIENT_TIMEOUT):
+        connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=timeout)
+        try:
+            connection.request('GET', path)
+            response = connection.getresponse()
+            return response.status, response.read()
+        finally:
+            connection.close()
+
+    def poller(self, offset: int) -> None:
+        index = offset
+        while not self.stop.is_set():
+            endpoint = self.mix[index % len(self.mix)]
+            index += 1
+            started = time.monotonic()
+            try:
+                status, _ = self.request(endpoint)
+                failed = status >= 500
+                limited = status == 429
+            except (OSError, http.client.HTTPException):
+                failed, limited = True, False
+            finished = time.monotonic()
+            if started >= self.measure_from:
+                with self.lock:
+                    self.latencies[endpoint].append(finished - started)
+                    self.errors[endpoint] += failed
+                    self.rate_limited += limited
+            self.stop.wait(max(0.0, self.args.poll_interval - (finished - started)))
+
+    def subscriber(self, index: int) -> None:
+        stats = {'subscriber': index, 'samples': 0, 'alerts': 0, 'max_gap_s': 0.0, 'disconnects': 0}
+        with self.lock:
+            self.streams.append(stats)
+        path = '/api/system/stream' + (f'?resolution={self.args.resolution}' if self.args.resolution else '')
+        while not self.stop.is_set():
+            connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=STREAM_TIMEOUT)
+            with self.lock:
+                self._connections.append(connection)
+            last = None
+            try:
+                connection.request('GET', path)
+                response = connection.getresponse()
+                while not self.stop.is_set():
+                    line = response.fp.readline()
+                    if not line:
+                        break
+                    if line.startswith(b'event: '):
+                        now = time.monotonic()
+                        event = line[7:].strip().decode()
+                        if now < self.measure_from:
+                            continue
+                        if event == 'sample':
+                            stats['samples'] += 1
+                            if last is not None:
+                                stats['max_gap_s'] = round(max(stats['max_gap_s'], now - last), 3)
+                            last = now
+                        elif event == 'alert':
+                            stats['alerts'] += 1
+            except (OSError, http.client.HTTPException, ValueError):
+                pass
+            finally:
+                connection.close()
+            if not self.stop.is_set():
+                stats['disconnects'] += 1
+                self.stop.wait(1)
+
+    def watch_resources(self) -> None:
+        """Record the server process's CPU percent (of one core) and RSS every interval"""
+        previous = None
+        next_progress = self.measure_from + self.args.progress
+        while not self.stop.wait(self.args.resource_interval):
+            try:
+                times = self.server.cpu_times()
+                rss = self.server.memory_info().rss
+            except psutil.Error:
+                return
+            now = time.monotonic()
+            cpu = times.user + times.system
+            if previous is not None and now >= self.measure_from:
+                with self.lock:
+                    self.resources.append({'time': now - self.started, 'rss': rss,
+                                           'cpu_percent': (cpu - previous[1]) / (now - previous[0]) * 100})
+            previous = (now, cpu)
+            if self.args.progress and self.resources and now >= next_progress:
+                next_progress += self.args.progress
+                self.print_progress()
+
+    def print_progress(self) -> None:
+        with self.lock:
+            requests = sum(len(values) for values in self.latencies.values())
+            errors = sum(self.errors.values())
+            latest = self.resources[-1]
+        print(f'  [{latest["time"]:7.0f}s] requests={requests} errors={errors} '
+              f'cpu={latest["cpu_percent"]:.1f}% rss={latest["rss"] / 1048576:.1f} MiB', flush=True)
+
+    def run(self) -> Dict[str, Any]:
+        threads = [threading.Thread(target=self.poller, args=(index,), daemon=True)
+                   for index in range(self.args.pollers)]
+        threads += [threading.Thread(target=self.subscriber, args=(index,), daemon=True)
+                    for index in range(self.args.subscribers)]
+        threads.append(threading.Thread(target=self.watch_resources, daemon=True))
+        for thread in threads:
+            thread.start()
+        self.stop.wait(self.args.warmup + self.args.duration)
+        self.stop.set()
+        with self.lock:
+            connections = list(self._connections)
+        for connection in connections:
+            # Unblocks subscribers waiting for the next event
+            if connection.sock is not None:
+                try:
+                    connection.sock.shutdown(2)
+                except OSError:
+                    pass
+        for thread in threads:
+            thread.join(timeout=CLIENT_TIMEOUT)
+        return self.report()
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = self.args.duration
+        endpoints = {}
+        for endpoint, durations in self.latencies.items():
+            stats = summarize(durations, self.errors[endpoint])
+            stats['p90_ms'] = round(percentile(durations, 0.9) * 1000, 3)
+            stats['p99.9_ms'] = round(percentile(durations, 0.999) * 1000, 3)
+            endpoints[endpoint] = stats
+        everything = [value for durations in self.latencies.values() for value in durations]
+        overall = summarize(everything, sum(self.errors.values()))
+        overall['p90_ms'] = round(percentile(everything, 0.9) * 1000, 3)
+        overall['p99.9_ms'] = round(percentile(everything, 0.999) * 1000, 3)
+        overall['throughput_rps'] = round(len(everything) / elapsed, 2) if elapsed else 0.0
+        overall['rate_limited'] = self.rate_limited
+
+        cpu = [entry['cpu_percent'] for entry in self.resources]
+        rss = [entry['rss'] for entry in self.resources]
+        monitor = {
+            'cpu_percent_mean': round(sum(cpu) / len(cpu), 2) if cpu else None,
+            'cpu_percent_p95': round(percentile(cpu, 0.95), 2) if cpu else None,
+            'cpu_percent_max': round(max(cpu), 2) if cpu else None,
+            'rss_start': rss[0] if rss else None,
+            'rss_end': rss[-1] if rss else None,
+            'rss_max': max(rss) if rss else None,
+            'rss_growth': rss[-1] - rss[0] if rss else None,
+            'timeline': [{'time': round(entry['time'], 1), 'cpu_percent': round(entry['cpu_percent'], 2),
+                          'rss': entry['rss']} for entry in self.resources]
+        }
+
+        try:
+            status, body = self.request('/api/debug/stats')
+            server = json.loads(body) if status == 200 else {}
+        except (OSError, http.client.HTTPException, ValueError):
+            server = {}
+        return {
+            'requests': overall,
+            'endpoints': endpoints,
+            'streams': self.streams,
+            'monitor': monitor,
+            'server': {
+                'routes': server.get('latency', {}).get('route', {}),
+                'counters': server.get('counters', {}),
+                'scheduler': server.get('scheduler')
+            }
+        }
+
+
+def check_budgets(result: Dict[str, Any], args: argparse.Namespace) -> List[str]:
+    """Return a line for each budget the run exceeded"""
+    failures = []
+    monitor = result['monitor']
+    if args.cpu_budget is not None and monitor['cpu_percent_mean'] is not None \
+            and monitor['cpu_percent_mean'] > args.cpu_budget:
+        failures.append(f'monitor CPU {monitor["cpu_percent_mean"]}% > budget {args.cpu_budget}%')
+    if args.rss_growth_budget is not None and monitor['rss_growth'] is not None \
+            and monitor['rss_growth'] > args.rss_growth_budget * 1048576:
+        failures.append(f'monitor RSS grew {monitor["rss_growth"] / 1048576:.1f} MiB > budget {args.rss_growth_budget} MiB')
+    if args.p99_budget is not None and result['requests']['p99_ms'] > args.p99_budget:
+        failures.append(f'request p99 {result["requests"]["p99_ms"]} ms > budget {args.p99_budget} ms')
+    if args.max_errors is not None and result['requests']['errors'] > args.max_errors:
+        failures.append(f'{result["requests"]["errors"]} errors > allowed {args.max_errors}')
+    return failures
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    result = report['result']
+    print(f'\n== load {report["params"]}')
+    for endpoint, stats in result['endpoints'].items():
+        print(f'  {endpoint:36} p50 {stats["p50_ms"]:10.3f} ms  p99 {stats["p99_ms"]:10.3f} ms'
+              f'  n={stats["iterations"]}{"  errors=" + str(stats["errors"]) if stats["errors"] else ""}')
+    stats = result['requests']
+    print(f'  all requests: {stats["throughput_rps"]} req/s  p50 {stats["p50_ms"]} ms  p90 {stats["p90_ms"]} ms'
+          f'  p99 {stats["p99_ms"]} ms  p99.9 {stats["p99.9_ms"]} ms  errors={stats["errors"]}'
+          f'  rate_limited={stats["rate_limited"]}')
+    for stream in result['streams']:
+        print(f'  stream {stream["subscriber"]}: {stream["samples"]} samples, {stream["alerts"]} alerts,'
+              f' max gap {stream["max_gap_s"]} s, {stream["disconnects"]} disconnects')
+    monitor = result['monitor']
+    if monitor['cpu_percent_mean'] is not None:
+        print(f'  monitor CPU mean {monitor["cpu_percent_mean"]}%  p95 {monitor["cpu_percent_p95"]}%'
+              f'  max {monitor["cpu_percent_max"]}% (of one core)')
+        print(f'  monitor RSS start {monitor["rss_start"] / 1048576:.1f} MiB  end {monitor["rss_end"] / 1048576:.1f} MiB'
+              f'  max {monitor["rss_max"] / 1048576:.1f} MiB')
+    print(f'  server counters {result["server"]["counters"]}')
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Load-test the API with concurrent pollers and stream subscribers')
+    parser.add_argument('--pollers', type=int, default=20, help='concurrent polling clients')
+    parser.add_argument('--poll-interval', type=float, default=1.0,
+                        help='seconds between one poller\'s requests (0: back to back)')
+    parser.add_argument('--subscribers', type=int, default=2, help='concurrent /api/system/stream clients')
+    parser.add_argument('--resolution', help='?resolution= requested by stream subscribers, e.g. 250ms')
+    parser.add_argument('--mix', choices=sorted(MIXES), default='dashboard',
+                        help='endpoints polled in turn: a dashboard mix or every benchmarked endpoint')
+    parser.add_argument('--duration', type=float, default=60.0, help='seconds measured (a soak run: e.g. 3600)')
+    parser.add_argument('--warmup', type=float, default=5.0, help='seconds of load before measuring')
+    parser.add_argument('--resource-interval', type=float, default=1.0,
+                        help='seconds between CPU/RSS readings of the server process')
+    parser.add_argument('--progress', type=int, default=60, help='print a status line every N seconds (0: off)')
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), help='serve this synthetic host instead of the real one')
+    parser.add_argument('--env', action='append', default=[], metavar='KEY=VALUE',
+                        help='environment for the server process, repeatable')
+    parser.add_argument('--cpu-budget', type=float, help='fail if the monitor\'s mean CPU exceeds this percent of one core')
+    parser.add_argument('--rss-growth-budget', type=float, help='fail if the monitor\'s RSS grows by more MiB than this')
+    parser.add_argument('--p99-budget', type=float, help='fail if the overall request p99 exceeds this many ms')
+    parser.add_argument('--max-errors', type=int, help='fail if more requests than this fail')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    args = parser.parse_args(argv)
+
+    env = {}
+    for item in args.env:
+        key, separator, value = item.partition('=')
+        if not separator:
+            parser.error(f'--env expects KEY=VALUE, got {item!r}')
+        env[key] = value
+
+    context = multiprocessing.get_context('spawn')
+    parent_conn, child_conn = context.Pipe()
+    process = context.Process(target=_serve, args=(child_conn, env, args.scenario), daemon=True)
+    process.start()
+    try:
+        if not parent_conn.poll(120):
+            print('server did not start', file=sys.stderr)
+            return 1
+        port = parent_conn.recv()
+        test = LoadTest(args, port, psutil.Process(process.pid))
+        result = test.run()
+    finally:
+        process.terminate()
+        process.join(timeout=10)
+
+    params = {name: getattr(args, name) for name in ('pollers', 'poll_interval', 'subscribers', 'resolution',
+                                                      'mix', 'duration', 'warmup', 'scenario')}
+    params['env'] = env
+    report = {
+        'schema': SCHEMA_VERSION,
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'params': params,
+        'result': result
+    }
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    failures = check_budgets(result, args)
+    for failure in failures:
+        print('OVER BUDGET ' + failure)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
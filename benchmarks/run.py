@@ -0,0 +1,350 @@
+"""Reproducible benchmarks for SystemMonitor and the HTTP API.
+
+Every scenario builds a synthetic host (see ``fixtures.py``), then measures:
+
+- each ``SystemMonitor`` method called directly,
+- each endpoint through the Flask test client,
+- throughput and latency with concurrent clients on a mixed workload,
+- RSS growth over a burst of requests.
+
+Results are written as JSON keyed by scenario/section/name so runs from
+different commits can be compared::
+
+    python -m benchmarks.run --output before.json
+    python -m benchmarks.run --output after.json --compare before.json
+
+``--compare`` exits non-zero when a gated scenario (``5k-processes`` and
+``100-mounts`` by default) regresses by more than ``--threshold``.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import re
+import resource
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import activate, build_fixture, deactivate, remove_fixture
+
+SCHEMA_VERSION = 1
+
+SCENARIOS = {
+    'small': {'processes': 100, 'disks': 4, 'interfaces': 2, 'sockets': 1000},
+    '5k-processes': {'processes': 5000, 'disks': 10, 'interfaces': 4, 'sockets': 10000},
+    '100-mounts': {'processes': 200, 'disks': 100, 'interfaces': 4, 'sockets': 1000},
+    '200k-sockets': {'processes': 200, 'disks': 4, 'interfaces': 16, 'sockets': 200000}
+}
+DEFAULT_SCENARIOS = ['small', '5k-processes', '100-mounts']
+GATE_SCENARIOS = ['5k-processes', '100-mounts']
+
+ENDPOINTS = [
+    '/api/health',
+    '/api/system/',
+    '/api/system/general',
+    '/api/system/cpu',
+    '/api/system/memory',
+    '/api/system/cpu/usage',
+    '/api/system/memory/usage',
+    '/api/system/memory/detailed',
+    '/api/system/pressure',
+    '/api/processes/',
+    '/api/processes/top?limit=10',
+    '/api/processes/1000',
+    '/api/processes/search?q=worker1',
+    '/api/storage/',
+    '/api/storage/partitions',
+    '/api/storage/io',
+    '/api/storage/usage',
+    '/api/network/',
+    '/api/network/interfaces',
+    '/api/network/io',
+    '/api/network/connections',
+    '/api/gpu/',
+    '/api/gpu/nvidia',
+    '/api/gpu/raspberry-pi',
+    '/api/gpu/messages',
+    '/api/collectors/',
+    '/api/alerts/'
+]
+
+# Dashboard-like mix used for the concurrency and memory runs
+MIXED_WORKLOAD = [
+    '/api/system/memory/usage',
+    '/api/system/',
+    '/api/storage/usage',
+    '/api/network/io',
+    '/api/processes/top?limit=10',
+    '/api/gpu/'
+]
+
+# Differences smaller than this are treated as noise when comparing runs
+NOISE_FLOOR_MS = 1.0
+
+
+def percentile(values: List[float], quantile: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(quantile * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize(durations: List[float], errors: int = 0) -> Dict[str, Any]:
+    return {
+        'iterations': len(durations),
+        'errors': errors,
+        'mean_ms': round(sum(durations) / len(durations) * 1000, 3) if durations else 0.0,
+        'p50_ms': round(percentile(durations, 0.5) * 1000, 3),
+        'p99_ms': round(percentile(durations, 0.99) * 1000, 3),
+        'max_ms': round(max(durations) * 1000, 3) if durations else 0.0
+    }
+
+
+def measure(func: Callable[[], Any], iterations: int, max_seconds: float, min_iterations: int = 3) -> Dict[str, Any]:
+    """Call ``func`` up to ``iterations`` times, stopping early after ``max_seconds``"""
+    durations = []
+    errors = 0
+    deadline = time.perf_counter() + max_seconds
+    for _ in range(iterations):
+        started = time.perf_counter()
+        try:
+            if func() is False:
+                errors += 1
+        except Exception:
+            errors += 1
+        durations.append(time.perf_counter() - started)
+        if len(durations) >= min_iterations and time.perf_counter() > deadline:
+            break
+    return summarize(durations, errors)
+
+
+def current_rss() -> int:
+    # Read the real /proc directly: psutil is pointed at the fixture
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def bench_monitor(args: argparse.Namespace) -> Dict[str, Any]:
+    from src.utils.system_monitor import SystemMonitor
+
+    methods = {
+        'get_cpu_info': lambda: SystemMonitor.get_cpu_info(interval=None),
+        'get_memory_info': SystemMonitor.get_memory_info,
+        'get_detailed_memory_info': SystemMonitor.get_detailed_memory_info,
+        'get_pressure_info': SystemMonitor.get_pressure_info,
+        'get_disk_info': SystemMonitor.get_disk_info,
+        'get_network_info': SystemMonitor.get_network_info,
+        'get_processes_info': SystemMonitor.get_processes_info,
+        'get_system_info': SystemMonitor.get_system_info,
+        'get_gpu_info': SystemMonitor.get_gpu_info,
+        'get_temperatures': SystemMonitor.get_temperatures
+    }
+    return {name: measure(method, args.iterations, args.max_seconds) for name, method in methods.items()}
+
+
+def bench_endpoints(app, args: argparse.Namespace) -> Dict[str, Any]:
+    client = app.test_client()
+    pattern = re.compile(args.endpoints) if args.endpoints else None
+    results = {}
+    for endpoint in ENDPOINTS:
+        if pattern is not None and not pattern.search(endpoint):
+            continue
+        results[endpoint] = measure(lambda: client.get(endpoint).status_code < 500,
+                                    args.iterations, args.max_seconds)
+    return results
+
+
+def bench_concurrency(app, args: argparse.Namespace) -> Dict[str, Any]:
+    durations: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def worker(offset: int) -> None:
+        client = app.test_client()
+        local, local_errors = [], 0
+        index = offset
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                if client.get(MIXED_WORKLOAD[index % len(MIXED_WORKLOAD)]).status_code >= 500:
+                    local_errors += 1
+            except Exception:
+                local_errors += 1
+            local.append(time.perf_counter() - started)
+            index += 1
+        with lock:
+            durations.extend(local)
+            errors[0] += local_errors
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    result = summarize(durations, errors[0])
+    result['clients'] = args.clients
+    result['throughput_rps'] = round(len(durations) / elapsed, 2) if elapsed else 0.0
+    return result
+
+
+def bench_memory(app, args: argparse.Namespace) -> Dict[str, Any]:
+    client = app.test_client()
+    gc.collect()
+    before = current_rss()
+    for index in range(args.memory_requests):
+        client.get(MIXED_WORKLOAD[index % len(MIXED_WORKLOAD)])
+    gc.collect()
+    after = current_rss()
+    return {
+        'requests': args.memory_requests,
+        'rss_before': before,
+        'rss_after': after,
+        'rss_growth': after - before,
+        'max_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    }
+
+
+def run_scenario(name: str, args: argparse.Namespace) -> Dict[str, Any]:
+    from app import create_app
+    from src.utils.collectors import registry
+    from src.utils.instrumentation import metrics
+
+    params = SCENARIOS[name]
+    started = time.perf_counter()
+    fixture = build_fixture(**params)
+    build_seconds = time.perf_counter() - started
+    previous = activate(fixture)
+    try:
+        registry.reset()
+        metrics.reset()
+        app = create_app()
+        result = {'params': params, 'fixture_build_seconds': round(build_seconds, 3)}
+        result['monitor'] = bench_monitor(args)
+        result['endpoints'] = bench_endpoints(app, args)
+        if args.clients > 0 and args.duration > 0:
+            result['concurrency'] = bench_concurrency(app, args)
+        if args.memory_requests > 0:
+            result['memory'] = bench_memory(app, args)
+        result['counters'] = metrics.snapshot()['counters']
+        return result
+    finally:
+        deactivate(previous)
+        if not args.keep_fixtures:
+            remove_fixture(fixture)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float, gate: List[str]) -> List[str]:
+    """Print a comparison and return the regressions found in gated scenarios"""
+    regressions = []
+    for scenario, result in current['scenarios'].items():
+        old = baseline.get('scenarios', {}).get(scenario)
+        if old is None:
+            continue
+        for section in ('monitor', 'endpoints'):
+            for name, stats in result.get(section, {}).items():
+                previous = old.get(section, {}).get(name)
+                if not previous:
+                    continue
+                for key in ('p50_ms', 'p99_ms'):
+                    before, after = previous[key], stats[key]
+                    if after - before <= NOISE_FLOOR_MS or before <= 0:
+                        continue
+                    change = after / before - 1
+                    if change > threshold:
+                        line = f'{scenario} {section} {name} {key}: {before:.3f} -> {after:.3f} ms (+{change:.0%})'
+                        print('REGRESSION ' + line if scenario in gate else 'slower     ' + line)
+                        if scenario in gate:
+                            regressions.append(line)
+        before_rps = old.get('concurrency', {}).get('throughput_rps')
+        after_rps = result.get('concurrency', {}).get('throughput_rps')
+        if before_rps and after_rps and after_rps < before_rps * (1 - threshold):
+            line = f'{scenario} concurrency throughput_rps: {before_rps} -> {after_rps}'
+            print('REGRESSION ' + line if scenario in gate else 'slower     ' + line)
+            if scenario in gate:
+                regressions.append(line)
+    return regressions
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    for scenario, result in report['scenarios'].items():
+        print(f'\n== {scenario} {result["params"]}')
+        for section in ('monitor', 'endpoints'):
+            for name, stats in result[section].items():
+                print(f'  {section:9} {name:36} p50 {stats["p50_ms"]:10.3f} ms  p99 {stats["p99_ms"]:10.3f} ms'
+                      f'  n={stats["iterations"]}{"  errors=" + str(stats["errors"]) if stats["errors"] else ""}')
+        if 'concurrency' in result:
+            stats = result['concurrency']
+            print(f'  concurrency {stats["clients"]} clients: {stats["throughput_rps"]} req/s'
+                  f'  p50 {stats["p50_ms"]} ms  p99 {stats["p99_ms"]} ms  errors={stats["errors"]}')
+        if 'memory' in result:
+            print(f'  memory growth over {result["memory"]["requests"]} requests: {result["memory"]["rss_growth"]} bytes')
+        print(f'  counters {result["counters"]}')
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark SystemMonitor and the API against synthetic hosts')
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help=f'scenario to run, repeatable (default: {", ".join(DEFAULT_SCENARIOS)})')
+    parser.add_argument('--iterations', type=int, default=20, help='maximum iterations per measurement')
+    parser.add_argument('--max-seconds', type=float, default=5.0, help='time budget per measurement')
+    parser.add_argument('--endpoints', help='only benchmark endpoints matching this regex')
+    parser.add_argument('--clients', type=int, default=8, help='concurrent clients for the throughput run')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds for the throughput run')
+    parser.add_argument('--memory-requests', type=int, default=200, help='requests for the memory growth run')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    parser.add_argument('--compare', help='baseline JSON report to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown before failing, as a fraction')
+    parser.add_argument('--gate', default=','.join(GATE_SCENARIOS),
+                        help='comma-separated scenarios whose regressions fail the run')
+    parser.add_argument('--keep-fixtures', action='store_true', help='leave the synthetic trees on disk')
+    args = parser.parse_args(argv)
+
+    report = {
+        'schema': SCHEMA_VERSION,
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scenarios': {}
+    }
+    for scenario in args.scenario or DEFAULT_SCENARIOS:
+        report['scenarios'][scenario] = run_scenario(scenario, args)
+
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        gate = [scenario.strip() for scenario in args.gate.split(',') if scenario.strip()]
+        regressions = compare(report, baseline, args.threshold, gate)
+        if regressions:
+            print(f'\n{len(regressions)} regression(s) in gated scenarios')
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
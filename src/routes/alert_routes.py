@@ -0,0 +1,32 @@
+from flask import Blueprint, jsonify, request
+from src.utils.alerts import alert_engine
+from src.utils.sampler import sampler
+from src.utils.system_monitor import SystemMonitor
+
+alert_bp = Blueprint('alerts', __name__)
+
+@alert_bp.route('/')
+def get_alerts():
+    """Get active alerts and recent firing/resolved events"""
+    try:
+        limit = request.args.get('limit', 50, type=int)
+        return jsonify({
+            'active': alert_engine.active(),
+            'events': alert_engine.recent_events(limit),
+            'rules_count': len(alert_engine.rules),
+            'sampler_running': sampler.running,
+            'timestamp': SystemMonitor.get_timestamp()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@alert_bp.route('/rules')
+def get_alert_rules():
+    """Get the compiled alert rules"""
+    try:
+        return jsonify({
+            'rules': [rule.to_dict() for rule in alert_engine.rules],
+            'timestamp': SystemMonitor.get_timestamp()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
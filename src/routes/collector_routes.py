@@ -0,0 +1,18 @@
+from flask import Blueprint, jsonify
+from src.utils.collectors import registry
+from src.utils.system_monitor import SystemMonitor
+
+collector_bp = Blueprint('collectors', __name__)
+
+@collector_bp.route('/')
+def get_collectors():
+    """Get each collector's cost class, interval, last duration, error count and staleness"""
+    try:
+        collectors = registry.stats()
+        return jsonify({
+            'collectors': collectors,
+            'count': len(collectors),
+            'timestamp': SystemMonitor.get_timestamp()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
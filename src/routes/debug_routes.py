@@ -0,0 +1,27 @@
+from flask import Blueprint, Response, jsonify
+from src.utils.adaptive import adaptive_scheduler
+from src.utils.collectors import registry
+from src.utils.instrumentation import metrics
+from src.utils.system_monitor import SystemMonitor
+
+debug_bp = Blueprint('debug', __name__)
+
+@debug_bp.route('/stats')
+def get_debug_stats():
+    """Get latency histograms for routes, collectors, probes, sleeps and JSON encoding, and the sampler schedule"""
+    try:
+        stats = metrics.snapshot()
+        stats['collectors'] = registry.stats()
+        stats['scheduler'] = adaptive_scheduler.stats()
+        stats['timestamp'] = SystemMonitor.get_timestamp()
+        return jsonify(stats)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@debug_bp.route('/metrics')
+def get_metrics():
+    """Export counters and latency summaries in the Prometheus text format"""
+    try:
+        return Response(metrics.prometheus(), mimetype='text/plain; version=0.0.4')
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,4 +1,6 @@
 from flask import Blueprint, jsonify
+from src.utils.rate_limit import COST_EXPENSIVE, cost
+from src.utils.shared_snapshot import shared_snapshot
 from src.utils.system_monitor import SystemMonitor
 
 network_bp = Blueprint('network', __name__)
@@ -7,7 +9,7 @@ network_bp = Blueprint('network', __name__)
 def get_all_network_info():
     """Get all network information"""
     try:
-        return jsonify(SystemMonitor.get_network_info())
+        return jsonify(shared_snapshot.get('network', SystemMonitor.get_network_info))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -15,10 +17,10 @@ def get_all_network_info():
 def get_network_interfaces():
     """Get network interfaces information"""
     try:
-        network_info = SystemMonitor.get_network_info()
+        network_info = shared_snapshot.get('network', SystemMonitor.get_network_info)
         return jsonify({
             'interfaces': network_info['interfaces'],
-            'timestamp': SystemMonitor.get_all_system_info()['timestamp']
+            'timestamp': SystemMonitor.get_timestamp()
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -27,15 +29,16 @@ def get_network_interfaces():
 def get_network_io():
     """Get network I/O statistics"""
     try:
-        network_info = SystemMonitor.get_network_info()
+        network_info = shared_snapshot.get('network', SystemMonitor.get_network_info)
         return jsonify({
             'io_counters': network_info['io_counters'],
-            'timestamp': SystemMonitor.get_all_system_info()['timestamp']
+            'timestamp': SystemMonitor.get_timestamp()
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @network_bp.route('/connections')
+@cost(COST_EXPENSIVE)
 def get_network_connections():
     """Get active network connections"""
     try:
@@ -57,7 +60,7 @@ def get_network_connections():
         return jsonify({
             'connections': connection_list,
             'count': len(connection_list),
-            'timestamp': SystemMonitor.get_all_system_info()['timestamp']
+            'timestamp': SystemMonitor.get_timestamp()
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500 
\ No newline at end of file
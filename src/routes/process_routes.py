@@ -1,49 +1,73 @@
 from flask import Blueprint, jsonify, request
+from src.utils.rate_limit import COST_EXPENSIVE, COST_MODERATE, cost
+from src.utils.records import ProcessRecord
+from src.utils.shared_snapshot import shared_snapshot
 from src.utils.system_monitor import SystemMonitor
 
 process_bp = Blueprint('processes', __name__)
 
+# Sort keys accepted by /top?by=
+TOP_SORT_KEYS = {
+    'cpu': lambda record: record.cpu_percent or 0,
+    'memory': lambda record: record.memory_percent or 0,
+    'io_read': lambda record: record.read_rate or 0,
+    'io_write': lambda record: record.write_rate or 0,
+    'fds': lambda record: record.num_fds or 0,
+    'gpu_memory': lambda record: record.gpu_memory or 0,
+    'gpu': lambda record: record.gpu_utilization or 0
+}
+
+def _process_records():
+    # Shared snapshots hold the records' dict form
+    return shared_snapshot.get('processes', SystemMonitor.get_process_records,
+                               lambda values: [ProcessRecord.from_dict(value) for value in values])
+
 @process_bp.route('/')
+@cost(COST_EXPENSIVE)
 def get_all_processes():
     """Get all running processes"""
     try:
-        processes = SystemMonitor.get_processes_info()
+        processes = _process_records()
         return jsonify({
             'processes': processes,
             'count': len(processes),
-            'timestamp': SystemMonitor.get_all_system_info()['timestamp']
+            'timestamp': SystemMonitor.get_timestamp()
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @process_bp.route('/top')
+@cost(COST_EXPENSIVE)
 def get_top_processes():
-    """Get top processes by CPU and memory usage"""
+    """Get top processes by CPU and memory usage, or by one resource with ?by="""
     try:
         limit = request.args.get('limit', 10, type=int)
-        processes = SystemMonitor.get_processes_info()
-        
-        # Sort by CPU usage (use both cpu_percent and cpu_info.percent for compatibility)
-        top_cpu = sorted(processes, key=lambda x: max(
-            x.get('cpu_percent', 0), 
-            x.get('cpu_info', {}).get('percent', 0)
-        ), reverse=True)[:limit]
+        by = request.args.get('by')
+        if by is not None and by not in TOP_SORT_KEYS:
+            return jsonify({'error': f'Parameter "by" must be one of: {", ".join(TOP_SORT_KEYS)}'}), 400
+        processes = _process_records()
+
+        if by is not None:
+            return jsonify({
+                'by': by,
+                'processes': sorted(processes, key=TOP_SORT_KEYS[by], reverse=True)[:limit],
+                'timestamp': SystemMonitor.get_timestamp()
+            })
         
-        # Sort by memory usage (use both memory_percent and memory_info.percent for compatibility)
-        top_memory = sorted(processes, key=lambda x: max(
-            x.get('memory_percent', 0), 
-            x.get('memory_info', {}).get('percent', 0)
-        ), reverse=True)[:limit]
+        # Sort the compact records; only the top entries are turned into dicts
+        top_cpu = sorted(processes, key=TOP_SORT_KEYS['cpu'], reverse=True)[:limit]
+        top_memory = sorted(processes, key=TOP_SORT_KEYS['memory'], reverse=True)[:limit]
         
         return jsonify({
             'top_cpu': top_cpu,
             'top_memory': top_memory,
-            'timestamp': SystemMonitor.get_all_system_info()['timestamp']
+            'timestamp': SystemMonitor.get_timestamp()
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @process_bp.route('/<int:pid>')
+@cost(COST_MODERATE)
 def get_process_info(pid):
     """Get information about a specific process"""
     try:
@@ -117,6 +141,7 @@ def get_process_info(pid):
         return jsonify({'error': str(e)}), 500
 
 @process_bp.route('/search')
+@cost(COST_EXPENSIVE)
 def search_processes():
     """Search processes by name"""
     try:
@@ -124,17 +149,17 @@ def search_processes():
         if not query:
             return jsonify({'error': 'Query parameter "q" is required'}), 400
         
-        processes = SystemMonitor.get_processes_info()
+        processes = _process_records()
         filtered_processes = [
             proc for proc in processes 
-            if query in proc.get('name', '').lower()
+            if query in (proc.name or '').lower()
         ]
         
         return jsonify({
             'processes': filtered_processes,
             'count': len(filtered_processes),
             'query': query,
-            'timestamp': SystemMonitor.get_all_system_info()['timestamp']
+            'timestamp': SystemMonitor.get_timestamp()
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500 
\ No newline at end of file
@@ -1,45 +1,51 @@
 from flask import Blueprint, jsonify
+from src.utils.rate_limit import COST_MODERATE, cost
+from src.utils.shared_snapshot import shared_snapshot
 from src.utils.system_monitor import SystemMonitor
 
 storage_bp = Blueprint('storage', __name__)
 
 @storage_bp.route('/')
+@cost(COST_MODERATE)
 def get_all_storage_info():
     """Get all storage information"""
     try:
-        return jsonify(SystemMonitor.get_disk_info())
+        return jsonify(shared_snapshot.get('disk', SystemMonitor.get_disk_info))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @storage_bp.route('/partitions')
+@cost(COST_MODERATE)
 def get_partitions():
     """Get disk partitions information"""
     try:
-        disk_info = SystemMonitor.get_disk_info()
+        disk_info = shared_snapshot.get('disk', SystemMonitor.get_disk_info)
         return jsonify({
             'partitions': disk_info['partitions'],
-            'timestamp': SystemMonitor.get_all_system_info()['timestamp']
+            'timestamp': SystemMonitor.get_timestamp()
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @storage_bp.route('/io')
+@cost(COST_MODERATE)
 def get_disk_io():
     """Get disk I/O statistics"""
     try:
-        disk_info = SystemMonitor.get_disk_info()
+        disk_info = shared_snapshot.get('disk', SystemMonitor.get_disk_info)
         return jsonify({
             'io_counters': disk_info['io_counters'],
-            'timestamp': SystemMonitor.get_all_system_info()['timestamp']
+            'timestamp': SystemMonitor.get_timestamp()
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @storage_bp.route('/usage')
+@cost(COST_MODERATE)
 def get_disk_usage():
     """Get disk usage summary"""
     try:
-        disk_info = SystemMonitor.get_disk_info()
+        disk_info = shared_snapshot.get('disk', SystemMonitor.get_disk_info)
         partitions = disk_info['partitions']
         
         total_space = sum(part['total'] for part in partitions.values())
@@ -52,7 +58,7 @@ def get_disk_usage():
             'free_space': free_space,
             'usage_percent': (used_space / total_space * 100) if total_space > 0 else 0,
             'partitions_count': len(partitions),
-            'timestamp': SystemMonitor.get_all_system_info()['timestamp']
+            'timestamp': SystemMonitor.get_timestamp()
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500 
\ No newline at end of file
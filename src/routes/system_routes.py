@@ -1,9 +1,18 @@
-from flask import Blueprint, jsonify
+import json
+import queue
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from src.utils.adaptive import adaptive_scheduler, parse_duration
+from src.utils.collectors import registry
+from src.utils.rate_limit import COST_EXPENSIVE, COST_MODERATE, cost
+from src.utils.records import json_default
+from src.utils.sampler import sampler
+from src.utils.shared_snapshot import shared_snapshot
 from src.utils.system_monitor import SystemMonitor
 
 system_bp = Blueprint('system', __name__)
 
 @system_bp.route('/')
+@cost(COST_EXPENSIVE)
 def get_all_system_info():
     """Get all system information"""
     try:
@@ -15,15 +24,16 @@ def get_all_system_info():
 def get_general_system_info():
     """Get general system information"""
     try:
-        return jsonify(SystemMonitor.get_system_info())
+        return jsonify(shared_snapshot.get('system', SystemMonitor.get_system_info))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @system_bp.route('/cpu')
+@cost(COST_MODERATE)
 def get_cpu_info():
     """Get CPU information"""
     try:
-        return jsonify(SystemMonitor.get_cpu_info())
+        return jsonify(shared_snapshot.get('cpu', SystemMonitor.get_cpu_info))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -31,19 +41,29 @@ def get_cpu_info():
 def get_memory_info():
     """Get memory information"""
     try:
-        return jsonify(SystemMonitor.get_memory_info())
+        return jsonify(shared_snapshot.get('memory', SystemMonitor.get_memory_info))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@system_bp.route('/memory/detailed')
+def get_detailed_memory_info():
+    """Get extended memory breakdown, NUMA nodes and paging rates"""
+    try:
+        memory_info = shared_snapshot.get('memory_detailed', lambda: registry.collect_one('memory_detailed'))
+        return jsonify(dict(memory_info, timestamp=SystemMonitor.get_timestamp()))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @system_bp.route('/cpu/usage')
+@cost(COST_MODERATE)
 def get_cpu_usage():
     """Get current CPU usage"""
     try:
-        cpu_info = SystemMonitor.get_cpu_info()
+        cpu_info = shared_snapshot.get('cpu', SystemMonitor.get_cpu_info)
         return jsonify({
             'cpu_usage_percent': cpu_info['cpu_usage_percent'],
             'cpu_usage_per_core': cpu_info['cpu_usage_per_core'],
-            'timestamp': SystemMonitor.get_all_system_info()['timestamp']
+            'timestamp': SystemMonitor.get_timestamp()
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -52,13 +72,61 @@ def get_cpu_usage():
 def get_memory_usage():
     """Get current memory usage"""
     try:
-        memory_info = SystemMonitor.get_memory_info()
+        memory_info = shared_snapshot.get('memory', SystemMonitor.get_memory_info)
         return jsonify({
             'total': memory_info['total'],
             'used': memory_info['used'],
             'free': memory_info['free'],
             'percent': memory_info['percent'],
-            'timestamp': SystemMonitor.get_all_system_info()['timestamp']
+            'timestamp': SystemMonitor.get_timestamp()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500 
+
+@system_bp.route('/pressure')
+def get_pressure_info():
+    """Get pressure stall information, run queue length and scheduler delay with recent history"""
+    try:
+        limit = request.args.get('limit', 60, type=int)
+        # Through the registry so rates are taken over at least the collector interval
+        return jsonify({
+            'current': shared_snapshot.get('pressure', lambda: registry.collect_one('pressure')),
+            'history': sampler.recent('pressure', limit),
+            'timestamp': SystemMonitor.get_timestamp()
         })
     except Exception as e:
-        return jsonify({'error': str(e)}), 500 
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+@system_bp.route('/stream')
+@cost(COST_MODERATE)
+def stream_samples():
+    """Stream sampler samples and alert events as Server-Sent Events"""
+    resolution = request.args.get('resolution')
+    try:
+        resolution = parse_duration(resolution) if resolution else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    sampler.start()
+    subscriber = sampler.subscribe()
+    # Only honoured when the adaptive scheduler is enabled
+    token = adaptive_scheduler.request_resolution(resolution) if resolution else None
+
+    def generate():
+        try:
+            latest = sampler.latest()
+            if latest is not None:
+                yield f'event: sample\ndata: {json.dumps(latest, default=json_default)}\n\n'
+            while True:
+                try:
+                    event, data = subscriber.get(timeout=15)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                yield f'event: {event}\ndata: {json.dumps(data, default=json_default)}\n\n'
+        finally:
+            sampler.unsubscribe(subscriber)
+            if token is not None:
+                adaptive_scheduler.release(token)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
@@ -0,0 +1,271 @@
+import itertools
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.utils.alerts import Rule
+from src.utils.collectors import COST_EXPENSIVE, registry
+from src.utils.instrumentation import metrics
+from src.utils.shared_snapshot import shared_snapshot
+
+# Weight of the newest tick in the smoothed sampling cost
+COST_SMOOTHING = 0.3
+# Share of the CPU budget the sampler keeps even when requests use the rest
+MIN_BUDGET_SHARE = 0.1
+
+_DURATION_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*(ms|s)?\s*$')
+
+
+def parse_duration(text: str) -> float:
+    """Parse ``250ms``, ``0.5s`` or plain seconds"""
+    match = _DURATION_RE.match(text)
+    if not match:
+        raise ValueError(f'Invalid duration: {text!r}')
+    return float(match.group(1)) * (0.001 if match.group(2) == 'ms' else 1)
+
+
+def parse_triggers(text: str) -> List[Tuple[Rule, float]]:
+    """Parse ``path=delta`` pairs, e.g. ``cpu.cpu_usage_percent=20,memory.percent=10``
+
+    Paths use the alert rule syntax, so ``interface[*].bytes_recv`` watches
+    every interface separately.
+    """
+    triggers = []
+    for part in text.split(','):
+        if not part.strip():
+            continue
+        path, _, delta = part.partition('=')
+        if not delta.strip():
+            raise ValueError(f'Invalid rate-of-change trigger: {part!r}')
+        triggers.append((Rule(f'{path.strip()} > 0'), float(delta)))
+    return triggers
+
+
+class AdaptiveScheduler:
+    """Chooses the sampler's next interval from activity, triggers and a CPU budget.
+
+    Modes, in order of precedence:
+
+    * ``boost``: a rate-of-change trigger or an alert condition fired within
+      the last ``SAMPLER_BOOST_SECONDS``; samples every
+      ``SAMPLER_FAST_INTERVAL`` and adds ``SAMPLER_BOOST_COLLECTORS``
+      (CPU and the top processes) to each sample. Only the cheap and
+      moderate ones speed up: ``top_processes`` is rebuilt every tick, but
+      from the ``processes`` scan, which stays on its own 10 s interval.
+    * ``high_resolution``: a stream client asked for a shorter interval than
+      ``SAMPLER_INTERVAL``; the boost collectors are refreshed at that rate,
+      with the same limit.
+    * ``idle``: nobody is subscribed, in this worker or (with a shared
+      snapshot) any other, and the watched values have moved by less than a
+      quarter of their trigger for ``SAMPLER_STABLE_SAMPLES`` samples; the
+      interval doubles every tick up to ``SAMPLER_MAX_INTERVAL``.
+    * ``normal``: ``SAMPLER_INTERVAL``.
+
+    Whatever the mode, the interval is stretched so the sampler's own CPU
+    time stays within ``SAMPLER_CPU_BUDGET`` percent of one core, minus what
+    the rest of the process (e.g. request handling) is already using. With a
+    shared snapshot it never exceeds half of ``SHARED_SNAPSHOT_MAX_AGE``, so
+    the other workers keep serving the shared sample instead of collecting.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv('SAMPLER_ADAPTIVE', 'False').lower() in ['1', 'true', 'yes']
+        self.fast_interval = float(os.getenv('SAMPLER_FAST_INTERVAL', 0.25))
+        self.max_interval = float(os.getenv('SAMPLER_MAX_INTERVAL', 30))
+        self.boost_seconds = float(os.getenv('SAMPLER_BOOST_SECONDS', 30))
+        self.boost_collectors = [name.strip() for name in os.getenv(
+            'SAMPLER_BOOST_COLLECTORS', 'cpu,top_processes').split(',') if name.strip()]
+        self.cpu_budget = float(os.getenv('SAMPLER_CPU_BUDGET', 5))
+        self.stable_samples = int(os.getenv('SAMPLER_STABLE_SAMPLES', 5))
+        self.triggers = parse_triggers(os.getenv(
+            'SAMPLER_CHANGE_TRIGGERS', 'cpu.cpu_usage_percent=20,memory.percent=10'))
+        # Callables that return True while sampling should be boosted (e.g. alert conditions)
+        self.conditions: List[Callable[[], bool]] = []
+        self.mode = 'normal'
+        self.reason: Optional[str] = None
+        self.interval: Optional[float] = None
+        self.throttled = False
+        self._sampler = None
+        self._lock = threading.Lock()
+        self._tokens = itertools.count(1)
+        self._requests: Dict[int, float] = {}
+        self._boost_until = 0.0
+        self._previous: Dict[str, float] = {}
+        self._stable = 0
+        self._cost: Optional[float] = None
+        self._usage = 0.0
+        self._clock: Optional[Tuple[float, float]] = None
+        # Collector intervals replaced while boosting, to restore afterwards
+        self._saved_intervals: Dict[str, float] = {}
+
+    def attach(self, sampler) -> None:
+        """Let this scheduler pick ``sampler``'s intervals (no-op unless ``SAMPLER_ADAPTIVE``)"""
+        if not self.enabled:
+            return
+        self._sampler = sampler
+        sampler.scheduler = self
+
+    def request_resolution(self, seconds: float) -> int:
+        """Ask for samples at least every ``seconds``; returns a token for ``release``"""
+        token = next(self._tokens)
+        with self._lock:
+            self._requests[token] = max(seconds, self.fast_interval)
+        if self._sampler is not None:
+            self._sampler.wake()
+        return token
+
+    def release(self, token: int) -> None:
+        with self._lock:
+            self._requests.pop(token, None)
+
+    def collectors(self, names: List[str]) -> List[str]:
+        """Collectors to include in the next sample"""
+        if self.mode not in ('boost', 'high_resolution'):
+            return names
+        return names + [name for name in self.boost_collectors if name not in names]
+
+    def next_interval(self, sampler, sample: Optional[Dict[str, Any]], cost: float) -> float:
+        """Seconds until the next tick, given the last sample and the CPU time it took"""
+        now = time.monotonic()
+        base = sampler.interval
+        reason = self._trigger(sample)
+        if reason is None and any(self._check(condition) for condition in self.conditions):
+            reason = 'alert'
+        if reason is not None:
+            if now >= self._boost_until:
+                metrics.increment('sampler_boosts')
+            self._boost_until = now + self.boost_seconds
+            self.reason = reason
+
+        with self._lock:
+            requested = min(self._requests.values(), default=None)
+        if now < self._boost_until:
+            mode, interval = 'boost', self.fast_interval
+        elif requested is not None and requested < base:
+            mode, interval = 'high_resolution', requested
+        elif not self._subscribed(sampler) and self._stable >= self.stable_samples:
+            mode = 'idle'
+            interval = min(self._longest_interval(), max(base, 2 * (self.interval or base)))
+        else:
+            mode, interval = 'normal', base
+        if requested is not None:
+            interval = min(interval, requested)
+        if mode != 'boost':
+            self.reason = None
+
+        interval = self._apply_budget(now, interval, cost)
+        self._set_collector_intervals(interval if mode in ('boost', 'high_resolution') else None)
+        self.mode = mode
+        self.interval = interval
+        return interval
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            requests = sorted(self._requests.values())
+        return {
+            'enabled': self.enabled,
+            'mode': self.mode,
+            'reason': self.reason,
+            'interval': self.interval,
+            'boost_remaining': round(max(0.0, self._boost_until - time.monotonic()), 3),
+            'resolution_requests': requests,
+            'stable_samples': self._stable,
+            'cpu_budget_percent': self.cpu_budget,
+            'cpu_usage_percent': round(self._usage * 100, 2),
+            'sample_cpu_ms': round(self._cost * 1000, 3) if self._cost is not None else None,
+            'throttled': self.throttled
+        }
+
+    def _trigger(self, sample: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Compare the watched values with the previous sample; 'rate_of_change' if one jumped"""
+        if sample is None:
+            return None
+        current = {}
+        fired = False
+        stable = True
+        for rule, delta in self.triggers:
+            for target, value in rule.resolve(sample):
+                key = f'{rule.path}:{target}'
+                current[key] = value
+                previous = self._previous.get(key)
+                if previous is None:
+                    continue
+                change = abs(value - previous)
+                if change >= delta:
+                    fired = True
+                if change >= delta / 4:
+                    stable = False
+        self._previous = current
+        self._stable = self._stable + 1 if stable and not fired else 0
+        return 'rate_of_change' if fired else None
+
+    def _longest_interval(self) -> float:
+        if shared_snapshot.enabled:
+            # Readers fall back to collecting locally once the shared sample is max_age old
+            return max(self.fast_interval, min(self.max_interval, shared_snapshot.max_age / 2))
+        return self.max_interval
+
+    @staticmethod
+    def _subscribed(sampler) -> bool:
+        return bool(sampler.subscriber_count) or shared_snapshot.remote_subscribers()
+
+    @staticmethod
+    def _check(condition: Callable[[], bool]) -> bool:
+        try:
+            return bool(condition())
+        except Exception:
+            return False
+
+    def _apply_budget(self, now: float, interval: float, cost: float) -> float:
+        """Stretch ``interval`` so sampling stays within the CPU budget"""
+        self._cost = cost if self._cost is None else self._cost + COST_SMOOTHING * (cost - self._cost)
+        cpu_time = time.process_time()
+        other = 0.0
+        if self._clock is not None:
+            elapsed = now - self._clock[0]
+            if elapsed > 0:
+                used = cpu_time - self._clock[1]
+                self._usage = used / elapsed
+                other = max(0.0, used - cost) / elapsed
+        self._clock = (now, cpu_time)
+
+        budget = self.cpu_budget / 100
+        available = max(budget - other, budget * MIN_BUDGET_SHARE)
+        longest = self._longest_interval()
+        floor = min(longest, self._cost / available) if available > 0 else longest
+        self.throttled = floor > interval
+        if self.throttled:
+            metrics.increment('sampler_throttled')
+            return floor
+        return interval
+
+    def _set_collector_intervals(self, interval: Optional[float]) -> None:
+        """Refresh the boost collectors (and what they depend on) every ``interval``; None restores them
+
+        Expensive collectors are left at their configured interval, and so
+        is everything below them: a full ``/proc`` scan every 250 ms would
+        cost more than the budget allows. ``top_processes`` therefore keeps
+        showing the last ``processes`` scan while boosted.
+        """
+        if interval is None:
+            for name, saved in self._saved_intervals.items():
+                registry.get(name).interval = saved
+            self._saved_intervals = {}
+            return
+        pending = list(self.boost_collectors)
+        while pending:
+            name = pending.pop()
+            try:
+                collector = registry.get(name)
+            except KeyError:
+                continue
+            if collector.cost == COST_EXPENSIVE:
+                continue
+            self._saved_intervals.setdefault(name, collector.interval)
+            collector.interval = min(interval, self._saved_intervals[name])
+            pending.extend(collector.depends)
+
+
+adaptive_scheduler = AdaptiveScheduler()
@@ -0,0 +1,346 @@
+import json
+import operator
+import os
+import queue
+import re
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Short names for the paths people actually write rules against
+PATH_ALIASES = {
+    'partition': ['disk', 'partitions'],
+    'interface': ['network', 'interfaces']
+}
+
+OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne
+}
+
+# Fraction of the threshold used as the default hysteresis band
+DEFAULT_HYSTERESIS = 0.05
+
+_RULE_RE = re.compile(
+    r'^\s*(?:(?P<name>[\w-]+)\s*:\s*)?'
+    r'(?P<path>\S+)\s*(?P<op>>=|<=|==|!=|>|<)\s*(?P<threshold>-?\d+(?:\.\d+)?)'
+    r'(?:\s+for\s+(?P<duration>\d+(?:\.\d+)?)\s*(?P<unit>ms|s|m|h)?)?'
+    r'(?:\s+clear\s+(?P<clear>-?\d+(?:\.\d+)?))?\s*$'
+)
+_PATH_TOKEN_RE = re.compile(r'\.?([A-Za-z_]\w*)|\[([^\]]*)\]')
+_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600, None: 1}
+
+
+class Rule:
+    """A threshold rule compiled once from text such as ``cpu.cpu_usage_percent > 95 for 30s``.
+
+    Syntax: ``[name:] <path> <op> <threshold> [for <duration>] [clear <value>]``.
+    Path segments are dotted keys; ``[key]`` selects a list index, a dict key,
+    or the entry whose ``mountpoint``/``name``/``id`` matches, and ``[*]``
+    evaluates every entry separately. ``partition`` and ``interface`` are
+    shorthands for ``disk.partitions`` and ``network.interfaces``.
+    """
+
+    def __init__(self, text: str):
+        match = _RULE_RE.match(text)
+        if not match:
+            raise ValueError(f'Invalid alert rule: {text!r}')
+        self.text = text.strip()
+        self.path = match.group('path')
+        self.name = match.group('name') or self.text
+        self.op = match.group('op')
+        self.threshold = float(match.group('threshold'))
+        duration = match.group('duration')
+        self.duration = float(duration) * _UNITS[match.group('unit')] if duration else 0.0
+        self._compare = OPERATORS[self.op]
+        self._steps = self._compile_path(self.path)
+        # Sample key (collector) the path starts from
+        self.collector = self._steps[0][1] if self._steps[0][0] == 'key' else None
+
+        if match.group('clear') is not None:
+            self.clear = float(match.group('clear'))
+        elif self.op in ('>', '>='):
+            self.clear = self.threshold - abs(self.threshold) * DEFAULT_HYSTERESIS
+        elif self.op in ('<', '<='):
+            self.clear = self.threshold + abs(self.threshold) * DEFAULT_HYSTERESIS
+        else:
+            self.clear = None
+
+    @staticmethod
+    def _compile_path(path: str) -> List[Tuple[str, str]]:
+        steps = []
+        position = 0
+        for token in _PATH_TOKEN_RE.finditer(path):
+            if token.start() != position:
+                raise ValueError(f'Invalid alert rule path: {path!r}')
+            position = token.end()
+            key, selector = token.groups()
+            if key is not None:
+                if not steps and key in PATH_ALIASES:
+                    steps.extend(('key', alias) for alias in PATH_ALIASES[key])
+                else:
+                    steps.append(('key', key))
+            else:
+                steps.append(('select', selector.strip()))
+        if position != len(path) or not steps:
+            raise ValueError(f'Invalid alert rule path: {path!r}')
+        return steps
+
+    def resolve(self, sample: Dict[str, Any]) -> Iterator[Tuple[str, float]]:
+        """Yield ``(target, value)`` for every value the path selects in ``sample``"""
+        yield from self._walk(sample, self._steps, [])
+
+    def _walk(self, node: Any, steps: List[Tuple[str, str]], labels: List[str]) -> Iterator[Tuple[str, float]]:
+        if hasattr(node, 'to_dict'):
+            # Compact records are only expanded when a rule actually reaches them
+            node = node.to_dict()
+        if not steps:
+            try:
+                yield ','.join(labels) or self.path, float(node)
+            except (TypeError, ValueError):
+                pass
+            return
+        kind, key = steps[0]
+        rest = steps[1:]
+        if kind == 'key':
+            if isinstance(node, dict) and key in node:
+                yield from self._walk(node[key], rest, labels)
+            return
+        for label, child in self._select(node, key):
+            yield from self._walk(child, rest, labels + [label])
+
+    @staticmethod
+    def _select(node: Any, selector: str) -> Iterator[Tuple[str, Any]]:
+        if isinstance(node, dict):
+            items = list(node.items())
+        elif isinstance(node, list):
+            items = [(str(index), value) for index, value in enumerate(node)]
+        else:
+            return
+        if selector == '*':
+            yield from items
+            return
+        for label, value in items:
+            if label == selector:
+                yield label, value
+                return
+        for label, value in items:
+            fields = value.to_dict() if hasattr(value, 'to_dict') else value
+            if isinstance(fields, dict) and selector in (fields.get('mountpoint'), fields.get('name'), fields.get('id')):
+                yield selector, value
+                return
+
+    def matches(self, value: float) -> bool:
+        return self._compare(value, self.threshold)
+
+    def cleared(self, value: float) -> bool:
+        if self.clear is None:
+            return not self.matches(value)
+        if self.op in ('>', '>='):
+            return value < self.clear
+        return value > self.clear
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'expression': self.text,
+            'path': self.path,
+            'operator': self.op,
+            'threshold': self.threshold,
+            'duration': self.duration,
+            'clear': self.clear
+        }
+
+
+class FileSink:
+    """Append alert events to a local file as JSON lines"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def send(self, event: Dict[str, Any]) -> None:
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(event) + '\n')
+
+
+class WebhookSink:
+    """POST alert events as JSON to a URL from a background thread"""
+
+    def __init__(self, url: str, timeout: float = 5):
+        self.url = url
+        self.timeout = timeout
+        self._queue = queue.Queue(maxsize=1000)
+        threading.Thread(target=self._run, name='alert-webhook', daemon=True).start()
+
+    def send(self, event: Dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            pass
+
+    def close(self) -> None:
+        """Stop the thread once the events already queued are sent"""
+        self._queue.put(None)
+
+    def _run(self) -> None:
+        # urllib pulls in http.client, ssl and email; only load it when a webhook is configured
+        import urllib.request
+
+        while True:
+            event = self._queue.get()
+            if event is None:
+                return
+            request = urllib.request.Request(
+                self.url,
+                data=json.dumps(event).encode('utf-8'),
+                headers={'Content-Type': 'application/json'},
+                method='POST'
+            )
+            try:
+                urllib.request.urlopen(request, timeout=self.timeout).close()
+            except Exception:
+                pass
+
+
+class AlertEngine:
+    """Evaluates compiled rules incrementally against each sampler sample"""
+
+    def __init__(self):
+        self.rules: List[Rule] = []
+        self.events = deque(maxlen=int(os.getenv('ALERT_HISTORY_SIZE', 200)))
+        self.sinks: List[Any] = []
+        # Off in processes that only mirror another process's samples, so
+        # each event reaches the sinks once
+        self.notify = True
+        self._state: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._publish = None
+        self._webhook: Optional[WebhookSink] = None
+        self._lock = threading.Lock()
+
+    def configure_from_env(self) -> None:
+        """Load rules and sinks from ``ALERT_RULES``, ``ALERT_RULES_FILE``,
+        ``ALERT_WEBHOOK_URL`` and ``ALERT_LOG_FILE``"""
+        texts = [rule for rule in os.getenv('ALERT_RULES', '').split(';') if rule.strip()]
+        rules_file = os.getenv('ALERT_RULES_FILE')
+        if rules_file:
+            with open(rules_file, 'r') as f:
+                texts.extend(line for line in f if line.strip() and not line.lstrip().startswith('#'))
+        self.load_rules(texts)
+        self.sinks = []
+        url = os.getenv('ALERT_WEBHOOK_URL')
+        # Keep the running sink (and its thread) while the URL stays the same
+        if self._webhook is not None and self._webhook.url != url:
+            self._webhook.close()
+            self._webhook = None
+        if url:
+            if self._webhook is None:
+                self._webhook = WebhookSink(url)
+            self.sinks.append(self._webhook)
+        if os.getenv('ALERT_LOG_FILE'):
+            self.sinks.append(FileSink(os.getenv('ALERT_LOG_FILE')))
+
+    def load_rules(self, texts: List[str]) -> None:
+        """Compile and install rules, replacing any existing ones"""
+        rules = [Rule(text) for text in texts]
+        with self._lock:
+            self.rules = rules
+            self._state.clear()
+
+    def attach(self, sampler) -> None:
+        """Evaluate rules on every sample and publish firings to the sampler's stream"""
+        self._publish = sampler.publish
+        sampler.add_listener(self.evaluate)
+
+    def active(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(state['event']) for state in self._state.values() if state['firing']]
+
+    def triggered(self) -> bool:
+        """True while any rule's condition holds, whether still pending or already firing"""
+        with self._lock:
+            return any(state['firing'] or state['pending_since'] is not None for state in self._state.values())
+
+    def recent_events(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            events = list(self.events)
+        return events[-limit:] if limit else events
+
+    def evaluate(self, sample: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Advance every rule by one sample and return the events it produced"""
+        now = sample.get('time')
+        timestamp = sample.get('timestamp') or datetime.now().isoformat()
+        emitted = []
+        with self._lock:
+            seen = set()
+            for rule in self.rules:
+                for target, value in rule.resolve(sample):
+                    key = (rule.name, target)
+                    seen.add(key)
+                    state = self._state.setdefault(key, {'pending_since': None, 'firing': False, 'event': None})
+                    if not state['firing']:
+                        if not rule.matches(value):
+                            state['pending_since'] = None
+                            continue
+                        if state['pending_since'] is None:
+                            state['pending_since'] = now
+                        if now - state['pending_since'] >= rule.duration:
+                            state['firing'] = True
+                            state['event'] = self._event(rule, target, 'firing', value, timestamp)
+                            emitted.append(state['event'])
+                    else:
+                        state['event']['value'] = value
+                        if rule.cleared(value):
+                            emitted.append(self._resolve(state, rule, target, value, timestamp))
+            # A collector that failed this tick is missing from the sample;
+            # its targets keep their state instead of resolving and refiring
+            missing = {rule.name for rule in self.rules if rule.collector is not None and rule.collector not in sample}
+            for key, state in list(self._state.items()):
+                if key not in seen and key[0] not in missing:
+                    if state['firing']:
+                        rule = next((r for r in self.rules if r.name == key[0]), None)
+                        if rule is not None:
+                            emitted.append(self._resolve(state, rule, key[1], None, timestamp))
+                    del self._state[key]
+            self.events.extend(emitted)
+        for event in emitted:
+            self._dispatch(event)
+        return emitted
+
+    def _resolve(self, state: Dict[str, Any], rule: Rule, target: str, value: Optional[float], timestamp: str) -> Dict[str, Any]:
+        state['firing'] = False
+        state['pending_since'] = None
+        event = self._event(rule, target, 'resolved', value, timestamp)
+        event['fired_at'] = state['event']['timestamp']
+        state['event'] = None
+        return event
+
+    @staticmethod
+    def _event(rule: Rule, target: str, status: str, value: Optional[float], timestamp: str) -> Dict[str, Any]:
+        return {
+            'rule': rule.name,
+            'expression': rule.text,
+            'target': target,
+            'status': status,
+            'value': value,
+            'threshold': rule.threshold,
+            'timestamp': timestamp
+        }
+
+    def _dispatch(self, event: Dict[str, Any]) -> None:
+        if self._publish is not None:
+            self._publish('alert', event)
+        if not self.notify:
+            return
+        for sink in self.sinks:
+            try:
+                sink.send(event)
+            except Exception:
+                pass
+
+
+alert_engine = AlertEngine()
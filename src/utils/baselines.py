@@ -0,0 +1,239 @@
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import psutil
+
+from src.utils.instrumentation import metrics
+
+# Baselines older than this are not trusted; a fresh one is taken instead
+BASELINE_MAX_AGE = float(os.getenv('BASELINE_MAX_AGE', 60))
+# Shortest window a blocking caller accepts; anything shorter is topped up with a sleep
+MIN_WINDOW = 0.1
+
+# (taken_at, total cpu times, per-cpu times)
+CpuSample = Tuple[float, List[float], List[List[float]]]
+ProcessCounters = Tuple[float, float, Optional[int], Optional[int]]
+ProcessRates = Tuple[float, Optional[float], Optional[float]]
+
+
+def _busy_percent(fields: Tuple[str, ...], t1: List[float], t2: List[float]) -> float:
+    # Same accounting as psutil.cpu_percent: guest time is already counted in user/nice
+    delta = dict(zip(fields, (max(0.0, b - a) for a, b in zip(t1, t2))))
+    total = sum(delta.values()) - delta.get('guest', 0.0) - delta.get('guest_nice', 0.0)
+    busy = total - delta.get('idle', 0.0) - delta.get('iowait', 0.0)
+    return round(busy / total * 100, 1) if total > 0 else 0.0
+
+
+def _rate(old: Optional[int], new: Optional[int], window: float) -> Optional[float]:
+    if old is None or new is None:
+        return None
+    return round(max(0, new - old) / window, 1)
+
+
+class CounterBaselines:
+    """Last cumulative CPU, I/O and GPU counters that rates are computed against.
+
+    psutil keeps its baselines per calling thread and per ``Process`` object,
+    so every request and every restart starts cold and has to sleep. These
+    are shared by all callers, and can be exported and restored across
+    restarts (see ``src/utils/snapshot.py``). ``cpu_version`` and
+    ``processes_version`` change whenever the matching baseline does.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.boot_time = psutil.boot_time()
+        self.cpu_fields: Tuple[str, ...] = psutil.cpu_times()._fields
+        self._cpu: Optional[CpuSample] = None
+        # The CPU baseline the current one replaced, used while the current one is too young
+        self._cpu_prior: Optional[CpuSample] = None
+        # pid -> (create_time, user + system seconds, read bytes, written bytes);
+        # the I/O counters are None when /proc/<pid>/io is not readable
+        self._processes: Dict[int, ProcessCounters] = {}
+        self._processes_time: Optional[float] = None
+        # The baseline the current one replaced, used while the current one is too young
+        self._processes_prior: Optional[Tuple[float, Dict[int, ProcessCounters]]] = None
+        # (pid, DRM client) -> busy nanoseconds per GPU engine
+        self._gpu_engines: Dict[Tuple[int, str], Dict[str, float]] = {}
+        self._gpu_engines_time: Optional[float] = None
+        # name -> (taken_at, counters) for rates()
+        self._counters: Dict[str, Tuple[float, Dict[str, float]]] = {}
+        self.cpu_version = 0
+        self.processes_version = 0
+
+    def cpu_percent(self, interval: Optional[float]) -> Tuple[float, List[float]]:
+        """System-wide and per-core busy percentages since the baseline.
+
+        Without a usable baseline one is taken first; the call then sleeps
+        ``interval`` seconds, or returns zeros when ``interval`` is ``None``
+        (like ``psutil.cpu_percent`` on its first call). The baseline is only
+        replaced once it is ``MIN_WINDOW`` old; calls closer together than
+        that are measured against the one before it, or top up the window
+        with a sleep when there is none.
+        """
+        with self._lock:
+            previous, prior = self._cpu, self._cpu_prior
+        age = time.time() - previous[0] if previous is not None else None
+        if age is None or age > BASELINE_MAX_AGE:
+            previous = self._read_cpu()
+            if not interval:
+                self._store_cpu(previous, None)
+                return 0.0, [0.0] * len(previous[2])
+            with metrics.timer('sleep', 'cpu'):
+                time.sleep(interval)
+        elif age < MIN_WINDOW:
+            if prior is not None and time.time() - prior[0] <= BASELINE_MAX_AGE:
+                current = self._read_cpu()
+                return self._cpu_percents(prior, current)
+            if interval:
+                with metrics.timer('sleep', 'cpu'):
+                    time.sleep(MIN_WINDOW - age)
+        current = self._read_cpu()
+        if current[0] - previous[0] >= MIN_WINDOW:
+            self._store_cpu(current, previous)
+        return self._cpu_percents(previous, current)
+
+    def _cpu_percents(self, previous: CpuSample, current: CpuSample) -> Tuple[float, List[float]]:
+        return (_busy_percent(self.cpu_fields, previous[1], current[1]),
+                [_busy_percent(self.cpu_fields, t1, t2) for t1, t2 in zip(previous[2], current[2])])
+
+    def has_processes(self) -> bool:
+        """Whether a process baseline young enough to compute percentages against exists"""
+        with self._lock:
+            taken = self._processes_time
+        return taken is not None and time.time() - taken <= BASELINE_MAX_AGE
+
+    def update_processes(self, counters: Dict[int, ProcessCounters], now: float) -> Dict[int, ProcessRates]:
+        """Return each pid's rates since the baseline, replacing it once it is ``MIN_WINDOW`` old.
+
+        ``counters`` maps pid to ``(create_time, cpu_seconds, read_bytes,
+        write_bytes)``; the result maps it to ``(cpu_percent,
+        read_bytes_per_sec, write_bytes_per_sec)``. Scans closer together
+        than ``MIN_WINDOW`` (two requests, or a request and the sampler)
+        leave the baseline alone and are measured against the one before it,
+        so no rate is taken over a few milliseconds. Processes the baseline
+        did not know get their lifetime averages.
+        """
+        with self._lock:
+            previous, since = self._processes, self._processes_time
+            if since is None or now - since >= MIN_WINDOW:
+                self._processes_prior = (since, previous) if since is not None else None
+                self._processes, self._processes_time = counters, now
+                self.processes_version += 1
+            elif self._processes_prior is not None:
+                since, previous = self._processes_prior
+        rates = {}
+        for pid, (create_time, seconds, read_bytes, write_bytes) in counters.items():
+            old = previous.get(pid)
+            if old is not None and abs(old[0] - create_time) < 0.01 and since is not None and now > since:
+                window = now - since
+                start = old
+            elif create_time:
+                window = max(now - create_time, MIN_WINDOW)
+                start = (create_time, 0.0, 0, 0)
+            else:
+                rates[pid] = (0.0, None, None)
+                continue
+            rates[pid] = (round(max(0.0, (seconds - start[1]) / window * 100), 1),
+                          _rate(start[2], read_bytes, window), _rate(start[3], write_bytes, window))
+        return rates
+
+    def update_gpu_engines(self, counters: Dict[Tuple[int, str], Dict[str, float]], now: float) -> Dict[int, float]:
+        """Replace the GPU engine baseline and return each pid's busiest-engine percent.
+
+        ``counters`` maps ``(pid, DRM client)`` to busy nanoseconds per engine,
+        already divided by the engine's capacity. Clients seen for the first
+        time have no percentage yet.
+        """
+        with self._lock:
+            previous, since = self._gpu_engines, self._gpu_engines_time
+            self._gpu_engines, self._gpu_engines_time = counters, now
+        if since is None or now <= since:
+            return {}
+        window = (now - since) * 1e9
+        percents: Dict[int, float] = {}
+        for key, engines in counters.items():
+            old = previous.get(key)
+            if old is None:
+                continue
+            busiest = max((busy - old.get(engine, busy) for engine, busy in engines.items()), default=0.0)
+            percent = round(min(100.0, max(0.0, busiest / window * 100)), 1)
+            percents[key[0]] = max(percents.get(key[0], 0.0), percent)
+        return percents
+
+    def rates(self, name: str, counters: Dict[str, float], now: float) -> Dict[str, Optional[float]]:
+        """Per-second rate of each counter since the previous call with the same ``name``
+
+        Counters without a previous value (or that went backwards, e.g. after
+        a reset) have a rate of ``None``.
+        """
+        with self._lock:
+            previous = self._counters.get(name)
+            self._counters[name] = (now, counters)
+        rates: Dict[str, Optional[float]] = {}
+        for key, value in counters.items():
+            old = previous[1].get(key) if previous is not None and now > previous[0] else None
+            rates[key] = (value - old) / (now - previous[0]) if old is not None and value >= old else None
+        return rates
+
+    def export_cpu(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if self._cpu is None:
+                return None
+            taken, total, per_cpu = self._cpu
+        return {'boot_time': self.boot_time, 'fields': list(self.cpu_fields),
+                'time': taken, 'total': total, 'per_cpu': per_cpu}
+
+    def export_processes(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if self._processes_time is None:
+                return None
+            taken, processes = self._processes_time, self._processes
+        return {'boot_time': self.boot_time, 'time': taken,
+                'processes': [[pid, *counters] for pid, counters in processes.items()]}
+
+    def restore_cpu(self, state: Dict[str, Any]) -> bool:
+        """Adopt an exported CPU baseline from the same boot; never replaces a live one"""
+        if not self._same_boot(state) or tuple(state.get('fields', ())) != self.cpu_fields:
+            return False
+        with self._lock:
+            if self._cpu is not None:
+                return False
+            self._cpu = (state['time'], state['total'], state['per_cpu'])
+            self._cpu_prior = None
+            self.cpu_version += 1
+        return True
+
+    def restore_processes(self, state: Dict[str, Any]) -> bool:
+        """Adopt an exported process baseline from the same boot; never replaces a live one"""
+        if not self._same_boot(state):
+            return False
+        with self._lock:
+            if self._processes_time is not None:
+                return False
+            # Baselines written before I/O counters were tracked have three fields
+            self._processes = {entry[0]: tuple(entry[1:]) + (None,) * (5 - len(entry))
+                               for entry in state['processes']}
+            self._processes_time = state['time']
+            self._processes_prior = None
+            self.processes_version += 1
+        return True
+
+    def _same_boot(self, state: Dict[str, Any]) -> bool:
+        # Counters restart from zero on reboot, so older baselines are useless
+        return abs(state.get('boot_time', 0) - self.boot_time) < 1
+
+    def _store_cpu(self, sample: CpuSample, prior: Optional[CpuSample]) -> None:
+        with self._lock:
+            self._cpu, self._cpu_prior = sample, prior
+            self.cpu_version += 1
+
+    @staticmethod
+    def _read_cpu() -> CpuSample:
+        return (time.time(), list(psutil.cpu_times()),
+                [list(times) for times in psutil.cpu_times(percpu=True)])
+
+
+baselines = CounterBaselines()
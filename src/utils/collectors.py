@@ -0,0 +1,229 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from src.utils.instrumentation import metrics
+from src.utils.system_monitor import GPU_BACKENDS, SystemMonitor
+
+COST_CHEAP = 'cheap'
+COST_MODERATE = 'moderate'
+COST_EXPENSIVE = 'expensive'
+
+# Refresh interval (seconds) used when a collector does not declare one
+DEFAULT_INTERVALS = {
+    COST_CHEAP: 2.0,
+    COST_MODERATE: 10.0,
+    COST_EXPENSIVE: 60.0
+}
+
+ENTRY_POINT_GROUP = 'remote_stats.collectors'
+
+# Entries kept per list by the top_processes collector
+TOP_PROCESSES = int(os.getenv('TOP_PROCESSES', 10))
+
+
+class Collector:
+    """A named metric source with a cost class, refresh interval and dependencies.
+
+    ``func`` is called with the current value of each dependency, in the order
+    they are listed in ``depends``. The interval can be overridden with
+    ``COLLECTOR_INTERVAL_<NAME>`` (dots become underscores, e.g.
+    ``COLLECTOR_INTERVAL_GPU_NVIDIA=120``).
+    """
+
+    def __init__(self, name: str, func: Callable[..., Any], cost: str = COST_CHEAP,
+                 interval: Optional[float] = None, depends: Sequence[str] = ()):
+        if cost not in DEFAULT_INTERVALS:
+            raise ValueError(f'Unknown collector cost class: {cost!r}')
+        self.name = name
+        self.func = func
+        self.cost = cost
+        env_interval = os.getenv('COLLECTOR_INTERVAL_' + name.upper().replace('.', '_').replace('-', '_'))
+        if env_interval is not None:
+            interval = float(env_interval)
+        self.interval = DEFAULT_INTERVALS[cost] if interval is None else interval
+        self.depends = tuple(depends)
+        self.value: Any = None
+        self.last_run: Optional[float] = None
+        self.last_success: Optional[float] = None
+        self.last_duration = 0.0
+        self.total_duration = 0.0
+        self.runs = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self.lock = threading.Lock()
+
+    def is_due(self, now: float) -> bool:
+        return self.last_success is None or now - self.last_success >= self.interval
+
+    def run(self, inputs: List[Any]) -> Any:
+        """Run the collector, recording its duration and any error"""
+        started = time.perf_counter()
+        try:
+            value = self.func(*inputs)
+        except Exception as e:
+            self.errors += 1
+            self.last_error = str(e)
+            raise
+        finally:
+            self.last_duration = time.perf_counter() - started
+            self.total_duration += self.last_duration
+            if getattr(self.func, 'timed', None) is None:
+                # SystemMonitor getters record themselves (see instrumentation.timed)
+                metrics.observe('collector', self.name, self.last_duration)
+            self.runs += 1
+            self.last_run = time.time()
+        self.value = value
+        self.last_success = self.last_run
+        return value
+
+    def stats(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = time.time() if now is None else now
+        age = now - self.last_success if self.last_success is not None else None
+        return {
+            'name': self.name,
+            'cost': self.cost,
+            'interval': self.interval,
+            'depends': list(self.depends),
+            'runs': self.runs,
+            'errors': self.errors,
+            'last_error': self.last_error,
+            'last_duration_ms': round(self.last_duration * 1000, 3),
+            'total_duration_ms': round(self.total_duration * 1000, 3),
+            'last_run': self.last_run,
+            'age': age,
+            'stale': age is None or age > self.interval * 2
+        }
+
+
+class CollectorRegistry:
+    """Runs registered collectors on demand, re-using values until they are due"""
+
+    def __init__(self):
+        self._collectors: Dict[str, Collector] = {}
+        self._lock = threading.Lock()
+        self._entry_points_loaded = False
+
+    def register(self, collector: Collector) -> Collector:
+        """Add or replace a collector"""
+        with self._lock:
+            self._collectors[collector.name] = collector
+        return collector
+
+    def get(self, name: str) -> Collector:
+        self._load_entry_points()
+        return self._collectors[name]
+
+    def names(self) -> List[str]:
+        self._load_entry_points()
+        return list(self._collectors)
+
+    def collect(self, names: Iterable[str], force: bool = False) -> Dict[str, Any]:
+        """Return the value of each named collector, running those that are due"""
+        self._load_entry_points()
+        return {name: self._collect(name, force, ()) for name in names}
+
+    def collect_one(self, name: str, force: bool = False) -> Any:
+        return self.collect([name], force)[name]
+
+    def stats(self) -> List[Dict[str, Any]]:
+        self._load_entry_points()
+        now = time.time()
+        return [collector.stats(now) for collector in self._collectors.values()]
+
+    def reset(self) -> None:
+        """Forget cached values and statistics so every collector runs again"""
+        for collector in self._collectors.values():
+            with collector.lock:
+                collector.value = None
+                collector.last_run = collector.last_success = collector.last_error = None
+                collector.last_duration = collector.total_duration = 0.0
+                collector.runs = collector.errors = 0
+
+    def _collect(self, name: str, force: bool, chain: Sequence[str]) -> Any:
+        if name in chain:
+            raise ValueError(f'Collector dependency cycle: {" -> ".join(list(chain) + [name])}')
+        collector = self._collectors[name]
+        inputs = [self._collect(dependency, force, tuple(chain) + (name,)) for dependency in collector.depends]
+        with collector.lock:
+            # Collectors with dependencies are recomputed whenever asked so they
+            # always reflect their inputs; the inputs carry their own intervals
+            if force or collector.depends or collector.is_due(time.time()):
+                try:
+                    collector.run(inputs)
+                except Exception:
+                    if collector.last_success is None:
+                        raise
+            return collector.value
+
+    def _load_entry_points(self) -> None:
+        """Register third-party collectors advertised under ``remote_stats.collectors``
+
+        Each entry point may resolve to a Collector, a list of Collectors, or a
+        callable returning either.
+        """
+        if self._entry_points_loaded:
+            return
+        self._entry_points_loaded = True
+        try:
+            from importlib.metadata import entry_points
+        except ImportError:
+            return
+        try:
+            eps = entry_points()
+            eps = eps.select(group=ENTRY_POINT_GROUP) if hasattr(eps, 'select') else eps.get(ENTRY_POINT_GROUP, [])
+        except Exception:
+            return
+        for ep in eps:
+            try:
+                loaded = ep.load()
+                if callable(loaded) and not isinstance(loaded, Collector):
+                    loaded = loaded()
+                for collector in (loaded if isinstance(loaded, (list, tuple)) else [loaded]):
+                    if isinstance(collector, Collector):
+                        self.register(collector)
+            except Exception:
+                continue
+
+
+def _collect_cpu() -> Dict[str, Any]:
+    # Usage is measured against the shared counter baseline; the short
+    # interval is only slept when there is none yet (cold start)
+    return SystemMonitor.get_cpu_info(interval=0.1)
+
+
+# Recorded as 'cpu' by get_cpu_info itself
+_collect_cpu.timed = 'cpu'
+
+
+def _top_processes(processes: List[Any]) -> Dict[str, Any]:
+    return {
+        'top_cpu': sorted(processes, key=lambda x: x.cpu_percent or 0, reverse=True)[:TOP_PROCESSES],
+        'top_memory': sorted(processes, key=lambda x: x.memory_percent or 0, reverse=True)[:TOP_PROCESSES]
+    }
+
+
+def _merge_gpu_info(*values: Any) -> Dict[str, Any]:
+    return {name: value for name, value in zip(GPU_BACKENDS, values) if value is not None}
+
+
+registry = CollectorRegistry()
+registry.register(Collector('system', SystemMonitor.get_system_info, COST_CHEAP, interval=10))
+registry.register(Collector('cpu', _collect_cpu, COST_CHEAP))
+registry.register(Collector('memory', SystemMonitor.get_memory_info, COST_CHEAP))
+registry.register(Collector('network', SystemMonitor.get_network_records, COST_CHEAP))
+registry.register(Collector('memory_detailed', SystemMonitor.get_detailed_memory_info, COST_CHEAP))
+registry.register(Collector('pressure', SystemMonitor.get_pressure_info, COST_CHEAP))
+registry.register(Collector('temperatures', SystemMonitor.get_temperatures, COST_CHEAP, interval=5))
+registry.register(Collector('disk', SystemMonitor.get_disk_records, COST_MODERATE))
+registry.register(Collector('processes', SystemMonitor.get_process_records, COST_EXPENSIVE, interval=10))
+registry.register(Collector('top_processes', _top_processes, COST_CHEAP, depends=['processes']))
+registry.register(Collector('gpu.processes', SystemMonitor.get_process_gpu_usage, COST_EXPENSIVE, interval=15))
+registry.register(Collector('gpu.nvidia', GPU_BACKENDS['nvidia'], COST_EXPENSIVE, interval=15))
+registry.register(Collector('gpu.amd', GPU_BACKENDS['amd'], COST_EXPENSIVE, interval=15))
+registry.register(Collector('gpu.general', GPU_BACKENDS['general'], COST_EXPENSIVE, interval=600))
+registry.register(Collector('gpu.opengl', GPU_BACKENDS['opengl'], COST_EXPENSIVE, interval=600))
+registry.register(Collector('gpu.raspberry_pi', GPU_BACKENDS['raspberry_pi'], COST_EXPENSIVE, interval=15))
+registry.register(Collector('gpu.integrated', GPU_BACKENDS['integrated'], COST_CHEAP, interval=5))
+registry.register(Collector('gpu', _merge_gpu_info, COST_CHEAP, depends=['gpu.' + name for name in GPU_BACKENDS]))
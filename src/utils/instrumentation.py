@@ -0,0 +1,288 @@
+import functools
+import io
+import os
+import threading
+import time
+import psutil
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+class Histogram:
+    """Log-linear latency histogram in the style of HdrHistogram.
+
+    Values are recorded in microseconds into buckets that split each power of
+    two into eight linear steps, which keeps the relative error of any
+    percentile under 12.5% while storing only the buckets that are used.
+    """
+
+    SUB_BUCKET_BITS = 3
+
+    def __init__(self):
+        self.counts: Dict[Tuple[int, int], int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def _bucket(cls, micros: int) -> Tuple[int, int]:
+        sub_buckets = 1 << cls.SUB_BUCKET_BITS
+        if micros < sub_buckets:
+            return 0, micros
+        exponent = micros.bit_length() - 1
+        return exponent, (micros >> (exponent - cls.SUB_BUCKET_BITS)) & (sub_buckets - 1)
+
+    @classmethod
+    def _upper_bound(cls, bucket: Tuple[int, int]) -> float:
+        """Upper edge of a bucket, in seconds"""
+        exponent, sub = bucket
+        if exponent == 0:
+            return (sub + 1) / 1e6
+        shift = exponent - cls.SUB_BUCKET_BITS
+        return (((1 << cls.SUB_BUCKET_BITS) + sub + 1) << shift) / 1e6
+
+    def record(self, seconds: float) -> None:
+        bucket = self._bucket(max(0, int(seconds * 1e6)))
+        with self._lock:
+            self.counts[bucket] = self.counts.get(bucket, 0) + 1
+            self.count += 1
+            self.total += seconds
+            self.min = seconds if self.min is None else min(self.min, seconds)
+            self.max = max(self.max, seconds)
+
+    def percentile(self, quantile: float) -> float:
+        with self._lock:
+            if not self.count:
+                return 0.0
+            target = quantile * self.count
+            seen = 0
+            for bucket in sorted(self.counts):
+                seen += self.counts[bucket]
+                if seen >= target:
+                    return min(self._upper_bound(bucket), self.max)
+            return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        """Count, mean, min/max and common percentiles, in milliseconds"""
+        summary = {
+            'count': self.count,
+            'total_ms': round(self.total * 1000, 3),
+            'mean_ms': round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            'min_ms': round((self.min or 0.0) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3)
+        }
+        for quantile in QUANTILES:
+            summary[f'p{quantile * 100:g}_ms'] = round(self.percentile(quantile) * 1000, 3)
+        return summary
+
+
+class Metrics:
+    """Process-wide latency histograms and counters, grouped by kind"""
+
+    def __init__(self):
+        self.histograms: Dict[str, Dict[str, Histogram]] = {}
+        self.counters: Dict[str, int] = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def observe(self, kind: str, name: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.histograms.setdefault(kind, {}).get(name)
+            if histogram is None:
+                histogram = self.histograms[kind][name] = Histogram()
+        histogram.record(seconds)
+
+    @contextmanager
+    def timer(self, kind: str, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(kind, name, time.perf_counter() - started)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms = {}
+            self.counters = {}
+            self.started = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            histograms = {kind: dict(named) for kind, named in self.histograms.items()}
+            counters = dict(self.counters)
+        return {
+            'uptime': time.time() - self.started,
+            'counters': counters,
+            'latency': {kind: {name: histogram.summary() for name, histogram in sorted(named.items())}
+                        for kind, named in histograms.items()}
+        }
+
+    def prometheus(self) -> str:
+        """Render counters and latency summaries in the Prometheus text format"""
+        snapshot = self.snapshot()
+        lines: List[str] = []
+        for name, value in sorted(snapshot['counters'].items()):
+            metric = f'remote_stats_{name}_total'
+            lines.append(f'# TYPE {metric} counter')
+            lines.append(f'{metric} {value}')
+        with self._lock:
+            histograms = {kind: dict(named) for kind, named in self.histograms.items()}
+        for kind, named in sorted(histograms.items()):
+            metric = f'remote_stats_{kind}_latency_seconds'
+            lines.append(f'# TYPE {metric} summary')
+            for name, histogram in sorted(named.items()):
+                label = name.replace('\\', '\\\\').replace('"', '\\"')
+                for quantile in QUANTILES:
+                    lines.append(f'{metric}{{name="{label}",quantile="{quantile}"}} {histogram.percentile(quantile):.6f}')
+                lines.append(f'{metric}_sum{{name="{label}"}} {histogram.total:.6f}')
+                lines.append(f'{metric}_count{{name="{label}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+def timed(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator: record every call in the ``collector`` histogram ``name``
+
+    Getters are timed where they are defined, so collections made by the
+    sampler (through the registry) and directly by routes are both counted.
+    """
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with metrics.timer('collector', name):
+                return func(*args, **kwargs)
+        wrapper.timed = name
+        return wrapper
+    return decorator
+
+
+def _instrument_psutil() -> None:
+    """Count the /proc and /sys files psutil opens.
+
+    psutil's Linux backend funnels every file read through two module-level
+    helpers, so wrapping them is the only way to see those reads without
+    patching ``open`` globally.
+    """
+    try:
+        import psutil._pslinux as pslinux
+    except ImportError:
+        return
+    for helper in ('open_binary', 'open_text'):
+        original = getattr(pslinux, helper, None)
+        if original is None or getattr(original, '_instrumented', False):
+            continue
+
+        def wrapper(fname, *args, _original=original, **kwargs):
+            count_file_read(str(fname))
+            return _original(fname, *args, **kwargs)
+
+        wrapper._instrumented = True
+        setattr(pslinux, helper, wrapper)
+
+
+def count_file_read(path: str) -> None:
+    """Record a read of a procfs or sysfs file"""
+    if path.startswith('/proc') or path.startswith(psutil.PROCFS_PATH):
+        metrics.increment('proc_reads')
+    elif path.startswith('/sys'):
+        metrics.increment('sysfs_reads')
+
+
+def _trusted_profile_client(remote_addr: Optional[str]) -> bool:
+    trusted = os.getenv('PROFILE_TRUSTED_CLIENTS', '')
+    return remote_addr in [client.strip() for client in trusted.split(',') if client.strip()]
+
+
+# cProfile and pyinstrument both hook the interpreter; only one session may run at a time
+_profile_lock = threading.Lock()
+
+
+def _start_profiler(kind: str) -> Any:
+    if kind != 'cprofile':
+        try:
+            from pyinstrument import Profiler
+            profiler = Profiler()
+            profiler.start()
+            return profiler
+        except ImportError:
+            pass
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _stop_profiler(profiler: Any) -> str:
+    if hasattr(profiler, 'output_text'):
+        profiler.stop()
+        return profiler.output_text(unicode=True)
+    import pstats
+    profiler.disable()
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(int(os.getenv('PROFILE_LIMIT', 60)))
+    return output.getvalue()
+
+
+def init_app(app) -> None:
+    """Time every request and JSON encoding, and allow ``?profile=1`` for trusted clients"""
+    from flask import g, jsonify, request
+
+    class TimedJSONProvider(type(app.json)):
+        def dumps(self, obj: Any, **kwargs: Any) -> str:
+            with metrics.timer('serialization', 'json'):
+                return super().dumps(obj, **kwargs)
+
+    app.json = TimedJSONProvider(app)
+    _instrument_psutil()
+
+    @app.before_request
+    def _start_request_timer():
+        g.request_started = time.perf_counter()
+        profile = request.args.get('profile')
+        if profile and profile != '0' and _trusted_profile_client(request.remote_addr):
+            if not _profile_lock.acquire(blocking=False):
+                response = jsonify({'error': 'Another request is already being profiled'})
+                response.status_code = 409
+                return response
+            try:
+                g.profiler = _start_profiler(profile)
+            except Exception:
+                _profile_lock.release()
+                raise
+
+    @app.after_request
+    def _record_request_time(response):
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        started = g.pop('request_started', None)
+        if started is not None:
+            metrics.observe('route', f'{request.method} {route}', time.perf_counter() - started)
+        metrics.increment(f'responses_{response.status_code // 100}xx')
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            try:
+                response = app.response_class(_stop_profiler(profiler), mimetype='text/plain')
+            finally:
+                _profile_lock.release()
+        return response
+
+    @app.teardown_request
+    def _stop_abandoned_profiler(error):
+        # after_request does not run when the view raised
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            try:
+                _stop_profiler(profiler)
+            except Exception:
+                pass
+            finally:
+                _profile_lock.release()
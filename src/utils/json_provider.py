@@ -0,0 +1,13 @@
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+
+class RecordJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that turns compact records into dicts only while serializing"""
+
+    @staticmethod
+    def default(value: Any) -> Any:
+        if hasattr(value, 'to_dict'):
+            return value.to_dict()
+        return DefaultJSONProvider.default(value)
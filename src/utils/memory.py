@@ -0,0 +1,166 @@
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.baselines import baselines
+from src.utils.system_monitor import SystemMonitor
+
+# /proc/vmstat counters reported with per-second rates (all counted in pages or events)
+PAGING_COUNTERS = (
+    'pgfault', 'pgmajfault', 'pswpin', 'pswpout', 'pgpgin', 'pgpgout',
+    'pgscan_kswapd', 'pgscan_direct', 'pgsteal_kswapd', 'pgsteal_direct',
+    'workingset_refault', 'workingset_refault_anon', 'workingset_refault_file',
+    'oom_kill', 'compact_stall', 'thp_fault_alloc'
+)
+
+_NODE_RE = re.compile(r'^node(\d+)$')
+
+
+def parse_meminfo(text: str) -> Dict[str, int]:
+    """Parse ``/proc/meminfo`` style lines into bytes (``HugePages_*`` stay page counts)
+
+    Per-node files prefix every line with ``Node <n>``, which is skipped.
+    """
+    values = {}
+    for line in text.splitlines():
+        key, _, value = line.partition(':')
+        if not value:
+            continue
+        key = key.split()[-1]
+        fields = value.split()
+        if not fields:
+            continue
+        number = int(fields[0])
+        values[key] = number * 1024 if len(fields) > 1 and fields[1] == 'kB' else number
+    return values
+
+
+def parse_vmstat(text: str) -> Dict[str, int]:
+    values = {}
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) == 2:
+            values[fields[0]] = int(fields[1])
+    return values
+
+
+class MemoryCollector:
+    """Extended memory breakdown from ``/proc/meminfo``, ``/proc/vmstat`` and NUMA nodes.
+
+    Each file is read with one buffered read and parsed in place, without
+    going through psutil (which re-reads ``/proc/meminfo`` for every call).
+    Paging counters from vmstat are turned into per-second rates over the
+    time since the previous collection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._page_size = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+    def collect(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.time()
+            meminfo = self._read(SystemMonitor._proc_path('meminfo'), parse_meminfo)
+            vmstat = self._read(SystemMonitor._proc_path('vmstat'), parse_vmstat)
+            paging_totals = {name: vmstat[name] for name in PAGING_COUNTERS if name in vmstat}
+            rates = baselines.rates('vmstat', paging_totals, now)
+
+            return {
+                'summary': self._summary(meminfo),
+                'paging': {
+                    name: {
+                        'total': total,
+                        'per_sec': round(rates[name], 2) if rates.get(name) is not None else None
+                    } for name, total in paging_totals.items()
+                },
+                'swap_in_bytes_per_sec': self._pages_to_bytes(rates.get('pswpin')),
+                'swap_out_bytes_per_sec': self._pages_to_bytes(rates.get('pswpout')),
+                'numa': self._numa_nodes(),
+                'meminfo': meminfo
+            }
+
+    @staticmethod
+    def _read(path: str, parse) -> Dict[str, int]:
+        try:
+            return parse(SystemMonitor._read_file(path))
+        except (OSError, ValueError):
+            return {}
+
+    def _pages_to_bytes(self, rate: Optional[float]) -> Optional[float]:
+        return round(rate * self._page_size, 1) if rate is not None else None
+
+    @staticmethod
+    def _summary(meminfo: Dict[str, int]) -> Dict[str, Any]:
+        get = meminfo.get
+        total = get('MemTotal')
+        return {
+            'total': total,
+            'free': get('MemFree'),
+            'available': get('MemAvailable'),
+            'used': total - get('MemAvailable', get('MemFree', 0)) if total is not None else None,
+            'buffers': get('Buffers'),
+            'page_cache': get('Cached'),
+            'swap_cached': get('SwapCached'),
+            'shared': get('Shmem'),
+            'active': {'anon': get('Active(anon)'), 'file': get('Active(file)')},
+            'inactive': {'anon': get('Inactive(anon)'), 'file': get('Inactive(file)')},
+            'anon_pages': get('AnonPages'),
+            'mapped': get('Mapped'),
+            'slab': {
+                'total': get('Slab'),
+                'reclaimable': get('SReclaimable'),
+                'unreclaimable': get('SUnreclaim')
+            },
+            'kernel_stack': get('KernelStack'),
+            'page_tables': get('PageTables'),
+            'dirty': get('Dirty'),
+            'writeback': get('Writeback'),
+            'committed': {'as': get('Committed_AS'), 'limit': get('CommitLimit')},
+            'hugepages': {
+                'total': get('HugePages_Total'),
+                'free': get('HugePages_Free'),
+                'reserved': get('HugePages_Rsvd'),
+                'surplus': get('HugePages_Surp'),
+                'page_size': get('Hugepagesize'),
+                'hugetlb': get('Hugetlb'),
+                'anon_huge': get('AnonHugePages')
+            },
+            'swap': {'total': get('SwapTotal'), 'free': get('SwapFree')}
+        }
+
+    @staticmethod
+    def _numa_nodes() -> List[Dict[str, Any]]:
+        root = SystemMonitor._sys_path('devices/system/node')
+        try:
+            nodes: List[Tuple[int, str]] = sorted(
+                (int(match.group(1)), entry) for entry in os.listdir(root) for match in [_NODE_RE.match(entry)] if match)
+        except OSError:
+            return []
+        result = []
+        for node, entry in nodes:
+            try:
+                values = parse_meminfo(SystemMonitor._read_file(os.path.join(root, entry, 'meminfo')))
+            except (OSError, ValueError):
+                continue
+            result.append({
+                'node': node,
+                'total': values.get('MemTotal'),
+                'free': values.get('MemFree'),
+                'used': values.get('MemUsed'),
+                'page_cache': values.get('FilePages'),
+                'anon_pages': values.get('AnonPages'),
+                'slab': values.get('Slab'),
+                'dirty': values.get('Dirty'),
+                'writeback': values.get('Writeback'),
+                'hugepages': {
+                    'total': values.get('HugePages_Total'),
+                    'free': values.get('HugePages_Free'),
+                    'surplus': values.get('HugePages_Surp')
+                }
+            })
+        return result
+
+
+memory = MemoryCollector()
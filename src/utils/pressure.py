@@ -0,0 +1,171 @@
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.baselines import baselines
+from src.utils.system_monitor import SystemMonitor
+
+PSI_RESOURCES = ('cpu', 'memory', 'io')
+# Where the unified (v2) cgroup hierarchy is mounted, relative to sysfs
+CGROUP_ROOTS = ('fs/cgroup', 'fs/cgroup/unified')
+# Upper bound on cgroups read per collection when they are discovered automatically
+MAX_CGROUPS = 32
+
+
+def parse_psi(text: str) -> Dict[str, Dict[str, float]]:
+    """Parse a PSI file (``some avg10=0.00 avg60=0.00 avg300=0.00 total=0`` per line)"""
+    psi = {}
+    for line in text.splitlines():
+        kind, _, fields = line.partition(' ')
+        if not fields:
+            continue
+        values = {}
+        for field in fields.split():
+            key, _, value = field.partition('=')
+            values[key] = int(value) if key == 'total' else float(value)
+        psi[kind] = values
+    return psi
+
+
+def parse_schedstat(text: str) -> List[Tuple[int, int]]:
+    """``(running ns, waiting ns)`` per CPU from ``/proc/schedstat`` (version 15 and later)"""
+    cpus = []
+    for line in text.splitlines():
+        fields = line.split()
+        if fields and fields[0].startswith('cpu') and len(fields) >= 10:
+            cpus.append((int(fields[7]), int(fields[8])))
+    return cpus
+
+
+class PressureCollector:
+    """Pressure stall information, run queue length and scheduler delay.
+
+    Reads ``/proc/pressure/{cpu,memory,io}``, the same files of selected
+    cgroups, ``/proc/loadavg`` and ``/proc/schedstat``: a handful of small
+    files per collection. The cumulative ``total`` stall counters and the
+    per-CPU wait times are turned into rates over the time since the
+    previous collection, so saturation shows up at the sampler's resolution
+    instead of only in the kernel's 10 second average.
+
+    ``PRESSURE_CGROUPS`` lists the cgroups to read, relative to the cgroup v2
+    mount (e.g. ``system.slice,user.slice/user-1000.slice``); by default the
+    top-level cgroups are read.
+    """
+
+    def __init__(self):
+        cgroups = os.getenv('PRESSURE_CGROUPS')
+        self.cgroups = [name.strip().strip('/') for name in cgroups.split(',') if name.strip()] if cgroups is not None else None
+        self._lock = threading.Lock()
+        self._cgroup_root: Optional[str] = None
+
+    def collect(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.time()
+            counters: Dict[str, float] = {}
+            system = {}
+            for resource in PSI_RESOURCES:
+                psi = self._read_psi(SystemMonitor._proc_path(f'pressure/{resource}'), resource, counters)
+                if psi is not None:
+                    system[resource] = psi
+            cgroups = {}
+            for name, path in self._cgroup_paths():
+                values = {}
+                for resource in PSI_RESOURCES:
+                    psi = self._read_psi(os.path.join(path, f'{resource}.pressure'), f'{name}:{resource}', counters)
+                    if psi is not None:
+                        values[resource] = psi
+                if values:
+                    cgroups[name] = values
+            schedstat = self._read_schedstat()
+            for cpu, (running, waiting) in enumerate(schedstat):
+                counters[f'cpu{cpu}:running'] = running
+                counters[f'cpu{cpu}:waiting'] = waiting
+
+            rates = baselines.rates('pressure', counters, now)
+            for scope, values in [('', system)] + [(f'{name}:', values) for name, values in cgroups.items()]:
+                for resource, psi in values.items():
+                    for kind, fields in psi.items():
+                        rate = rates.get(f'{scope}{resource}:{kind}')
+                        # Stall totals are microseconds, so µs per second / 10^4 is percent
+                        fields['stall_percent'] = round(rate / 1e4, 2) if rate is not None else None
+
+            return {
+                'available': bool(system),
+                'pressure': system,
+                'cgroups': cgroups,
+                'run_queue': self._read_loadavg(),
+                'scheduler': self._scheduler(schedstat, rates)
+            }
+
+    @staticmethod
+    def _read_psi(path: str, key: str, counters: Dict[str, float]) -> Optional[Dict[str, Dict[str, float]]]:
+        try:
+            psi = parse_psi(SystemMonitor._read_file(path))
+        except (OSError, ValueError):
+            # Missing, or PSI disabled at boot (psi=0), which fails the read
+            return None
+        for kind, fields in psi.items():
+            if 'total' in fields:
+                counters[f'{key}:{kind}'] = fields['total']
+        return psi or None
+
+    @staticmethod
+    def _read_loadavg() -> Optional[Dict[str, Any]]:
+        try:
+            fields = SystemMonitor._read_file(SystemMonitor._proc_path('loadavg')).split()
+            runnable, threads = (int(value) for value in fields[3].split('/'))
+        except (OSError, ValueError, IndexError):
+            return None
+        cores = SystemMonitor.get_host_facts()['total_cores'] or 1
+        return {
+            'load_average': [float(value) for value in fields[:3]],
+            # Includes the thread reading the file
+            'runnable': runnable,
+            'threads': threads,
+            'runnable_per_cpu': round(runnable / cores, 2)
+        }
+
+    @staticmethod
+    def _read_schedstat() -> List[Tuple[int, int]]:
+        try:
+            return parse_schedstat(SystemMonitor._read_file(SystemMonitor._proc_path('schedstat')))
+        except (OSError, ValueError):
+            return []
+
+    @staticmethod
+    def _scheduler(schedstat: List[Tuple[int, int]], rates: Dict[str, Optional[float]]) -> Dict[str, Any]:
+        """Run delay per CPU: nanoseconds waited per second / 10^9 is the average number of waiting tasks"""
+        per_cpu = []
+        for cpu in range(len(schedstat)):
+            running = rates.get(f'cpu{cpu}:running')
+            waiting = rates.get(f'cpu{cpu}:waiting')
+            per_cpu.append({
+                'cpu': cpu,
+                'busy_percent': round(running / 1e7, 1) if running is not None else None,
+                'waiting_tasks': round(waiting / 1e9, 3) if waiting is not None else None
+            })
+        waiting = [cpu['waiting_tasks'] for cpu in per_cpu if cpu['waiting_tasks'] is not None]
+        return {
+            'available': bool(schedstat),
+            'waiting_tasks': round(sum(waiting), 3) if waiting else None,
+            'per_cpu': per_cpu
+        }
+
+    def _cgroup_paths(self) -> List[Tuple[str, str]]:
+        if self._cgroup_root is None:
+            self._cgroup_root = next((SystemMonitor._sys_path(root) for root in CGROUP_ROOTS
+                                      if os.path.exists(os.path.join(SystemMonitor._sys_path(root), 'cgroup.controllers'))), '')
+        if not self._cgroup_root:
+            return []
+        if self.cgroups is not None:
+            names = self.cgroups
+        else:
+            try:
+                names = sorted(entry.name for entry in os.scandir(self._cgroup_root) if entry.is_dir())[:MAX_CGROUPS]
+            except OSError:
+                return []
+        return [(name, os.path.join(self._cgroup_root, name)) for name in names]
+
+
+pressure = PressureCollector()
@@ -0,0 +1,241 @@
+import array
+import os
+import re
+import shutil
+import struct
+import subprocess
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.instrumentation import metrics
+from src.utils.system_monitor import SystemMonitor
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+MAILBOX_DEVICE = '/dev/vcio'
+# _IOWR(100, 0, char *) from the firmware's mailbox interface
+IOCTL_MBOX_PROPERTY = 0xC0000000 | (struct.calcsize('P') << 16) | (100 << 8)
+MAILBOX_SUCCESS = 0x80000000
+# Seconds before a host where neither the mailbox nor vcgencmd worked is probed again
+DETECT_RETRY_SECONDS = 60
+
+TAG_GET_VC_MEMORY = 0x00010006
+TAG_GET_VOLTAGE = 0x00030003
+TAG_GET_TEMPERATURE = 0x00030006
+TAG_GET_THROTTLED = 0x00030046
+TAG_GET_CLOCK_RATE_MEASURED = 0x00030047
+
+VOLTAGE_CORE = 1
+# Firmware clock ids for the clocks `vcgencmd measure_clock` reports
+CLOCK_IDS = {'core': 4, 'v3d': 5, 'h264': 6, 'isp': 7, 'hevc': 11}
+
+THROTTLED_FLAGS = {
+    0: 'under_voltage',
+    1: 'arm_frequency_capped',
+    2: 'currently_throttled',
+    3: 'soft_temperature_limit',
+    16: 'under_voltage_occurred',
+    17: 'arm_frequency_capping_occurred',
+    18: 'throttling_occurred',
+    19: 'soft_temperature_limit_occurred'
+}
+
+
+def decode_throttled(value: int) -> Dict[str, bool]:
+    """Decode the get_throttled bit field into named flags"""
+    return {name: bool(value & (1 << bit)) for bit, name in THROTTLED_FLAGS.items()}
+
+
+class VideoCoreCollector:
+    """Raspberry Pi VideoCore stats without forking vcgencmd for every value.
+
+    Temperature and throttling come from sysfs, clocks, voltage and the GPU
+    memory split from one batched property call on the firmware mailbox
+    (``/dev/vcio``, kept open between calls). Values that only change on
+    reboot (memory split, ``get_config``) are read once. vcgencmd is only
+    used for what neither source provides, such as the free ``reloc`` and
+    ``malloc`` heap, read on every call. A host where neither works is
+    probed again every ``DETECT_RETRY_SECONDS`` (e.g. once the user has
+    been added to the ``video`` group).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._mailbox_fd: Optional[int] = None
+        self._mailbox_failed = False
+        self._available: Optional[bool] = None
+        self._detected_at = 0.0
+        self._static: Optional[Dict[str, Any]] = None
+
+    def collect(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            if self._available is None or (not self._available and now - self._detected_at >= DETECT_RETRY_SECONDS):
+                self._mailbox_failed = False
+                self._available = self._detect()
+                self._detected_at = now
+            if not self._available:
+                return {'available': False}
+            if self._static is None:
+                self._static = self._read_static()
+            pi_gpu = dict(self._static)
+            pi_gpu.update(self._read_dynamic())
+            return pi_gpu
+
+    def _detect(self) -> bool:
+        if os.path.exists(MAILBOX_DEVICE) and self._mailbox([(TAG_GET_TEMPERATURE, [0, 0])]) is not None:
+            return True
+        if shutil.which('vcgencmd') is None:
+            return False
+        return self._vcgencmd('get_mem', 'gpu') is not None
+
+    def _read_static(self) -> Dict[str, Any]:
+        pi_gpu = {'available': True, 'type': self._gpu_type()}
+
+        memory = self._mailbox([(TAG_GET_VC_MEMORY, [0, 0])])
+        if memory is not None and memory[0] is not None:
+            pi_gpu['gpu_memory'] = f'gpu={memory[0][1] >> 20}M'
+        else:
+            pi_gpu['gpu_memory'] = self._vcgencmd('get_mem', 'gpu')
+        pi_gpu['total_memory'] = self._vcgencmd('get_mem', 'total')
+
+        freq_config = self._vcgencmd('get_config', 'int', 'gpu_freq')
+        pi_gpu['frequency'] = freq_config
+        pi_gpu['gpu_freq'] = None
+        if freq_config is not None:
+            match = re.search(r'gpu_freq=([0-9]+)', freq_config)
+            if match:
+                pi_gpu['gpu_freq'] = int(match.group(1))
+            else:
+                pi_gpu['gpu_freq_source'] = None
+                # Fallback: try core_freq, v3d_freq, hevc_freq
+                for source in ('core_freq', 'v3d_freq', 'hevc_freq'):
+                    match = re.search(source + r'=([0-9]+)', freq_config)
+                    if match:
+                        pi_gpu['gpu_freq'] = int(match.group(1))
+                        pi_gpu['gpu_freq_source'] = source
+                        break
+        return pi_gpu
+
+    def _read_dynamic(self) -> Dict[str, Any]:
+        pi_gpu: Dict[str, Any] = {}
+        # Free space in the firmware heaps, which changes as the GPU allocates
+        for mem_type in ['reloc', 'malloc']:
+            pi_gpu[f'{mem_type}_memory'] = self._vcgencmd('get_mem', mem_type)
+
+        tags = [(TAG_GET_CLOCK_RATE_MEASURED, [clock_id, 0]) for clock_id in CLOCK_IDS.values()]
+        tags.append((TAG_GET_VOLTAGE, [VOLTAGE_CORE, 0]))
+        tags.append((TAG_GET_TEMPERATURE, [0, 0]))
+        tags.append((TAG_GET_THROTTLED, [0]))
+        response = self._mailbox(tags) or [None] * len(tags)
+        clocks, (voltage, temperature, throttled) = response[:len(CLOCK_IDS)], response[len(CLOCK_IDS):]
+        pi_gpu['clock_source'] = 'mailbox' if any(value is not None for value in response) else 'vcgencmd'
+
+        for clk, value in zip(CLOCK_IDS, clocks):
+            if value is not None:
+                pi_gpu[f'{clk}_clock'] = value[1]
+            else:
+                output = self._vcgencmd('measure_clock', clk)
+                match = re.search(r'frequency\(0\)=([0-9]+)', output or '')
+                pi_gpu[f'{clk}_clock'] = int(match.group(1)) if match else output
+
+        celsius = self._sysfs_temperature()
+        if celsius is None and temperature is not None:
+            celsius = temperature[1] / 1000
+        if celsius is not None:
+            pi_gpu['temperature'] = f"temp={celsius:.1f}'C"
+        else:
+            pi_gpu['temperature'] = self._vcgencmd('measure_temp')
+            match = re.search(r'temp=([0-9.]+)', pi_gpu['temperature'] or '')
+            celsius = float(match.group(1)) if match else None
+        pi_gpu['temperature_celsius'] = celsius
+
+        throttled_value = self._sysfs_throttled()
+        if throttled_value is None and throttled is not None:
+            throttled_value = throttled[0]
+        if throttled_value is not None:
+            pi_gpu['throttled'] = f'throttled=0x{throttled_value:x}'
+        else:
+            pi_gpu['throttled'] = self._vcgencmd('get_throttled')
+            match = re.search(r'0x([0-9a-fA-F]+)', pi_gpu['throttled'] or '')
+            throttled_value = int(match.group(1), 16) if match else None
+        pi_gpu['throttled_flags'] = decode_throttled(throttled_value) if throttled_value is not None else None
+
+        if voltage is not None:
+            volts = voltage[1] / 1e6
+            pi_gpu['voltage'] = f'volt={volts:.4f}V'
+        else:
+            pi_gpu['voltage'] = self._vcgencmd('measure_volts')
+            match = re.search(r'volt=([0-9.]+)', pi_gpu['voltage'] or '')
+            volts = float(match.group(1)) if match else None
+        pi_gpu['voltage_volts'] = volts
+        return pi_gpu
+
+    @staticmethod
+    def _gpu_type() -> str:
+        model = SystemMonitor.get_host_facts()['model'] or ''
+        if 'Raspberry Pi 5' in model or 'Compute Module 5' in model:
+            return 'VideoCore VII'
+        if 'Raspberry Pi 4' in model or 'Raspberry Pi 400' in model or 'Compute Module 4' in model:
+            return 'VideoCore VI'
+        return 'VideoCore IV'
+
+    @staticmethod
+    def _sysfs_temperature() -> Optional[float]:
+        try:
+            return float(SystemMonitor._read_file(SystemMonitor._sys_path('class/thermal/thermal_zone0/temp')).strip()) / 1000
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _sysfs_throttled() -> Optional[int]:
+        try:
+            return int(SystemMonitor._read_file(
+                SystemMonitor._sys_path('devices/platform/soc/soc:firmware/get_throttled')).strip(), 16)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _vcgencmd(*args: str) -> Optional[str]:
+        try:
+            result = SystemMonitor._run_command(['vcgencmd', *args], capture_output=True, text=True, timeout=2)
+        except (subprocess.SubprocessError, OSError):
+            return None
+        return result.stdout.strip() if result.returncode == 0 else None
+
+    def _mailbox(self, tags: List[Tuple[int, List[int]]]) -> Optional[List[Optional[List[int]]]]:
+        """Send several property tags in one mailbox call; returns each tag's values or None"""
+        if fcntl is None or self._mailbox_failed:
+            return None
+        if self._mailbox_fd is None:
+            try:
+                self._mailbox_fd = os.open(MAILBOX_DEVICE, os.O_RDWR)
+            except OSError:
+                self._mailbox_failed = True
+                return None
+
+        words = [0, 0]
+        offsets = []
+        for tag, values in tags:
+            words += [tag, len(values) * 4, 0]
+            offsets.append((len(words), len(values)))
+            words += values
+        words.append(0)
+        words[0] = len(words) * 4
+        buffer = array.array('I', words)
+        try:
+            metrics.increment('mailbox_calls')
+            fcntl.ioctl(self._mailbox_fd, IOCTL_MBOX_PROPERTY, buffer, True)
+        except OSError:
+            return None
+        if buffer[1] != MAILBOX_SUCCESS:
+            return None
+        return [list(buffer[offset:offset + count]) if buffer[offset - 1] & MAILBOX_SUCCESS else None
+                for offset, count in offsets]
+
+
+videocore = VideoCoreCollector()
@@ -0,0 +1,160 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.utils.collectors import COST_CHEAP, COST_EXPENSIVE, COST_MODERATE
+from src.utils.instrumentation import metrics
+
+COST_CLASSES = (COST_CHEAP, COST_MODERATE, COST_EXPENSIVE)
+
+# Per-client buckets kept; the least recently used are dropped beyond this
+MAX_BUCKETS = 10000
+
+
+def cost(cost_class: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Mark a view function with the cost class its requests are charged to (default: cheap)"""
+    if cost_class not in COST_CLASSES:
+        raise ValueError(f'Unknown cost class: {cost_class!r}')
+
+    def decorator(view: Callable[..., Any]) -> Callable[..., Any]:
+        view.cost_class = cost_class
+        return view
+    return decorator
+
+
+def parse_budgets(text: str) -> Dict[str, Tuple[float, float]]:
+    """Parse ``class=rate/burst`` pairs, e.g. ``expensive=0.5/5,moderate=5/20``
+
+    ``rate`` is tokens (requests) per second and ``burst`` the bucket size;
+    without ``/burst`` the bucket holds one second's worth (at least 1).
+    """
+    budgets = {}
+    for part in text.split(','):
+        if not part.strip():
+            continue
+        name, _, value = part.partition('=')
+        name = name.strip().lower()
+        if name not in COST_CLASSES:
+            raise ValueError(f'Unknown cost class in rate limit: {name!r}')
+        rate, _, burst = value.partition('/')
+        rate = float(rate)
+        budgets[name] = (rate, float(burst) if burst.strip() else max(rate, 1.0))
+    return budgets
+
+
+class TokenBucket:
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Take one token; returns 0 on success, else seconds until one is available"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else math.inf
+
+
+class RateLimiter:
+    """Token buckets per client and cost class, plus an optional global bucket per class.
+
+    ``RATE_LIMITS`` sets each client's budget and ``RATE_LIMITS_GLOBAL`` the
+    budget shared by all clients, which is the hard cap on how much work
+    requests can make the monitor do. Both take ``class=rate/burst`` pairs
+    (see ``parse_budgets``); classes without a budget are not limited.
+    Clients are told apart by address, or by their ``RATE_LIMIT_KEY_HEADER``
+    (``X-API-Key``) when its value is one of ``RATE_LIMIT_KEYS``; unknown
+    keys are ignored, so inventing keys does not buy fresh buckets. At most
+    ``MAX_BUCKETS`` per-client buckets are kept, least recently used first
+    out.
+    """
+
+    def __init__(self):
+        self.client_budgets = parse_budgets(os.getenv('RATE_LIMITS', ''))
+        self.global_budgets = parse_budgets(os.getenv('RATE_LIMITS_GLOBAL', ''))
+        self.key_header = os.getenv('RATE_LIMIT_KEY_HEADER', 'X-API-Key')
+        self.keys = {key.strip() for key in os.getenv('RATE_LIMIT_KEYS', '').split(',') if key.strip()}
+        self._buckets: 'OrderedDict[Tuple[str, str], TokenBucket]' = OrderedDict()
+        self._global: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.client_budgets or self.global_budgets)
+
+    def client_key(self, api_key: Optional[str], address: Optional[str]) -> str:
+        """Bucket key for a request: its API key if configured, else its address"""
+        if api_key and api_key in self.keys:
+            return f'key:{api_key}'
+        return address or 'unknown'
+
+    def acquire(self, client: str, cost_class: str) -> float:
+        """Charge one request; returns 0 if allowed, else the seconds to wait before retrying"""
+        now = time.monotonic()
+        with self._lock:
+            waits = []
+            buckets = []
+            budget = self.client_budgets.get(cost_class)
+            if budget is not None:
+                key = (client, cost_class)
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = TokenBucket(budget[0], budget[1], now)
+                    if len(self._buckets) > MAX_BUCKETS:
+                        self._buckets.popitem(last=False)
+                else:
+                    self._buckets.move_to_end(key)
+                buckets.append(bucket)
+            budget = self.global_budgets.get(cost_class)
+            if budget is not None:
+                bucket = self._global.get(cost_class)
+                if bucket is None:
+                    bucket = self._global[cost_class] = TokenBucket(budget[0], budget[1], now)
+                buckets.append(bucket)
+            for bucket in buckets:
+                waits.append(bucket.take(now))
+            retry_after = max(waits, default=0.0)
+            if retry_after:
+                # Refund what was taken so a rejected request costs nothing
+                for bucket, wait in zip(buckets, waits):
+                    if not wait:
+                        bucket.tokens += 1
+        return retry_after
+
+
+rate_limiter = RateLimiter()
+
+
+def init_app(app) -> None:
+    """Reject requests over budget with 429 before they reach the view"""
+    from flask import jsonify, request
+
+    if not rate_limiter.enabled:
+        return
+
+    @app.before_request
+    def _rate_limit():
+        view = app.view_functions.get(request.endpoint)
+        cost_class = getattr(view, 'cost_class', COST_CHEAP)
+        # Behind a reverse proxy remote_addr is the client only with TRUSTED_PROXY_COUNT set
+        client = rate_limiter.client_key(request.headers.get(rate_limiter.key_header), request.remote_addr)
+        retry_after = rate_limiter.acquire(client, cost_class)
+        if retry_after:
+            metrics.increment('rate_limited')
+            response = jsonify({
+                'error': 'Rate limit exceeded',
+                'cost_class': cost_class,
+                'retry_after': round(retry_after, 3)
+            })
+            response.status_code = 429
+            response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+            return response
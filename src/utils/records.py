@@ -0,0 +1,176 @@
+import sys
+from typing import Any, Dict, Optional, Tuple
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class ProcessRecord:
+    """Compact per-process record; the API dict is built by ``to_dict``
+
+    I/O rates, the fd count and GPU usage are ``None`` when they could not
+    be read (e.g. another user's process without root).
+    """
+
+    __slots__ = ('pid', 'name', 'username', 'status', 'create_time',
+                 'rss', 'vms', 'memory_percent', 'cpu_percent', 'num_threads',
+                 'read_rate', 'write_rate', 'num_fds', 'gpu_memory', 'gpu_utilization')
+
+    def __init__(self, pid: int, name: Optional[str], username: Optional[str], status: Optional[str],
+                 create_time: Optional[float], rss: int, vms: int, memory_percent: float,
+                 cpu_percent: float, num_threads: int, read_rate: Optional[float] = None,
+                 write_rate: Optional[float] = None, num_fds: Optional[int] = None,
+                 gpu_memory: Optional[int] = None, gpu_utilization: Optional[float] = None):
+        self.pid = pid
+        # Names, usernames and statuses repeat across thousands of processes
+        self.name = _intern(name)
+        self.username = _intern(username)
+        self.status = _intern(status)
+        self.create_time = create_time
+        self.rss = rss
+        self.vms = vms
+        self.memory_percent = memory_percent
+        self.cpu_percent = cpu_percent
+        self.num_threads = num_threads
+        self.read_rate = read_rate
+        self.write_rate = write_rate
+        self.num_fds = num_fds
+        self.gpu_memory = gpu_memory
+        self.gpu_utilization = gpu_utilization
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ProcessRecord':
+        """Rebuild a record from its ``to_dict`` form"""
+        io = data.get('io') or {}
+        gpu = data.get('gpu') or {}
+        return cls(data['pid'], data['name'], data['username'], data['status'], data['create_time'],
+                   data['memory_info']['rss'], data['memory_info']['vms'], data['memory_percent'],
+                   data['cpu_percent'], data['cpu_info']['num_threads'], io.get('read_bytes_per_sec'),
+                   io.get('write_bytes_per_sec'), data.get('num_fds'), gpu.get('memory_used'),
+                   gpu.get('utilization'))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'pid': self.pid,
+            'name': self.name,
+            'username': self.username,
+            'status': self.status,
+            'create_time': self.create_time,
+            'memory_info': {
+                'rss': self.rss,
+                'vms': self.vms,
+                'percent': self.memory_percent
+            },
+            'cpu_info': {
+                'percent': self.cpu_percent,
+                'num_threads': self.num_threads
+            },
+            'io': {
+                'read_bytes_per_sec': self.read_rate,
+                'write_bytes_per_sec': self.write_rate
+            },
+            'gpu': {
+                'memory_used': self.gpu_memory,
+                'utilization': self.gpu_utilization
+            } if self.gpu_memory is not None or self.gpu_utilization is not None else None,
+            'num_fds': self.num_fds,
+            'cpu_percent': self.cpu_percent,
+            'memory_percent': self.memory_percent
+        }
+
+
+class PartitionRecord:
+    """Compact mounted-partition record"""
+
+    __slots__ = ('device', 'mountpoint', 'filesystem', 'total', 'used', 'free', 'percent')
+
+    def __init__(self, device: str, mountpoint: str, filesystem: str, total: int, used: int, free: int, percent: float):
+        self.device = _intern(device)
+        self.mountpoint = _intern(mountpoint)
+        self.filesystem = _intern(filesystem)
+        self.total = total
+        self.used = used
+        self.free = free
+        self.percent = percent
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'mountpoint': self.mountpoint,
+            'filesystem': self.filesystem,
+            'total': self.total,
+            'used': self.used,
+            'free': self.free,
+            'percent': self.percent
+        }
+
+
+class InterfaceRecord:
+    """Compact network interface record.
+
+    ``addresses`` holds ``(family, address, netmask, broadcast, ptp)`` tuples and
+    ``stats`` an ``(isup, duplex, speed, mtu)`` tuple, or ``None`` when psutil
+    has no stats for the interface.
+    """
+
+    __slots__ = ('name', 'addresses', 'stats')
+
+    def __init__(self, name: str, addresses: Tuple[Tuple[Any, ...], ...], stats: Optional[Tuple[Any, ...]]):
+        self.name = _intern(name)
+        self.addresses = addresses
+        self.stats = stats
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'addresses': [{
+                'family': family,
+                'address': address,
+                'netmask': netmask,
+                'broadcast': broadcast,
+                'ptp': ptp
+            } for family, address, netmask, broadcast, ptp in self.addresses],
+            'stats': {
+                'isup': self.stats[0],
+                'duplex': self.stats[1],
+                'speed': self.stats[2],
+                'mtu': self.stats[3]
+            } if self.stats is not None else {}
+        }
+
+
+_MISSING = object()
+
+
+class GpuRecord:
+    """Compact discrete GPU record; fields a backend does not report are left out of ``to_dict``"""
+
+    __slots__ = ('id', 'name', 'memory_total', 'memory_used', 'memory_free',
+                 'temperature', 'utilization', 'source', 'frequency')
+
+    def __init__(self, **fields: Any):
+        for slot in self.__slots__:
+            value = fields.pop(slot, _MISSING)
+            setattr(self, slot, _intern(value) if slot in ('name', 'source') else value)
+        if fields:
+            raise TypeError(f'Unknown GPU fields: {", ".join(fields)}')
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__ if getattr(self, slot) is not _MISSING}
+
+
+def materialize(value: Any) -> Any:
+    """Turn records (recursively) into the plain dicts the API returns"""
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {key: materialize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [materialize(item) for item in value]
+    return value
+
+
+def json_default(value: Any) -> Any:
+    """``default`` hook for ``json.dumps`` that serializes records"""
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
@@ -0,0 +1,157 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from src.utils.collectors import registry
+
+
+class Sampler:
+    """Background thread that periodically samples system metrics.
+
+    Each sample is a dict keyed by collector name (``cpu``, ``memory``,
+    ``pressure``, ``disk``, ``network``, ``temperatures`` and ``gpu`` by
+    default). Every tick asks the collector registry for those values, so
+    expensive collectors are only re-run when their own refresh interval has passed. Samples are
+    kept in a bounded history and handed to every registered listener, and
+    streaming subscribers (the SSE endpoint) receive them as ``sample`` events
+    alongside anything else published, such as alert firings. Ticks are
+    ``interval`` apart unless a scheduler chooses otherwise.
+    """
+
+    def __init__(self):
+        self.interval = float(os.getenv('SAMPLER_INTERVAL', 2))
+        self.collectors = [name.strip() for name in os.getenv(
+            'SAMPLER_COLLECTORS', 'cpu,memory,pressure,disk,network,temperatures,gpu').split(',') if name.strip()]
+        self.history = deque(maxlen=int(os.getenv('SAMPLER_HISTORY_SIZE', 360)))
+        # When set, samples come from this callable instead of the collectors
+        # (None skips the tick); see src/utils/shared_snapshot.py
+        self.source: Optional[Callable[[], Optional[Dict[str, Any]]]] = None
+        # When set, picks the interval after each tick and may add collectors;
+        # see src/utils/adaptive.py
+        self.scheduler = None
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._subscribers: List[queue.Queue] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Call ``listener(sample)`` after every sample"""
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    def subscribe(self) -> queue.Queue:
+        """Return a queue that receives ``(event, data)`` tuples"""
+        subscriber = queue.Queue(maxsize=int(os.getenv('SAMPLER_SUBSCRIBER_QUEUE', 100)))
+        with self._lock:
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue) -> None:
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def publish(self, event: str, data: Any) -> None:
+        """Send an event to every subscriber, dropping it for slow ones"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait((event, data))
+            except queue.Full:
+                pass
+
+    def start(self) -> None:
+        """Start the sampling thread (no-op if already running)"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the sampling thread"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 5)
+        self._thread = None
+
+    def wake(self) -> None:
+        """Cut the current wait short so the next tick happens now"""
+        self._wake.set()
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Return the most recent sample, if any"""
+        with self._lock:
+            return self.history[-1] if self.history else None
+
+    def recent(self, name: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """``timestamp``, ``time`` and the value of collector ``name`` from the latest samples that have it"""
+        with self._lock:
+            history = list(self.history)
+        entries = [{'timestamp': sample.get('timestamp'), 'time': sample.get('time'), name: sample[name]}
+                   for sample in history if name in sample]
+        return entries[-limit:] if limit else entries
+
+    def sample(self) -> Optional[Dict[str, Any]]:
+        """Take one sample from the collectors that are due"""
+        if self.source is not None:
+            return self.source()
+        sample = {
+            'timestamp': datetime.now().isoformat(),
+            'time': time.time()
+        }
+        names = self.collectors if self.scheduler is None else self.scheduler.collectors(self.collectors)
+        for name in names:
+            try:
+                sample.update(registry.collect([name]))
+            except Exception:
+                continue
+        return sample
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            cpu_started = time.thread_time()
+            try:
+                sample = self.sample()
+            except Exception:
+                sample = None
+            if sample is not None:
+                with self._lock:
+                    self.history.append(sample)
+                    listeners = list(self._listeners)
+                for listener in listeners:
+                    try:
+                        listener(sample)
+                    except Exception:
+                        pass
+                self.publish('sample', sample)
+            interval = self.interval
+            if self.scheduler is not None and self.source is None:
+                try:
+                    interval = self.scheduler.next_interval(self, sample, time.thread_time() - cpu_started)
+                except Exception:
+                    pass
+            self._wake.wait(max(0.0, interval - (time.monotonic() - started)))
+            self._wake.clear()
+
+
+sampler = Sampler()
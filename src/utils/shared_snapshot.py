@@ -0,0 +1,288 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from src.utils.instrumentation import metrics
+from src.utils.records import json_default
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+MAGIC = b'RSSHM001'
+# magic, writer pid, sequence, written at, payload length, payload crc32
+HEADER = struct.Struct('<8sIQdII')
+HEADER_SIZE = 64
+SEQUENCE_OFFSET = 12
+SEQUENCE = struct.Struct('<Q')
+# After the header fields: when a reader last had stream subscribers
+SUBSCRIBED_OFFSET = 40
+SUBSCRIBED = struct.Struct('<d')
+INDEX_LENGTH = struct.Struct('<I')
+READ_ATTEMPTS = 20
+
+
+class SharedSnapshot:
+    """Latest sampler sample shared between processes through a memory-mapped file.
+
+    When ``SHARED_SNAPSHOT_PATH`` is set, the first process to take the lock
+    next to the file becomes the writer: it runs the collectors and publishes
+    every sample. Every other process (e.g. the other Gunicorn workers)
+    only reads, so collection cost does not grow with the number of
+    workers and all of them report the same numbers. When the writer exits
+    its lock is released and the next reader to notice takes over.
+
+    The header is a seqlock: the writer makes the sequence odd, writes the
+    payload, then makes it even again, and a reader retries if the sequence
+    changed while it copied. A CRC guards against reordered stores. Readers
+    copy a sample once per new sequence number and hand out the parsed
+    collector values from that copy, so requests themselves never touch the
+    collectors or the file. Treat returned values as read-only.
+
+    ``SHARED_SNAPSHOT_COLLECTORS`` (``processes`` by default) are published
+    next to each sample but are not part of it: they stay out of the
+    sampler history, the stream and the persisted ring, and readers only
+    decode them when a request asks for them.
+    """
+
+    def __init__(self):
+        self.path = os.getenv('SHARED_SNAPSHOT_PATH', '').strip() or None
+        self.size = int(os.getenv('SHARED_SNAPSHOT_SIZE', 8 * 1024 * 1024))
+        self.poll_interval = float(os.getenv('SHARED_SNAPSHOT_POLL', 0.25))
+        self.max_age = float(os.getenv('SHARED_SNAPSHOT_MAX_AGE', 3 * float(os.getenv('SAMPLER_INTERVAL', 2)) + 5))
+        self.collectors = [name.strip() for name in os.getenv(
+            'SHARED_SNAPSHOT_COLLECTORS', 'processes').split(',') if name.strip()]
+        self.writer = False
+        self._sampler = None
+        self._on_writer: Optional[Callable[[], None]] = None
+        self._sampler_interval: Optional[float] = None
+        self._pid: Optional[int] = None
+        self._map: Optional[mmap.mmap] = None
+        self._lock_file = None
+        self._lock = threading.Lock()
+        # (sequence, written_at, index, payload) of the last sample read
+        self._current = None
+        # Segments of the current sample decoded so far, as JSON and after convert
+        self._decoded: Dict[str, Any] = {}
+        self._values: Dict[str, Any] = {}
+        self._mirrored: Optional[int] = None
+        # name -> (value, encoded) from the last publish; collectors that are
+        # not due hand back the same object, which is not encoded again
+        self._encoded: Dict[str, Any] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def attach(self, sampler, on_writer: Optional[Callable[[], None]] = None) -> None:
+        """Share ``sampler``; ``on_writer`` runs in whichever process becomes the writer.
+
+        The role is only decided by ``join`` in the process that serves
+        requests, so an app created before Gunicorn forks its workers
+        (``--preload``) still ends up with one writer.
+        """
+        self._sampler = sampler
+        self._on_writer = on_writer
+
+    def join(self) -> None:
+        """Take the writer or reader role in this process (once per process)"""
+        if not self.enabled or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self.writer = False
+            self._map = self._lock_file = None
+            self._current = None
+            self._open()
+            self._sampler_interval = self._sampler.interval
+            if not self._claim():
+                # Readers mirror the writer's samples so listeners and the stream keep working
+                self._sampler.source = self._mirror
+                self._sampler.interval = min(self._sampler.interval, self.poll_interval)
+        self._sampler.start()
+
+    def get(self, name: str, compute: Callable[[], Any], convert: Optional[Callable[[Any], Any]] = None) -> Any:
+        """The shared value of collector ``name``, or ``compute()`` when there is none
+
+        ``convert`` turns the decoded JSON back into what ``compute`` returns
+        and is applied once per sample. ``compute()`` runs without the lock,
+        so a slow local collection does not hold up other requests.
+        """
+        if not self.enabled:
+            return compute()
+        with self._lock:
+            fresh = self._refresh() and time.time() - self._current[1] <= self.max_age
+            if fresh:
+                if name in self._values:
+                    return self._values[name]
+                value = self._decode(name)
+                if value is not None:
+                    self._values[name] = convert(value) if convert is not None else value
+                    return self._values[name]
+        return compute()
+
+    def publish(self, sample: Dict[str, Any]) -> None:
+        """Sampler listener in the writer: publish ``sample`` under the seqlock"""
+        if self._map is None:
+            return
+        from src.utils.collectors import registry
+
+        values = dict(sample)
+        for name in self.collectors:
+            try:
+                # Cached by the registry between refreshes, so usually not re-run
+                values.update(registry.collect([name]))
+            except Exception:
+                continue
+        with metrics.timer('shared_snapshot', 'publish'):
+            index = {'timestamp': sample.get('timestamp'), 'time': sample.get('time'), 'segments': {}}
+            chunks = []
+            offset = 0
+            for name, value in values.items():
+                if name in ('timestamp', 'time'):
+                    continue
+                cached = self._encoded.get(name)
+                if cached is not None and cached[0] is value:
+                    data = cached[1]
+                else:
+                    data = json.dumps(value, default=json_default, separators=(',', ':')).encode()
+                    self._encoded[name] = (value, data)
+                index['segments'][name] = [offset, len(data)]
+                chunks.append(data)
+                offset += len(data)
+            head = json.dumps(index, separators=(',', ':')).encode()
+            payload = INDEX_LENGTH.pack(len(head)) + head + b''.join(chunks)
+            if HEADER_SIZE + len(payload) > len(self._map):
+                metrics.increment('shared_snapshot_oversized')
+                return
+
+            # Odd while the payload is being replaced (it may already be odd
+            # if a previous writer died mid-write)
+            writing = SEQUENCE.unpack_from(self._map, SEQUENCE_OFFSET)[0] | 1
+            SEQUENCE.pack_into(self._map, SEQUENCE_OFFSET, writing)
+            self._map[HEADER_SIZE:HEADER_SIZE + len(payload)] = payload
+            HEADER.pack_into(self._map, 0, MAGIC, os.getpid(), writing, sample.get('time') or time.time(),
+                             len(payload), zlib.crc32(payload))
+            SEQUENCE.pack_into(self._map, SEQUENCE_OFFSET, writing + 1)
+
+    def read_sample(self, names: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+        """The latest sample with the segments in ``names`` decoded (default: all but
+        ``SHARED_SNAPSHOT_COLLECTORS``), or None when nothing is shared"""
+        with self._lock:
+            if not self._refresh():
+                return None
+            sequence, _, index, _ = self._current
+            if names is None:
+                names = [name for name in index['segments'] if name not in self.collectors]
+            sample = {'timestamp': index['timestamp'], 'time': index['time'], 'sequence': sequence}
+            for name in names:
+                value = self._decode(name)
+                if value is not None:
+                    sample[name] = value
+        return sample
+
+    def remote_subscribers(self) -> bool:
+        """In the writer: whether another worker has had stream subscribers within the last second or so"""
+        if not self.writer or self._map is None:
+            return False
+        subscribed = SUBSCRIBED.unpack_from(self._map, SUBSCRIBED_OFFSET)[0]
+        return time.time() - subscribed <= max(1.0, 4 * self.poll_interval)
+
+    def _mirror(self) -> Optional[Dict[str, Any]]:
+        """Sampler source in readers: each new writer sample once; takes over if the writer is gone"""
+        if self._claim():
+            return None
+        if self._sampler.subscriber_count and self._map is not None:
+            # Keeps the writer's adaptive scheduler from idling while this worker streams
+            SUBSCRIBED.pack_into(self._map, SUBSCRIBED_OFFSET, time.time())
+        with self._lock:
+            if not self._refresh() or self._current[0] == self._mirrored:
+                return None
+        sample = self.read_sample()
+        if sample is None:
+            return None
+        sequence = sample.pop('sequence')
+        if sequence == self._mirrored:
+            return None
+        self._mirrored = sequence
+        return sample
+
+    def _claim(self) -> bool:
+        """Try to become the writer; returns True if this process is (now) the writer"""
+        if self.writer:
+            return True
+        if fcntl is None:
+            return False
+        try:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False
+        self.writer = True
+        self._sampler.source = None
+        self._sampler.interval = self._sampler_interval
+        self._sampler.add_listener(self.publish)
+        if self._on_writer is not None:
+            self._on_writer()
+        return True
+
+    def _decode(self, name: str) -> Any:
+        """Segment ``name`` of the current sample as JSON, decoded once per sample (lock held)"""
+        if name not in self._decoded:
+            segment = self._current[2]['segments'].get(name)
+            if segment is None:
+                return None
+            offset, length = segment
+            self._decoded[name] = json.loads(self._current[3][offset:offset + length])
+        return self._decoded[name]
+
+    def _open(self) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = open(self.path + '.lock', 'a+b')
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < self.size:
+                os.ftruncate(fd, self.size)
+            self._map = mmap.mmap(fd, 0)
+        finally:
+            os.close(fd)
+
+    def _refresh(self) -> bool:
+        """Make sure ``_current`` holds the newest consistent sample; False if there is none"""
+        if self._map is None:
+            self._open()
+        for _ in range(READ_ATTEMPTS):
+            sequence = SEQUENCE.unpack_from(self._map, SEQUENCE_OFFSET)[0]
+            if self._current is not None and sequence == self._current[0]:
+                return True
+            if sequence == 0:
+                return False
+            if sequence % 2:
+                time.sleep(0)
+                continue
+            magic, _, _, written_at, length, crc = HEADER.unpack_from(self._map, 0)
+            payload = self._map[HEADER_SIZE:HEADER_SIZE + length]
+            if SEQUENCE.unpack_from(self._map, SEQUENCE_OFFSET)[0] != sequence:
+                continue
+            if magic != MAGIC or zlib.crc32(payload) != crc:
+                time.sleep(0)
+                continue
+            head_length = INDEX_LENGTH.unpack_from(payload, 0)[0]
+            index = json.loads(payload[INDEX_LENGTH.size:INDEX_LENGTH.size + head_length])
+            self._current = (sequence, written_at, index, payload[INDEX_LENGTH.size + head_length:])
+            self._decoded = {}
+            self._values = {}
+            return True
+        metrics.increment('shared_snapshot_retries')
+        return self._current is not None
+
+
+shared_snapshot = SharedSnapshot()
@@ -0,0 +1,65 @@
+import functools
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from src.utils.instrumentation import metrics
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one execution.
+
+    The first caller runs the function; callers arriving while it runs wait
+    for it and get the same result (or exception). Nothing is cached once
+    the call returns, so the next caller starts a fresh collection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            metrics.increment('coalesced_calls')
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+single_flight = SingleFlight()
+
+
+def coalesced(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Decorator: concurrent calls with equal arguments share one execution of ``func``
+
+    Callers receive the same object, so results must be treated as read-only.
+    """
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        key = (func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+        return single_flight.do(key, func, *args, **kwargs)
+    return wrapper
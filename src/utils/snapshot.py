@@ -0,0 +1,253 @@
+import atexit
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.baselines import baselines
+from src.utils.instrumentation import metrics
+from src.utils.records import json_default
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+MAGIC = b'RSSNAP01'
+# magic, history slots, history slot size, cpu baseline slot size, process baseline slot size
+FILE_HEADER = struct.Struct('<8sIIII')
+FILE_HEADER_SIZE = 64
+# sequence, payload length, payload crc32
+SLOT_HEADER = struct.Struct('<QII')
+CPU_BASELINE_SIZE = 64 * 1024
+
+
+class SnapshotStore:
+    """Persists sampler history and counter baselines in a memory-mapped file.
+
+    The file has a fixed layout: a header, two alternating slots for the
+    CPU baseline, two for the process baseline, and a ring of
+    ``SAMPLER_HISTORY_SIZE`` history slots. Every write goes to the slot
+    after the last one written, payload first and then a header carrying a
+    sequence number and CRC, so a torn write only ever loses the record
+    being written: on load, slots whose CRC does not match are skipped and
+    the rest are ordered by sequence number. Nothing is fsynced while
+    sampling; the page cache survives a crash of the server, and the map is
+    flushed on a clean shutdown.
+
+    Only one process writes the file: whoever holds the lock on
+    ``snapshot.bin.lock``. Others (``--once``, or further workers that do
+    not share a snapshot) restore from it read-only and do not persist.
+    """
+
+    def __init__(self):
+        self.directory = os.getenv('SNAPSHOT_DIR', '').strip() or None
+        self.slot_size = int(os.getenv('SNAPSHOT_SLOT_SIZE', 16 * 1024))
+        self.baseline_size = int(os.getenv('SNAPSHOT_BASELINE_SIZE', 1024 * 1024))
+        self.slots = 0
+        self.path: Optional[str] = None
+        self._file = None
+        self._lock_file = None
+        self._map: Optional[mmap.mmap] = None
+        self.writer = False
+        self._lock = threading.Lock()
+        # Last sequence number written to each region
+        self._sequences = {'history': 0, 'cpu': 0, 'processes': 0}
+        self._cpu_version = -1
+        self._processes_version = -1
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def attach(self, sampler) -> None:
+        """Restore history and baselines into ``sampler``, then persist every new sample"""
+        if not self.enabled or self._map is not None:
+            return
+        self.slots = sampler.history.maxlen or int(os.getenv('SAMPLER_HISTORY_SIZE', 360))
+        samples, cpu_state, processes_state = self.open()
+        if cpu_state is not None:
+            baselines.restore_cpu(cpu_state)
+        if processes_state is not None:
+            baselines.restore_processes(processes_state)
+        with sampler._lock:
+            restored = samples + list(sampler.history)
+            sampler.history.clear()
+            sampler.history.extend(restored)
+        if self.writer:
+            sampler.add_listener(self.record)
+            atexit.register(self.close)
+
+    def open(self) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Map the snapshot file, creating it if needed, and return what it holds
+
+        Without the file lock it is only read, and left as it is.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, 'snapshot.bin')
+        samples, cpu_state, processes_state = [], None, None
+        geometry = (self.slots, self.slot_size, CPU_BASELINE_SIZE, self.baseline_size)
+        with self._lock:
+            self.writer = self._take_lock()
+            if not self.writer:
+                existing = self._map_file(create=False, writable=False)
+                self._close_map()
+                if existing is None:
+                    return [], None, None
+                _, records = existing
+                samples = [sample for _, sample in sorted(records['history'])]
+                return (samples[-self.slots:], records['cpu'][1] if records['cpu'] else None,
+                        records['processes'][1] if records['processes'] else None)
+            existing = self._map_file(create=False)
+            if existing is not None:
+                found, records = existing
+                samples = [sample for _, sample in sorted(records['history'])]
+                cpu_state = records['cpu'][1] if records['cpu'] else None
+                processes_state = records['processes'][1] if records['processes'] else None
+                self._sequences['history'] = max([sequence for sequence, _ in records['history']], default=0)
+                for name in ('cpu', 'processes'):
+                    self._sequences[name] = records[name][0] if records[name] else 0
+                if found != geometry:
+                    # The layout changed (e.g. SAMPLER_HISTORY_SIZE); start a new file
+                    # and carry over what fits
+                    self._close_map()
+                    os.replace(self.path, self.path + '.old')
+                    existing = None
+            if existing is None:
+                self._map_file(create=True)
+                self._sequences['history'] = 0
+                for sample in samples[-self.slots:]:
+                    self._append_sample(sample)
+                if os.path.exists(self.path + '.old'):
+                    os.remove(self.path + '.old')
+        return samples[-self.slots:], cpu_state, processes_state
+
+    def record(self, sample: Dict[str, Any]) -> None:
+        """Sampler listener: persist the sample and any baseline that changed"""
+        with self._lock:
+            if self._map is None:
+                return
+            with metrics.timer('snapshot', 'write'):
+                self._append_sample(sample)
+                if baselines.cpu_version != self._cpu_version:
+                    self._cpu_version = baselines.cpu_version
+                    self._write_baseline('cpu', 0, CPU_BASELINE_SIZE, baselines.export_cpu())
+                if baselines.processes_version != self._processes_version:
+                    self._processes_version = baselines.processes_version
+                    self._write_baseline('processes', 2 * CPU_BASELINE_SIZE, self.baseline_size,
+                                         baselines.export_processes())
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_map()
+            if self._lock_file is not None:
+                # Closing the descriptor releases the lock
+                self._lock_file.close()
+                self._lock_file = None
+            self.writer = False
+
+    def _append_sample(self, sample: Dict[str, Any]) -> None:
+        self._sequences['history'] += 1
+        sequence = self._sequences['history']
+        self._write_slot(self._history_offset() + (sequence % self.slots) * self.slot_size,
+                         self.slot_size, sequence, sample)
+
+    def _write_baseline(self, name: str, region: int, size: int, state: Optional[Dict[str, Any]]) -> None:
+        if state is None:
+            return
+        self._sequences[name] += 1
+        sequence = self._sequences[name]
+        # Alternate between the two slots so the previous baseline survives a torn write
+        self._write_slot(FILE_HEADER_SIZE + region + (sequence % 2) * size, size, sequence, state)
+
+    def _write_slot(self, offset: int, size: int, sequence: int, value: Any) -> bool:
+        payload = zlib.compress(json.dumps(value, default=json_default, separators=(',', ':')).encode(), 1)
+        if len(payload) > size - SLOT_HEADER.size:
+            metrics.increment('snapshot_oversized')
+            return False
+        start = offset + SLOT_HEADER.size
+        self._map[start:start + len(payload)] = payload
+        self._map[offset:start] = SLOT_HEADER.pack(sequence, len(payload), zlib.crc32(payload))
+        return True
+
+    def _history_offset(self) -> int:
+        return FILE_HEADER_SIZE + 2 * CPU_BASELINE_SIZE + 2 * self.baseline_size
+
+    def _take_lock(self) -> bool:
+        """Become the only process writing the file; False if another one already is"""
+        if self._lock_file is not None:
+            return True
+        lock_file = open(self.path + '.lock', 'a+b')
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return False
+        self._lock_file = lock_file
+        return True
+
+    def _map_file(self, create: bool, writable: bool = True):
+        """Map the snapshot file; when reading an existing one, return its geometry and valid records"""
+        if create:
+            size = self._history_offset() + self.slots * self.slot_size
+            with open(self.path, 'wb') as f:
+                f.truncate(size)
+                f.write(FILE_HEADER.pack(MAGIC, self.slots, self.slot_size, CPU_BASELINE_SIZE, self.baseline_size))
+        elif not os.path.exists(self.path):
+            return None
+        self._file = open(self.path, 'r+b' if writable else 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file
+            self._close_map()
+            return None
+        if create:
+            return None
+
+        magic, slots, slot_size, cpu_size, baseline_size = FILE_HEADER.unpack_from(self._map, 0)
+        expected = FILE_HEADER_SIZE + 2 * cpu_size + 2 * baseline_size + slots * slot_size
+        if magic != MAGIC or not slots or len(self._map) < expected:
+            self._close_map()
+            return None
+        cpu = [self._read_slot(FILE_HEADER_SIZE + index * cpu_size, cpu_size) for index in range(2)]
+        processes_offset = FILE_HEADER_SIZE + 2 * cpu_size
+        processes = [self._read_slot(processes_offset + index * baseline_size, baseline_size) for index in range(2)]
+        history_offset = processes_offset + 2 * baseline_size
+        history = [self._read_slot(history_offset + index * slot_size, slot_size) for index in range(slots)]
+        records = {
+            'cpu': max(filter(None, cpu), default=None, key=lambda record: record[0]),
+            'processes': max(filter(None, processes), default=None, key=lambda record: record[0]),
+            'history': [record for record in history if record is not None]
+        }
+        return (slots, slot_size, cpu_size, baseline_size), records
+
+    def _read_slot(self, offset: int, size: int) -> Optional[Tuple[int, Any]]:
+        sequence, length, crc = SLOT_HEADER.unpack_from(self._map, offset)
+        if not sequence or length > size - SLOT_HEADER.size:
+            return None
+        start = offset + SLOT_HEADER.size
+        payload = self._map[start:start + length]
+        if zlib.crc32(payload) != crc:
+            return None
+        try:
+            return sequence, json.loads(zlib.decompress(payload))
+        except (zlib.error, ValueError):
+            return None
+
+    def _close_map(self) -> None:
+        if self._map is not None:
+            if self.writer:
+                self._map.flush()
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+snapshot_store = SnapshotStore()
@@ -5,21 +5,47 @@ import subprocess
 import json
 import time
 from datetime import datetime
-from typing import Dict, List, Any, Optional
-import re
+from typing import Dict, List, Any, Optional, Tuple
+import sys
+from src.utils.baselines import baselines
+from src.utils.instrumentation import count_file_read, metrics, timed
+from src.utils.records import GpuRecord, InterfaceRecord, PartitionRecord, ProcessRecord, materialize
+from src.utils.shared_snapshot import shared_snapshot
+from src.utils.single_flight import coalesced
 
+# Expensive getters are @coalesced: concurrent callers share one collection.
+# Getters behind a registry collector are @timed under that collector's name.
 class SystemMonitor:
+    # Root of the sysfs tree; procfs reads follow psutil.PROCFS_PATH, so both
+    # can be pointed at a synthetic tree (see benchmarks/fixtures.py)
+    SYSFS_PATH = os.getenv('SYSFS_PATH', '/sys')
+    # Filled in once by get_host_facts()
+    _host_facts: Optional[Dict[str, Any]] = None
+
     @staticmethod
-    def get_cpu_info() -> Dict[str, Any]:
-        """Get comprehensive CPU information"""
+    @coalesced
+    @timed('cpu')
+    def get_cpu_info(interval: Optional[float] = 1) -> Dict[str, Any]:
+        """Get comprehensive CPU information
+
+        Usage is measured against the shared counter baseline, so ``interval``
+        is only slept when there is no recent one (and the window is only
+        topped up to ``MIN_WINDOW`` when the baseline is that young with no
+        older one to fall back on). Pass ``interval=None`` to never block; a
+        cold call then reports zeros. The background sampler passes 0.1 (see
+        ``_collect_cpu``), which is only slept on a cold start.
+        """
+        cpu_usage_percent, cpu_usage_per_core = baselines.cpu_percent(interval)
+
+        facts = SystemMonitor.get_host_facts()
         cpu_info = {
-            'physical_cores': psutil.cpu_count(logical=False),
-            'total_cores': psutil.cpu_count(logical=True),
+            'physical_cores': facts['physical_cores'],
+            'total_cores': facts['total_cores'],
             'max_frequency': psutil.cpu_freq().max if psutil.cpu_freq() else None,
             'current_frequency': psutil.cpu_freq().current if psutil.cpu_freq() else None,
             'min_frequency': psutil.cpu_freq().min if psutil.cpu_freq() else None,
-            'cpu_usage_percent': psutil.cpu_percent(interval=1),
-            'cpu_usage_per_core': psutil.cpu_percent(interval=1, percpu=True),
+            'cpu_usage_percent': cpu_usage_percent,
+            'cpu_usage_per_core': cpu_usage_per_core,
             'cpu_times': {
                 'user': psutil.cpu_times().user,
                 'system': psutil.cpu_times().system,
@@ -51,6 +77,7 @@ class SystemMonitor:
         return cpu_info
     
     @staticmethod
+    @timed('memory')
     def get_memory_info() -> Dict[str, Any]:
         """Get comprehensive memory information"""
         memory = psutil.virtual_memory()
@@ -70,9 +97,23 @@ class SystemMonitor:
             }
         }
     
+    @staticmethod
+    @timed('memory_detailed')
+    def get_detailed_memory_info() -> Dict[str, Any]:
+        """Get page cache, slab, dirty/writeback, hugepage and NUMA breakdowns and paging rates"""
+        from src.utils.memory import memory
+        return memory.collect()
+
     @staticmethod
     def get_disk_info() -> Dict[str, Any]:
         """Get comprehensive disk information"""
+        return materialize(SystemMonitor.get_disk_records())
+
+    @staticmethod
+    @coalesced
+    @timed('disk')
+    def get_disk_records() -> Dict[str, Any]:
+        """Get disk information with partitions as compact records"""
         disk_partitions = psutil.disk_partitions()
         disk_usage = {}
         disk_io = psutil.disk_io_counters()
@@ -80,14 +121,10 @@ class SystemMonitor:
         for partition in disk_partitions:
             try:
                 usage = psutil.disk_usage(partition.mountpoint)
-                disk_usage[partition.device] = {
-                    'mountpoint': partition.mountpoint,
-                    'filesystem': partition.fstype,
-                    'total': usage.total,
-                    'used': usage.used,
-                    'free': usage.free,
-                    'percent': usage.percent
-                }
+                disk_usage[partition.device] = PartitionRecord(
+                    partition.device, partition.mountpoint, partition.fstype,
+                    usage.total, usage.used, usage.free, usage.percent
+                )
             except PermissionError:
                 continue
         
@@ -106,34 +143,27 @@ class SystemMonitor:
     @staticmethod
     def get_network_info() -> Dict[str, Any]:
         """Get comprehensive network information"""
+        return materialize(SystemMonitor.get_network_records())
+
+    @staticmethod
+    @timed('network')
+    def get_network_records() -> Dict[str, Any]:
+        """Get network information with interfaces as compact records"""
         network_io = psutil.net_io_counters()
         network_interfaces = psutil.net_if_addrs()
         network_stats = psutil.net_if_stats()
         
         interfaces = {}
         for interface_name, interface_addresses in network_interfaces.items():
-            interfaces[interface_name] = {
-                'addresses': [],
-                'stats': {}
-            }
-            
-            for address in interface_addresses:
-                interfaces[interface_name]['addresses'].append({
-                    'family': str(address.family),
-                    'address': address.address,
-                    'netmask': address.netmask,
-                    'broadcast': address.broadcast,
-                    'ptp': address.ptp
-                })
-            
+            addresses = tuple(
+                (sys.intern(str(address.family)), address.address, address.netmask, address.broadcast, address.ptp)
+                for address in interface_addresses
+            )
+            stats = None
             if interface_name in network_stats:
-                stats = network_stats[interface_name]
-                interfaces[interface_name]['stats'] = {
-                    'isup': stats.isup,
-                    'duplex': stats.duplex,
-                    'speed': stats.speed,
-                    'mtu': stats.mtu
-                }
+                nic = network_stats[interface_name]
+                stats = (nic.isup, nic.duplex, nic.speed, nic.mtu)
+            interfaces[interface_name] = InterfaceRecord(interface_name, addresses, stats)
         
         return {
             'interfaces': interfaces,
@@ -152,61 +182,190 @@ class SystemMonitor:
     @staticmethod
     def get_processes_info() -> List[Dict[str, Any]]:
         """Get information about all running processes"""
+        return [record.to_dict() for record in SystemMonitor.get_process_records()]
+
+    @staticmethod
+    @coalesced
+    @timed('processes')
+    def get_process_records() -> List[ProcessRecord]:
+        """Get all running processes as compact records"""
+        # CPU percentages and I/O rates are measured against the shared process
+        # baseline; only without one is a baseline taken and slept on first
+        if not baselines.has_processes():
+            counters = {}
+            for proc in psutil.process_iter(['create_time', 'cpu_times', 'io_counters']):
+                cpu_times = proc.info['cpu_times']
+                if cpu_times is not None:
+                    io = proc.info['io_counters']
+                    counters[proc.pid] = (proc.info['create_time'], cpu_times.user + cpu_times.system,
+                                          io.read_bytes if io else None, io.write_bytes if io else None)
+            baselines.update_processes(counters, time.time())
+            with metrics.timer('sleep', 'processes'):
+                time.sleep(0.1)
+
         processes = []
-        
-        # First pass: initialize CPU percentage calculations
-        for proc in psutil.process_iter(['pid', 'name', 'username', 'status', 'create_time']):
-            try:
-                # Initialize CPU percentage calculation (first call returns 0, second call gives actual value)
-                proc.cpu_percent()
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                continue
-        
-        # Small delay to allow for CPU percentage calculation
-        import time
-        time.sleep(0.1)
-        
-        # Second pass: collect actual process information
-        for proc in psutil.process_iter(['pid', 'name', 'username', 'status', 'create_time']):
+        counters = {}
+        for proc in psutil.process_iter(['pid', 'name', 'username', 'status', 'create_time', 'cpu_times',
+                                         'io_counters', 'num_fds']):
             try:
-                proc_info = proc.as_dict(attrs=['pid', 'name', 'username', 'status', 'create_time'])
-                
-                # Get CPU percentage with proper initialization
-                cpu_percent = proc.cpu_percent()
+                info = proc.info
+                cpu_times = info['cpu_times']
+                if cpu_times is not None:
+                    io = info['io_counters']
+                    counters[info['pid']] = (info['create_time'], cpu_times.user + cpu_times.system,
+                                             io.read_bytes if io else None, io.write_bytes if io else None)
                 
                 # Get memory information
                 memory_info = proc.memory_info()
                 memory_percent = proc.memory_percent()
                 
-                proc_info['memory_info'] = {
-                    'rss': memory_info.rss,
-                    'vms': memory_info.vms,
-                    'percent': memory_percent
-                }
-                proc_info['cpu_info'] = {
-                    'percent': cpu_percent,
-                    'num_threads': proc.num_threads()
-                }
-                proc_info['cpu_percent'] = cpu_percent
-                proc_info['memory_percent'] = memory_percent
-                
-                processes.append(proc_info)
+                processes.append(ProcessRecord(
+                    info['pid'], info['name'], info['username'], info['status'], info['create_time'],
+                    memory_info.rss, memory_info.vms, memory_percent, 0.0, proc.num_threads(),
+                    num_fds=info['num_fds']
+                ))
             except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
                 continue
         
+        rates = baselines.update_processes(counters, time.time())
+        gpu_usage = SystemMonitor._process_gpu_usage()
+        for record in processes:
+            record.cpu_percent, record.read_rate, record.write_rate = rates.get(record.pid, (0.0, None, None))
+            gpu = gpu_usage.get(record.pid)
+            if gpu is not None:
+                record.gpu_memory, record.gpu_utilization = gpu
+        
         return processes
+
+    @staticmethod
+    def _process_gpu_usage() -> Dict[int, Tuple[Optional[int], Optional[float]]]:
+        """Per-process GPU usage from the gpu.processes collector, refreshed on its own interval"""
+        from src.utils.collectors import registry
+
+        try:
+            return registry.collect_one('gpu.processes') or {}
+        except Exception:
+            return {}
+
+    @staticmethod
+    @timed('gpu.processes')
+    def get_process_gpu_usage() -> Dict[int, Tuple[Optional[int], Optional[float]]]:
+        """Map pid to ``(gpu memory bytes, utilisation percent)`` for processes using a GPU
+
+        NVIDIA memory comes from ``nvidia-smi --query-compute-apps``. DRM
+        drivers that publish client usage in ``/proc/<pid>/fdinfo``
+        (amdgpu, i915, v3d, panfrost, ...) give memory and busy time per
+        engine; utilisation is the busiest engine's share of the time since
+        the previous call.
+        """
+        usage: Dict[int, Tuple[Optional[int], Optional[float]]] = {}
+        for pid, memory in SystemMonitor._get_nvidia_process_memory().items():
+            usage[pid] = (memory, None)
+        memory, engines = SystemMonitor._read_drm_clients()
+        percents = baselines.update_gpu_engines(engines, time.time())
+        for pid, value in memory.items():
+            usage[pid] = ((usage.get(pid, (None, None))[0] or 0) + value, None)
+        for pid, percent in percents.items():
+            usage[pid] = (usage.get(pid, (None, None))[0], percent)
+        return usage
+
+    @staticmethod
+    def _get_nvidia_process_memory() -> Dict[int, int]:
+        """GPU memory in bytes per compute process, from nvidia-smi"""
+        try:
+            result = SystemMonitor._run_command(['nvidia-smi', '--query-compute-apps=pid,used_memory', '--format=csv,noheader,nounits'],
+                                  capture_output=True, text=True, timeout=10)
+            if result.returncode != 0:
+                return {}
+        except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
+            return {}
+
+        memory: Dict[int, int] = {}
+        for line in result.stdout.strip().split('\n'):
+            parts = [part.strip() for part in line.split(',')]
+            if len(parts) >= 2 and parts[0].isdigit() and parts[1].isdigit():
+                # A process with contexts on several GPUs is listed once per GPU
+                memory[int(parts[0])] = memory.get(int(parts[0]), 0) + int(parts[1]) * 1024 * 1024
+        return memory
+
+    @staticmethod
+    def _read_drm_clients() -> Tuple[Dict[int, int], Dict[Tuple[int, str], Dict[str, float]]]:
+        """Scan every process's DRM file descriptors for client memory and engine busy time"""
+        memory: Dict[int, int] = {}
+        engines: Dict[Tuple[int, str], Dict[str, float]] = {}
+        if not os.path.isdir('/dev/dri'):
+            return memory, engines
+        with metrics.timer('probe', 'drm fdinfo'):
+            for entry in os.listdir(psutil.PROCFS_PATH):
+                if not entry.isdigit():
+                    continue
+                pid = int(entry)
+                fd_dir = SystemMonitor._proc_path(f'{entry}/fd')
+                try:
+                    fds = os.listdir(fd_dir)
+                except OSError:
+                    continue
+                for fd in fds:
+                    try:
+                        if not os.readlink(os.path.join(fd_dir, fd)).startswith('/dev/dri/'):
+                            continue
+                        client = SystemMonitor._parse_drm_fdinfo(
+                            SystemMonitor._read_file(SystemMonitor._proc_path(f'{entry}/fdinfo/{fd}')))
+                    except OSError:
+                        continue
+                    # Several descriptors can share one client; count it once
+                    if client is None or (pid, client[0]) in engines:
+                        continue
+                    engines[(pid, client[0])] = client[1]
+                    if client[2] is not None:
+                        memory[pid] = memory.get(pid, 0) + client[2]
+        return memory, engines
+
+    @staticmethod
+    def _parse_drm_fdinfo(text: str) -> Optional[Tuple[str, Dict[str, float], Optional[int]]]:
+        """Parse DRM client usage stats into ``(client key, busy ns per engine, memory bytes)``"""
+        fields = {}
+        for line in text.splitlines():
+            key, _, value = line.partition(':')
+            fields[key.strip()] = value.strip()
+        if 'drm-client-id' not in fields:
+            return None
+
+        engines = {}
+        resident = legacy = None
+        for key, value in fields.items():
+            if key.startswith('drm-engine-capacity-'):
+                continue
+            if key.startswith('drm-engine-'):
+                name = key[len('drm-engine-'):]
+                capacity = int(fields.get('drm-engine-capacity-' + name, '1') or 1) or 1
+                engines[name] = int(value.split()[0]) / capacity
+            elif key.startswith('drm-resident-'):
+                resident = (resident or 0) + SystemMonitor._drm_bytes(value)
+            elif key.startswith('drm-memory-'):
+                # Older drivers report resident memory as drm-memory-<region>
+                legacy = (legacy or 0) + SystemMonitor._drm_bytes(value)
+        client = f"{fields.get('drm-pdev', '')}/{fields['drm-client-id']}"
+        return client, engines, resident if resident is not None else legacy
+
+    @staticmethod
+    def _drm_bytes(value: str) -> int:
+        parts = value.split()
+        return int(parts[0]) * {'KiB': 1024, 'MiB': 1024 ** 2, 'GiB': 1024 ** 3}.get(parts[1] if len(parts) > 1 else '', 1)
     
     @staticmethod
-    def get_system_info() -> Dict[str, Any]:
-        """Get general system information"""
-        # Get processor information
-        processor = platform.processor()
-        if not processor:
-            # Try to get processor info from /proc/device-tree/model (common on ARM systems)
+    def get_host_facts() -> Dict[str, Any]:
+        """Host facts that cannot change while the server runs, computed on first use"""
+        if SystemMonitor._host_facts is None:
+            # /proc/device-tree/model names the board on ARM systems such as the Raspberry Pi
             try:
-                with open('/proc/device-tree/model', 'r') as f:
-                    processor = f.read().strip().replace('\x00', '')
-            except (FileNotFoundError, PermissionError):
+                model = SystemMonitor._read_file(SystemMonitor._proc_path('device-tree/model')).strip().replace('\x00', '')
+            except (OSError, UnicodeDecodeError):
+                model = None
+
+            # platform.processor() forks `uname -p` on Linux
+            processor = platform.processor() or model
+            if not processor:
                 # Fallback to architecture-based naming
                 arch = platform.machine()
                 if arch == 'aarch64':
@@ -217,64 +376,103 @@ class SystemMonitor:
                     processor = 'ARMv6 Processor'
                 else:
                     processor = f'{arch} Processor'
-        
+
+            SystemMonitor._host_facts = {
+                'platform': platform.system(),
+                'platform_release': platform.release(),
+                'platform_version': platform.version(),
+                'architecture': platform.machine(),
+                'processor': processor,
+                'model': model,
+                'python_version': platform.python_version(),
+                'boot_time': psutil.boot_time(),
+                'physical_cores': psutil.cpu_count(logical=False),
+                'total_cores': psutil.cpu_count(logical=True)
+            }
+        return SystemMonitor._host_facts
+
+    @staticmethod
+    @timed('system')
+    def get_system_info() -> Dict[str, Any]:
+        """Get general system information"""
+        facts = SystemMonitor.get_host_facts()
         return {
-            'platform': platform.system(),
-            'platform_release': platform.release(),
-            'platform_version': platform.version(),
-            'architecture': platform.machine(),
-            'processor': processor,
+            'platform': facts['platform'],
+            'platform_release': facts['platform_release'],
+            'platform_version': facts['platform_version'],
+            'architecture': facts['architecture'],
+            'processor': facts['processor'],
             'hostname': platform.node(),
-            'python_version': platform.python_version(),
-            'boot_time': psutil.boot_time(),
-            'uptime': time.time() - psutil.boot_time()
+            'python_version': facts['python_version'],
+            'boot_time': facts['boot_time'],
+            'uptime': time.time() - facts['boot_time']
         }
     
     @staticmethod
+    @coalesced
     def get_gpu_info() -> Dict[str, Any]:
         """Get GPU information using various methods"""
         gpu_info = {}
-        
-        # Try nvidia-smi for NVIDIA GPUs
+        for name, backend in GPU_BACKENDS.items():
+            value = backend()
+            if value is not None:
+                gpu_info[name] = materialize(value)
+        return gpu_info
+
+    @staticmethod
+    @timed('gpu.nvidia')
+    def _get_nvidia_gpus() -> Optional[List[GpuRecord]]:
+        """Get NVIDIA GPUs from nvidia-smi"""
         try:
-            result = subprocess.run(['nvidia-smi', '--query-gpu=name,memory.total,memory.used,memory.free,temperature.gpu,utilization.gpu', '--format=csv,noheader,nounits'], 
+            result = SystemMonitor._run_command(['nvidia-smi', '--query-gpu=name,memory.total,memory.used,memory.free,temperature.gpu,utilization.gpu', '--format=csv,noheader,nounits'],
                                   capture_output=True, text=True, timeout=10)
-            if result.returncode == 0:
-                gpu_info['nvidia'] = []
-                for line in result.stdout.strip().split('\n'):
-                    if line.strip():
-                        parts = line.split(', ')
-                        if len(parts) >= 6:
-                            gpu_info['nvidia'].append({
-                                'name': parts[0],
-                                'memory_total': int(parts[1]),
-                                'memory_used': int(parts[2]),
-                                'memory_free': int(parts[3]),
-                                'temperature': int(parts[4]),
-                                'utilization': int(parts[5])
-                            })
+            if result.returncode != 0:
+                return None
         except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
-            pass
-        
+            return None
+
+        gpus = []
+        for line in result.stdout.strip().split('\n'):
+            if line.strip():
+                parts = line.split(', ')
+                if len(parts) >= 6:
+                    gpus.append(GpuRecord(
+                        name=parts[0],
+                        memory_total=int(parts[1]),
+                        memory_used=int(parts[2]),
+                        memory_free=int(parts[3]),
+                        temperature=int(parts[4]),
+                        utilization=int(parts[5]),
+                        # nvidia-smi does not provide frequency in this call
+                        frequency=None
+                    ))
+        return gpus
+
+    @staticmethod
+    @timed('gpu.amd')
+    def _get_amd_gpus() -> Optional[List[GpuRecord]]:
+        """Get AMD GPUs from rocm-smi, falling back to radeontop"""
+        gpus = None
+
         # Try rocm-smi for AMD GPUs
         try:
-            result = subprocess.run(['rocm-smi', '--showproductname', '--showmeminfo', 'vram', '--showtemp', '--showuse', '--json'], 
+            result = SystemMonitor._run_command(['rocm-smi', '--showproductname', '--showmeminfo', 'vram', '--showtemp', '--showuse', '--json'],
                                   capture_output=True, text=True, timeout=10)
             if result.returncode == 0:
-                gpu_info['amd'] = []
+                gpus = []
                 try:
                     amd_data = json.loads(result.stdout)
                     for gpu_id, gpu_data in amd_data.items():
                         if isinstance(gpu_data, dict):
-                            gpu_info['amd'].append({
-                                'id': gpu_id,
-                                'name': gpu_data.get('Card SKU', 'Unknown'),
-                                'memory_total': gpu_data.get('vram', {}).get('Total Memory (B)', 0),
-                                'memory_used': gpu_data.get('vram', {}).get('Used Memory (B)', 0),
-                                'memory_free': gpu_data.get('vram', {}).get('Free Memory (B)', 0),
-                                'temperature': gpu_data.get('Temperature (Sensor edge) (C)', 0),
-                                'utilization': gpu_data.get('GPU use (%)', 0)
-                            })
+                            gpus.append(GpuRecord(
+                                id=gpu_id,
+                                name=gpu_data.get('Card SKU', 'Unknown'),
+                                memory_total=gpu_data.get('vram', {}).get('Total Memory (B)', 0),
+                                memory_used=gpu_data.get('vram', {}).get('Used Memory (B)', 0),
+                                memory_free=gpu_data.get('vram', {}).get('Free Memory (B)', 0),
+                                temperature=gpu_data.get('Temperature (Sensor edge) (C)', 0),
+                                utilization=gpu_data.get('GPU use (%)', 0)
+                            ))
                 except json.JSONDecodeError:
                     # Fallback to parsing text output
                     lines = result.stdout.strip().split('\n')
@@ -282,7 +480,7 @@ class SystemMonitor:
                     for line in lines:
                         if 'Card SKU' in line:
                             if current_gpu:
-                                gpu_info['amd'].append(current_gpu)
+                                gpus.append(GpuRecord(**current_gpu))
                             current_gpu = {'name': line.split(':')[-1].strip()}
                         elif 'Total Memory' in line:
                             current_gpu['memory_total'] = str(int(line.split(':')[-1].strip().split()[0]))
@@ -293,219 +491,206 @@ class SystemMonitor:
                         elif 'GPU use' in line:
                             current_gpu['utilization'] = str(int(line.split(':')[-1].strip().split('%')[0]))
                     if current_gpu:
-                        gpu_info['amd'].append(current_gpu)
+                        gpus.append(GpuRecord(**current_gpu))
         except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
             pass
-        
+
         # Try radeontop for AMD GPU monitoring (alternative method)
         try:
-            result = subprocess.run(['radeontop', '-d', '-', '-l', '1'], 
+            result = SystemMonitor._run_command(['radeontop', '-d', '-', '-l', '1'],
                                   capture_output=True, text=True, timeout=5)
-            if result.returncode == 0 and not gpu_info.get('amd'):
+            if result.returncode == 0 and not gpus:
                 # Parse radeontop output
                 lines = result.stdout.strip().split('\n')
                 for line in lines:
                     if 'gpu' in line.lower() and '%' in line:
                         parts = line.split()
                         if len(parts) >= 2:
-                            gpu_info.setdefault('amd', []).append({
-                                'name': 'AMD GPU (radeontop)',
-                                'utilization': int(parts[1].replace('%', '')),
-                                'source': 'radeontop'
-                            })
+                            gpus = gpus or []
+                            gpus.append(GpuRecord(
+                                name='AMD GPU (radeontop)',
+                                utilization=int(parts[1].replace('%', '')),
+                                source='radeontop'
+                            ))
         except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
             pass
-        
-        # Try lshw for general GPU info
+
+        if gpus is not None:
+            for gpu in gpus:
+                gpu.frequency = None  # rocm-smi parsing not implemented for frequency
+        return gpus
+
+    @staticmethod
+    @timed('gpu.general')
+    def _get_lshw_gpu_info() -> Optional[Any]:
+        """Get general display hardware information from lshw"""
         try:
-            result = subprocess.run(['lshw', '-class', 'display', '-json'], 
+            result = SystemMonitor._run_command(['lshw', '-class', 'display', '-json'],
                                   capture_output=True, text=True, timeout=10)
             if result.returncode == 0:
-                gpu_info['general'] = json.loads(result.stdout)
+                return json.loads(result.stdout)
         except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError, json.JSONDecodeError):
             pass
-        
-        # Try glxinfo for OpenGL info
+        return None
+
+    @staticmethod
+    @timed('gpu.opengl')
+    def _get_opengl_info() -> Optional[str]:
+        """Get OpenGL information from glxinfo"""
         try:
-            result = subprocess.run(['glxinfo', '-B'], 
+            result = SystemMonitor._run_command(['glxinfo', '-B'],
                                   capture_output=True, text=True, timeout=10)
             if result.returncode == 0:
-                gpu_info['opengl'] = result.stdout
+                return result.stdout
         except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
             pass
-        
-        # Try vcgencmd for Raspberry Pi GPU
-        try:
-            result = subprocess.run(['vcgencmd', 'get_mem', 'gpu'], 
-                                  capture_output=True, text=True, timeout=5)
-            if result.returncode == 0:
-                gpu_memory = result.stdout.strip()
-                pi_gpu = {
-                    'available': True,
-                    'gpu_memory': gpu_memory,
-                    'type': 'VideoCore IV'
-                }
-                # Add all get_mem segments
-                for mem_type in ['reloc', 'malloc', 'total']:
-                    try:
-                        mem_result = subprocess.run(['vcgencmd', 'get_mem', mem_type], capture_output=True, text=True, timeout=2)
-                        if mem_result.returncode == 0:
-                            pi_gpu[f'{mem_type}_memory'] = mem_result.stdout.strip()
-                    except:
-                        pi_gpu[f'{mem_type}_memory'] = None
-                # Add all measure_clock outputs
-                for clk in ['core', 'v3d', 'isp', 'hevc', 'h264']:
-                    try:
-                        clk_result = subprocess.run(['vcgencmd', 'measure_clock', clk], capture_output=True, text=True, timeout=2)
-                        if clk_result.returncode == 0:
-                            val = clk_result.stdout.strip()
-                            match = re.search(r'frequency\(0\)=([0-9]+)', val)
-                            pi_gpu[f'{clk}_clock'] = int(match.group(1)) if match else val
-                    except:
-                        pi_gpu[f'{clk}_clock'] = None
-                # Add temperature
-                try:
-                    temp_result = subprocess.run(['vcgencmd', 'measure_temp'], 
-                                               capture_output=True, text=True, timeout=2)
-                    if temp_result.returncode == 0:
-                        pi_gpu['temperature'] = temp_result.stdout.strip()
-                except:
-                    pi_gpu['temperature'] = None
-                # Add throttling info
-                try:
-                    throttled_result = subprocess.run(['vcgencmd', 'get_throttled'], capture_output=True, text=True, timeout=2)
-                    if throttled_result.returncode == 0:
-                        pi_gpu['throttled'] = throttled_result.stdout.strip()
-                except:
-                    pi_gpu['throttled'] = None
-                # Add voltage info
-                try:
-                    volts_result = subprocess.run(['vcgencmd', 'measure_volts'], capture_output=True, text=True, timeout=2)
-                    if volts_result.returncode == 0:
-                        pi_gpu['voltage'] = volts_result.stdout.strip()
-                except:
-                    pi_gpu['voltage'] = None
-                # Add frequency config
-                try:
-                    freq_result = subprocess.run(['vcgencmd', 'get_config', 'int', 'gpu_freq'], 
-                                               capture_output=True, text=True, timeout=2)
-                    if freq_result.returncode == 0:
-                        freq_config = freq_result.stdout.strip()
-                        pi_gpu['frequency'] = freq_config
-                        match = re.search(r'gpu_freq=([0-9]+)', freq_config)
-                        if match:
-                            pi_gpu['gpu_freq'] = int(match.group(1))
-                        else:
-                            # Fallback: try core_freq, v3d_freq, hevc_freq
-                            core_match = re.search(r'core_freq=([0-9]+)', freq_config)
-                            v3d_match = re.search(r'v3d_freq=([0-9]+)', freq_config)
-                            hevc_match = re.search(r'hevc_freq=([0-9]+)', freq_config)
-                            if core_match:
-                                pi_gpu['gpu_freq'] = int(core_match.group(1))
-                                pi_gpu['gpu_freq_source'] = 'core_freq'
-                            elif v3d_match:
-                                pi_gpu['gpu_freq'] = int(v3d_match.group(1))
-                                pi_gpu['gpu_freq_source'] = 'v3d_freq'
-                            elif hevc_match:
-                                pi_gpu['gpu_freq'] = int(hevc_match.group(1))
-                                pi_gpu['gpu_freq_source'] = 'hevc_freq'
-                            else:
-                                pi_gpu['gpu_freq'] = None
-                                pi_gpu['gpu_freq_source'] = None
-                except:
-                    pi_gpu['frequency'] = None
-                gpu_info['raspberry_pi'] = pi_gpu
-            else:
-                gpu_info['raspberry_pi'] = {'available': False}
-        except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
-            gpu_info['raspberry_pi'] = {'available': False}
-        
+        return None
+
+    @staticmethod
+    @timed('gpu.raspberry_pi')
+    def _get_raspberry_pi_gpu() -> Dict[str, Any]:
+        """Get Raspberry Pi VideoCore information from sysfs, the firmware mailbox and vcgencmd"""
+        from src.utils.raspberry_pi import videocore
+        return videocore.collect()
+
+    @staticmethod
+    @timed('gpu.integrated')
+    def _get_integrated_gpus() -> Optional[List[Dict[str, Any]]]:
+        """Get integrated GPU usage from sysfs"""
+        gpus = []
+        busy_path = SystemMonitor._sys_path('class/drm/card0/device/gpu_busy_percent')
+
         # Check for Intel integrated GPU info
         try:
-            if os.path.exists('/sys/class/drm/card0/device/gpu_busy_percent'):
-                with open('/sys/class/drm/card0/device/gpu_busy_percent', 'r') as f:
-                    intel_gpu_usage = f.read().strip()
-                    gpu_info.setdefault('integrated', []).append({
-                        'name': 'Intel Integrated GPU',
-                        'type': 'Intel',
-                        'usage_percent': intel_gpu_usage,
-                        'source': 'sysfs'
-                    })
+            if os.path.exists(busy_path):
+                intel_gpu_usage = SystemMonitor._read_file(busy_path).strip()
+                gpus.append({
+                    'name': 'Intel Integrated GPU',
+                    'type': 'Intel',
+                    'usage_percent': intel_gpu_usage,
+                    'source': 'sysfs',
+                    'vendor': 'Intel Corporation'
+                })
         except:
             pass
-        
+
         # Check for AMD integrated GPU info
         try:
-            if os.path.exists('/sys/class/drm/card0/device/gpu_busy_percent'):
-                with open('/sys/class/drm/card0/device/gpu_busy_percent', 'r') as f:
-                    amd_gpu_usage = f.read().strip()
-                    gpu_info.setdefault('integrated', []).append({
-                        'name': 'AMD Integrated GPU',
-                        'type': 'AMD',
-                        'usage_percent': amd_gpu_usage,
-                        'source': 'sysfs'
-                    })
+            if os.path.exists(busy_path):
+                amd_gpu_usage = SystemMonitor._read_file(busy_path).strip()
+                gpus.append({
+                    'name': 'AMD Integrated GPU',
+                    'type': 'AMD',
+                    'usage_percent': amd_gpu_usage,
+                    'source': 'sysfs',
+                    'vendor': 'Advanced Micro Devices, Inc.'
+                })
         except:
             pass
-        
-        # Add frequency field for NVIDIA GPUs if possible
-        if 'nvidia' in gpu_info:
-            for gpu in gpu_info['nvidia']:
-                # Try to get frequency via nvidia-smi (not available in default query)
-                gpu['frequency'] = None  # nvidia-smi does not provide frequency in this call
-                # Optionally, run nvidia-smi -q -d CLOCK for more details (not implemented for speed)
-
-        # Add frequency field for AMD GPUs if possible
-        if 'amd' in gpu_info:
-            for gpu in gpu_info['amd']:
-                gpu['frequency'] = None  # rocm-smi parsing not implemented for frequency
-
-        # For integrated GPUs, add vendor if available
-        if 'integrated' in gpu_info:
-            for gpu in gpu_info['integrated']:
-                if 'type' in gpu and gpu['type'] == 'Intel':
-                    gpu['vendor'] = 'Intel Corporation'
-                elif 'type' in gpu and gpu['type'] == 'AMD':
-                    gpu['vendor'] = 'Advanced Micro Devices, Inc.'
-                else:
-                    gpu['vendor'] = 'Unknown'
 
-        # Comments added for clarity and maintainability
-        return gpu_info
-    
+        return gpus or None
+
+    @staticmethod
+    @timed('pressure')
+    def get_pressure_info() -> Dict[str, Any]:
+        """Get pressure stall information, run queue length and scheduler delay"""
+        from src.utils.pressure import pressure
+        return pressure.collect()
+
+    @staticmethod
+    @timed('temperatures')
+    def get_temperatures() -> Dict[str, Any]:
+        """Get CPU and hardware sensor temperatures"""
+        sensors = {}
+        if hasattr(psutil, 'sensors_temperatures'):
+            try:
+                for chip, readings in psutil.sensors_temperatures().items():
+                    sensors[chip] = [{
+                        'label': reading.label,
+                        'current': reading.current,
+                        'high': reading.high,
+                        'critical': reading.critical
+                    } for reading in readings]
+            except (OSError, AttributeError):
+                pass
+        return {
+            'cpu': SystemMonitor._get_cpu_temperature(),
+            'sensors': sensors
+        }
+
     @staticmethod
     def _get_cpu_temperature() -> Optional[float]:
         """Get CPU temperature from various sources"""
         # Try different temperature sources
         temp_sources = [
-            '/sys/class/thermal/thermal_zone0/temp',
-            '/sys/class/hwmon/hwmon0/temp1_input',
-            '/sys/class/hwmon/hwmon1/temp1_input',
-            '/proc/acpi/thermal_zone/THM0/temperature'
+            SystemMonitor._sys_path('class/thermal/thermal_zone0/temp'),
+            SystemMonitor._sys_path('class/hwmon/hwmon0/temp1_input'),
+            SystemMonitor._sys_path('class/hwmon/hwmon1/temp1_input'),
+            SystemMonitor._proc_path('acpi/thermal_zone/THM0/temperature')
         ]
         
         for source in temp_sources:
             try:
-                with open(source, 'r') as f:
-                    temp = float(f.read().strip())
-                    # Convert from millidegrees to degrees Celsius
-                    if temp > 1000:
-                        temp /= 1000
-                    return temp
+                temp = float(SystemMonitor._read_file(source).strip())
+                # Convert from millidegrees to degrees Celsius
+                if temp > 1000:
+                    temp /= 1000
+                return temp
             except (FileNotFoundError, ValueError, PermissionError):
                 continue
         
         return None
     
     @staticmethod
+    def _run_command(command: List[str], **kwargs: Any) -> subprocess.CompletedProcess:
+        """Run an external probe, counting the fork and timing it"""
+        metrics.increment('forks')
+        probe = ' '.join(command[:2]) if command[0] == 'vcgencmd' else command[0]
+        with metrics.timer('probe', probe):
+            return subprocess.run(command, **kwargs)
+
+    @staticmethod
+    def _proc_path(relative: str) -> str:
+        return os.path.join(psutil.PROCFS_PATH, relative)
+
+    @staticmethod
+    def _sys_path(relative: str) -> str:
+        return os.path.join(SystemMonitor.SYSFS_PATH, relative)
+
+    @staticmethod
+    def _read_file(path: str) -> str:
+        """Read a small procfs/sysfs file, counting the read"""
+        count_file_read(path)
+        with open(path, 'r') as f:
+            return f.read()
+
+    @staticmethod
+    def get_timestamp() -> str:
+        """Get the timestamp included in API responses"""
+        return datetime.now().isoformat()
+
+    @staticmethod
+    @coalesced
     def get_all_system_info() -> Dict[str, Any]:
-        """Get all system information in one call"""
-        return {
-            'timestamp': datetime.now().isoformat(),
-            'system': SystemMonitor.get_system_info(),
-            'cpu': SystemMonitor.get_cpu_info(),
-            'memory': SystemMonitor.get_memory_info(),
-            'disk': SystemMonitor.get_disk_info(),
-            'network': SystemMonitor.get_network_info(),
-            'gpu': SystemMonitor.get_gpu_info()
-        } 
\ No newline at end of file
+        """Get all system information in one call
+
+        Values come from the shared snapshot in multi-process mode, otherwise
+        from the collector registry, so each collector is only re-run once its
+        refresh interval has passed.
+        """
+        from src.utils.collectors import registry
+        info = {'timestamp': SystemMonitor.get_timestamp()}
+        for name in ['system', 'cpu', 'memory', 'disk', 'network', 'gpu']:
+            info[name] = shared_snapshot.get(name, lambda name=name: registry.collect_one(name))
+        return info
+
+
+# Each GPU source, in the order its key appears in get_gpu_info()
+GPU_BACKENDS = {
+    'nvidia': SystemMonitor._get_nvidia_gpus,
+    'amd': SystemMonitor._get_amd_gpus,
+    'general': SystemMonitor._get_lshw_gpu_info,
+    'opengl': SystemMonitor._get_opengl_info,
+    'raspberry_pi': SystemMonitor._get_raspberry_pi_gpu,
+    'integrated': SystemMonitor._get_integrated_gpus
+}
@@ -0,0 +1,21 @@
+import pytest
+
+from benchmarks import fixtures
+
+
+@pytest.fixture(scope='session')
+def host():
+    """A small synthetic /proc and /sys (see benchmarks/fixtures.py) that psutil and SystemMonitor read"""
+    fixture = fixtures.build_fixture(processes=20, disks=2, interfaces=2, sockets=10)
+    previous = fixtures.activate(fixture)
+    yield fixture
+    fixtures.deactivate(previous)
+    fixtures.remove_fixture(fixture)
+
+
+@pytest.fixture
+def client():
+    """Test client for an app without the sampler, alerting or snapshots"""
+    from app import create_app
+
+    return create_app(background=False).test_client()
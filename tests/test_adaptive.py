@@ -0,0 +1,96 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils.adaptive import AdaptiveScheduler, parse_duration, parse_triggers
+from src.utils.collectors import registry
+from src.utils.shared_snapshot import shared_snapshot
+
+
+def sample(cpu=10.0, memory=50.0):
+    return {'cpu': {'cpu_usage_percent': cpu}, 'memory': {'percent': memory}}
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = AdaptiveScheduler()
+    scheduler.fast_interval = 0.25
+    scheduler.max_interval = 30
+    scheduler.boost_seconds = 30
+    scheduler.cpu_budget = 100
+    scheduler.stable_samples = 2
+    scheduler.boost_collectors = ['cpu', 'top_processes']
+    scheduler.triggers = parse_triggers('cpu.cpu_usage_percent=20,memory.percent=10')
+    yield scheduler
+    scheduler._set_collector_intervals(None)
+
+
+@pytest.fixture
+def sampler():
+    return SimpleNamespace(interval=2.0, subscriber_count=0)
+
+
+def test_parsers():
+    assert parse_duration('250ms') == 0.25
+    assert parse_duration('1.5') == 1.5
+    with pytest.raises(ValueError):
+        parse_duration('soon')
+    with pytest.raises(ValueError):
+        parse_triggers('cpu.cpu_usage_percent')
+
+
+def test_jump_boosts_the_cheap_collectors_only(scheduler, sampler):
+    intervals = {name: registry.get(name).interval for name in ('cpu', 'top_processes', 'processes')}
+    scheduler.next_interval(sampler, sample(cpu=10), 0.0)
+    assert scheduler.mode == 'normal'
+    assert scheduler.next_interval(sampler, sample(cpu=40), 0.0) == 0.25
+    assert (scheduler.mode, scheduler.reason) == ('boost', 'rate_of_change')
+    assert scheduler.collectors(['cpu', 'memory']) == ['cpu', 'memory', 'top_processes']
+    assert registry.get('cpu').interval == 0.25
+    assert registry.get('top_processes').interval == 0.25
+    # The /proc scan behind top_processes is expensive and keeps its interval
+    assert registry.get('processes').interval == intervals['processes']
+
+    scheduler._boost_until = 0.0
+    assert scheduler.next_interval(sampler, sample(cpu=40), 0.0) == 2.0
+    assert scheduler.mode == 'normal' and scheduler.reason is None
+    assert {name: registry.get(name).interval for name in intervals} == intervals
+
+
+def test_alert_condition_boosts(scheduler, sampler):
+    scheduler.conditions.append(lambda: True)
+    scheduler.next_interval(sampler, sample(), 0.0)
+    assert (scheduler.mode, scheduler.reason) == ('boost', 'alert')
+
+
+def test_stable_values_back_off_while_nobody_listens(scheduler, sampler):
+    intervals = [scheduler.next_interval(sampler, sample(), 0.0) for _ in range(6)]
+    assert intervals == [2.0, 4.0, 8.0, 16.0, 30, 30]
+    assert scheduler.mode == 'idle'
+    sampler.subscriber_count = 1
+    assert scheduler.next_interval(sampler, sample(), 0.0) == 2.0
+    assert scheduler.mode == 'normal'
+
+
+def test_stream_resolution_request(scheduler, sampler):
+    token = scheduler.request_resolution(0.5)
+    assert scheduler.next_interval(sampler, sample(), 0.0) == 0.5
+    assert scheduler.mode == 'high_resolution'
+    scheduler.release(token)
+    assert scheduler.next_interval(sampler, sample(), 0.0) == 2.0
+
+
+def test_cpu_budget_stretches_the_interval(scheduler, sampler):
+    scheduler.cpu_budget = 5
+    # Half a second of CPU per sample within 5 % of a core: one sample every 10 s
+    assert scheduler.next_interval(sampler, sample(), 0.5) == pytest.approx(10.0)
+    assert scheduler.throttled
+
+
+def test_shared_snapshot_caps_the_interval_at_half_max_age(scheduler, sampler, monkeypatch, tmp_path):
+    monkeypatch.setattr(shared_snapshot, 'path', str(tmp_path / 'shared.bin'))
+    monkeypatch.setattr(shared_snapshot, 'max_age', 10.0)
+    intervals = [scheduler.next_interval(sampler, sample(), 0.0) for _ in range(5)]
+    assert intervals == [2.0, 4.0, 5.0, 5.0, 5.0]
+    scheduler.cpu_budget = 5
+    assert scheduler.next_interval(sampler, sample(), 0.5) == 5.0
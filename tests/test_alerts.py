@@ -0,0 +1,73 @@
+import pytest
+
+from src.utils.alerts import AlertEngine, Rule
+
+
+def sample(time, cpu=None, partitions=None):
+    value = {'time': time, 'timestamp': f't{time}'}
+    if cpu is not None:
+        value['cpu'] = {'cpu_usage_percent': cpu}
+    if partitions is not None:
+        value['disk'] = {'partitions': [{'mountpoint': mountpoint, 'percent': percent}
+                                        for mountpoint, percent in partitions.items()]}
+    return value
+
+
+def test_rule_parsing():
+    rule = Rule('hot: cpu.cpu_usage_percent >= 95 for 2m clear 80')
+    assert (rule.name, rule.path, rule.op, rule.threshold) == ('hot', 'cpu.cpu_usage_percent', '>=', 95.0)
+    assert rule.duration == 120
+    assert rule.clear == 80
+    assert rule.collector == 'cpu'
+
+    rule = Rule('memory.percent < 10 for 500ms')
+    assert rule.name == 'memory.percent < 10 for 500ms'
+    assert rule.duration == 0.5
+    # Default hysteresis is 5% of the threshold, on the far side of the comparison
+    assert rule.clear == pytest.approx(10.5)
+    assert Rule('gpu.count == 2').clear is None
+
+
+@pytest.mark.parametrize('text', ['cpu >', 'cpu.usage ~ 5', 'cpu..usage > 5', 'cpu.usage > 5 for ever'])
+def test_invalid_rules(text):
+    with pytest.raises(ValueError):
+        Rule(text)
+
+
+def test_path_aliases_and_selectors():
+    value = sample(0, partitions={'/': 91, '/home': 40})
+    assert list(Rule('partition[/].percent > 90').resolve(value)) == [('/', 91.0)]
+    assert list(Rule('partition[*].percent > 90').resolve(value)) == [('0', 91.0), ('1', 40.0)]
+    assert list(Rule('partition[/boot].percent > 90').resolve(value)) == []
+
+
+def test_hysteresis():
+    engine = AlertEngine()
+    engine.load_rules(['cpu.cpu_usage_percent > 90'])
+    assert [event['status'] for event in engine.evaluate(sample(0, cpu=95))] == ['firing']
+    # Below the threshold but above the 85.5 clear level: still firing
+    assert engine.evaluate(sample(1, cpu=88)) == []
+    assert engine.active()[0]['value'] == 88
+    assert [event['status'] for event in engine.evaluate(sample(2, cpu=80))] == ['resolved']
+    assert engine.active() == []
+
+
+def test_duration_keeps_rule_pending():
+    engine = AlertEngine()
+    engine.load_rules(['cpu.cpu_usage_percent > 90 for 10s'])
+    assert engine.evaluate(sample(0, cpu=95)) == []
+    assert engine.triggered()
+    assert engine.evaluate(sample(5, cpu=95)) == []
+    assert [event['status'] for event in engine.evaluate(sample(10, cpu=95))] == ['firing']
+
+
+def test_failed_collection_does_not_resolve():
+    engine = AlertEngine()
+    engine.load_rules(['partition[*].percent > 90'])
+    assert len(engine.evaluate(sample(0, partitions={'/': 95}))) == 1
+    # The disk collector failed this tick, so its key is missing from the sample
+    assert engine.evaluate(sample(1)) == []
+    assert engine.evaluate(sample(2, partitions={'/': 95})) == []
+    # The partition itself went away: that does resolve
+    events = engine.evaluate(sample(3, partitions={}))
+    assert [(event['status'], event['value']) for event in events] == [('resolved', None)]
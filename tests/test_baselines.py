@@ -0,0 +1,115 @@
+import pytest
+
+from src.utils import baselines as baselines_module
+from src.utils.baselines import MIN_WINDOW, CounterBaselines
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(baselines_module.time, 'time', clock.time)
+    monkeypatch.setattr(baselines_module.time, 'sleep', clock.sleep)
+    return clock
+
+
+@pytest.fixture
+def cpu(monkeypatch, clock):
+    """A CounterBaselines whose CPU times advance by ``busy`` of every second"""
+    state = {'busy': 0.5, 'user': 0.0, 'idle': 0.0, 'at': clock.now}
+    counters = CounterBaselines()
+    counters.cpu_fields = ('user', 'idle')
+
+    def read():
+        elapsed = clock.now - state['at']
+        state['at'] = clock.now
+        state['user'] += elapsed * state['busy']
+        state['idle'] += elapsed * (1 - state['busy'])
+        times = [state['user'], state['idle']]
+        return clock.now, list(times), [list(times)]
+
+    monkeypatch.setattr(counters, '_read_cpu', read)
+    counters.state = state
+    return counters
+
+
+def test_cold_cpu_percent(cpu, clock):
+    assert cpu.cpu_percent(None) == (0.0, [0.0])
+    clock.now += 1
+    assert cpu.cpu_percent(None) == (50.0, [50.0])
+
+
+def test_cold_cpu_percent_sleeps_the_interval(cpu, clock):
+    assert cpu.cpu_percent(0.5)[0] == 50.0
+    assert clock.now == 1000.5
+
+
+def test_back_to_back_calls_use_the_prior_baseline(cpu, clock):
+    cpu.cpu_percent(None)
+    clock.now += 1
+    cpu.cpu_percent(None)
+    version = cpu.cpu_version
+    cpu.state['busy'] = 1.0
+    clock.now += 0.01
+    # Too young to replace: measured over the 1.01 s since the prior baseline
+    assert cpu.cpu_percent(None)[0] == pytest.approx(50.5, abs=0.1)
+    assert cpu.cpu_version == version
+    clock.now += 1
+    assert cpu.cpu_percent(None)[0] == pytest.approx(100.0, abs=0.1)
+    assert cpu.cpu_version == version + 1
+
+
+def test_young_baseline_without_prior_tops_up_the_window(cpu, clock):
+    cpu.cpu_percent(None)
+    clock.now += 0.02
+    cpu.cpu_percent(1)
+    assert clock.now == pytest.approx(1000 + MIN_WINDOW)
+
+
+def test_process_rates(clock):
+    counters = CounterBaselines()
+    counters.update_processes({1: (900.0, 10.0, 0, 0)}, clock.now)
+    assert counters.has_processes()
+    rates = counters.update_processes({1: (900.0, 12.0, 1000, None), 2: (990.0, 5.0, None, None)}, clock.now + 4)
+    assert rates[1] == (50.0, 250.0, None)
+    # Unknown to the baseline: lifetime average since it started 14 s ago
+    assert rates[2][0] == pytest.approx(35.7, abs=0.1)
+
+
+def test_process_baseline_is_kept_for_min_window(clock):
+    counters = CounterBaselines()
+    counters.update_processes({1: (900.0, 0.0, None, None)}, clock.now)
+    counters.update_processes({1: (900.0, 1.0, None, None)}, clock.now + 1)
+    version = counters.processes_version
+    # 10 ms later, busy all along: measured against the prior baseline
+    rates = counters.update_processes({1: (900.0, 1.01, None, None)}, clock.now + 1.01)
+    assert rates[1][0] == pytest.approx(100.0, abs=0.1)
+    assert counters.processes_version == version
+
+
+def test_reused_pid_is_not_compared_with_the_old_process(clock):
+    counters = CounterBaselines()
+    counters.update_processes({1: (900.0, 50.0, None, None)}, clock.now)
+    rates = counters.update_processes({1: (995.0, 1.0, None, None)}, clock.now + 1)
+    # A new process (different create time): 1 s over its 6 s life, not a negative delta
+    assert rates[1][0] == 16.7
+
+
+def test_restore_only_from_the_same_boot(clock):
+    counters = CounterBaselines()
+    state = {'boot_time': counters.boot_time, 'time': clock.now, 'processes': [[1, 900.0, 10.0]]}
+    assert not counters.restore_processes(dict(state, boot_time=counters.boot_time - 100))
+    assert counters.restore_processes(state)
+    # Old three-field entries get empty I/O counters
+    assert counters.export_processes()['processes'] == [[1, 900.0, 10.0, None, None]]
+    assert not counters.restore_processes(state)
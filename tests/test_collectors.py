@@ -0,0 +1,91 @@
+import pytest
+
+from src.utils.collectors import COST_EXPENSIVE, Collector, CollectorRegistry
+from src.utils.instrumentation import metrics
+
+
+class Counter:
+    def __init__(self, value=0):
+        self.calls = 0
+        self.value = value
+
+    def __call__(self, *inputs):
+        self.calls += 1
+        return self.value + sum(inputs)
+
+
+def test_values_are_reused_until_the_interval_passes(monkeypatch):
+    registry = CollectorRegistry()
+    source = Counter(1)
+    collector = registry.register(Collector('source', source, interval=10))
+    clock = [1000.0]
+    monkeypatch.setattr('src.utils.collectors.time.time', lambda: clock[0])
+
+    assert registry.collect_one('source') == 1
+    clock[0] += 5
+    assert registry.collect_one('source') == 1
+    assert source.calls == 1
+    clock[0] += 5
+    registry.collect_one('source')
+    assert source.calls == 2
+    registry.collect_one('source', force=True)
+    assert source.calls == 3
+    assert collector.stats(clock[0])['runs'] == 3
+
+
+def test_dependents_always_recompute_from_cached_inputs():
+    registry = CollectorRegistry()
+    source = Counter(2)
+    derived = Counter(0)
+    registry.register(Collector('source', source, COST_EXPENSIVE))
+    registry.register(Collector('derived', derived, depends=['source']))
+    assert registry.collect(['derived', 'derived']) == {'derived': 2}
+    registry.collect_one('derived')
+    assert (source.calls, derived.calls) == (1, 3)
+
+
+def test_failures_keep_the_last_value():
+    registry = CollectorRegistry()
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) > 1:
+            raise OSError('gone')
+        return 'first'
+
+    collector = registry.register(Collector('flaky', flaky, interval=0))
+    assert registry.collect_one('flaky') == 'first'
+    assert registry.collect_one('flaky') == 'first'
+    assert (collector.errors, collector.last_error) == (1, 'gone')
+
+    registry.register(Collector('broken', lambda: 1 / 0))
+    with pytest.raises(ZeroDivisionError):
+        registry.collect_one('broken')
+
+
+def test_dependency_cycles_are_reported():
+    registry = CollectorRegistry()
+    registry.register(Collector('a', Counter(), depends=['b']))
+    registry.register(Collector('b', Counter(), depends=['a']))
+    with pytest.raises(ValueError, match='a -> b -> a'):
+        registry.collect_one('a')
+
+
+def test_interval_from_environment(monkeypatch):
+    monkeypatch.setenv('COLLECTOR_INTERVAL_GPU_TEST', '42')
+    assert Collector('gpu.test', Counter(), COST_EXPENSIVE).interval == 42
+    assert Collector('other', Counter(), COST_EXPENSIVE).interval == 60
+    with pytest.raises(ValueError):
+        Collector('bad', Counter(), 'free')
+
+
+def test_gpu_routes_reuse_the_registry_value(host, client):
+    forks = metrics.counters.get('forks', 0)
+    assert client.get('/api/gpu/').status_code == 200
+    first = metrics.counters.get('forks', 0) - forks
+    for path in ('/api/gpu/', '/api/gpu/nvidia', '/api/gpu/amd', '/api/gpu/general'):
+        assert client.get(path).status_code == 200
+    # The vendor tools ran (at most) once, for the first request
+    assert metrics.counters.get('forks', 0) - forks == first
+    assert client.get('/api/gpu/nvidia').get_json()['nvidia'][0]['name'] == 'NVIDIA Fake GPU 0'
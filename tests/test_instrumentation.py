@@ -0,0 +1,55 @@
+import pytest
+
+from src.utils import instrumentation
+from src.utils.collectors import registry
+from src.utils.instrumentation import Histogram, metrics
+from src.utils.system_monitor import SystemMonitor
+
+
+def collector_count(name):
+    histogram = metrics.histograms.get('collector', {}).get(name)
+    return histogram.count if histogram is not None else 0
+
+
+def test_histogram_percentiles():
+    histogram = Histogram()
+    for millis in range(1, 101):
+        histogram.record(millis / 1000)
+    assert histogram.count == 100
+    # Buckets are at most 12.5% wide
+    assert histogram.percentile(0.5) == pytest.approx(0.050, rel=0.125)
+    assert histogram.percentile(0.99) == pytest.approx(0.099, rel=0.125)
+    assert histogram.percentile(1.0) == 0.1
+    summary = histogram.summary()
+    assert (summary['min_ms'], summary['max_ms']) == (1.0, 100.0)
+
+
+def test_getters_are_timed_on_route_and_registry_paths(host):
+    before = collector_count('memory')
+    SystemMonitor.get_memory_info()
+    registry.collect(['memory'], force=True)
+    # Once per call, not twice for the registry run
+    assert collector_count('memory') == before + 2
+
+
+def test_untimed_collectors_are_timed_by_the_registry(host):
+    before = collector_count('gpu')
+    registry.collect(['gpu'])
+    assert collector_count('gpu') == before + 1
+
+
+def test_profile_requires_a_trusted_client(client, monkeypatch):
+    assert client.get('/api/health?profile=1').is_json
+    monkeypatch.setenv('PROFILE_TRUSTED_CLIENTS', '127.0.0.1')
+    response = client.get('/api/health?profile=cprofile')
+    assert response.mimetype == 'text/plain'
+    assert 'function calls' in response.get_data(as_text=True)
+
+
+def test_concurrent_profile_is_rejected(client, monkeypatch):
+    monkeypatch.setenv('PROFILE_TRUSTED_CLIENTS', '127.0.0.1')
+    with instrumentation._profile_lock:
+        response = client.get('/api/health?profile=cprofile')
+    assert response.status_code == 409
+    assert not instrumentation._profile_lock.locked()
+    assert client.get('/api/health?profile=cprofile').status_code == 200
@@ -0,0 +1,80 @@
+from src.utils.memory import MemoryCollector, parse_meminfo, parse_vmstat
+from src.utils.pressure import PressureCollector, parse_psi, parse_schedstat
+from src.utils.system_monitor import SystemMonitor
+
+PSI = '''some avg10=1.50 avg60=1.20 avg300=0.80 total=123456789
+full avg10=0.00 avg60=0.00 avg300=0.00 total=0
+'''
+
+
+def test_parse_psi():
+    psi = parse_psi(PSI)
+    assert psi['some'] == {'avg10': 1.5, 'avg60': 1.2, 'avg300': 0.8, 'total': 123456789}
+    assert isinstance(psi['some']['total'], int)
+    assert psi['full']['total'] == 0
+    # /proc/pressure/cpu had no "full" line before Linux 5.13
+    assert list(parse_psi(PSI.splitlines()[0])) == ['some']
+    assert parse_psi('') == {}
+
+
+def test_parse_schedstat():
+    text = ('version 15\ntimestamp 4295000000\n'
+            'cpu0 0 0 0 0 0 0 5000000000 120000000 40000\n'
+            'domain0 00000003 1 2 3 4 5 6 7 8 9 10\n'
+            'cpu1 0 0 0 0 0 0 7 8 9\n')
+    assert parse_schedstat(text) == [(5000000000, 120000000), (7, 8)]
+
+
+def test_parse_meminfo():
+    values = parse_meminfo('MemTotal:       16303428 kB\nHugePages_Total:       4\nHugepagesize:       2048 kB\n')
+    assert values == {'MemTotal': 16303428 * 1024, 'HugePages_Total': 4, 'Hugepagesize': 2048 * 1024}
+    # Per-node files prefix every line with the node
+    assert parse_meminfo('Node 1 MemFree:  1024 kB\nNode 1 HugePages_Free:   2\n') == {
+        'MemFree': 1024 * 1024, 'HugePages_Free': 2}
+
+
+def test_parse_vmstat():
+    assert parse_vmstat('pgfault 1000\npgmajfault 12\nbroken\n') == {'pgfault': 1000, 'pgmajfault': 12}
+
+
+def test_parse_drm_fdinfo():
+    text = '''pos:\t0
+flags:\t02100002
+drm-driver:\tamdgpu
+drm-pdev:\t0000:03:00.0
+drm-client-id:\t42
+drm-engine-gfx:\t2000000 ns
+drm-engine-capacity-gfx:\t2
+drm-engine-compute:\t500 ns
+drm-resident-vram:\t1024 KiB
+drm-resident-gtt:\t2 MiB
+'''
+    client, engines, memory = SystemMonitor._parse_drm_fdinfo(text)
+    assert client == '0000:03:00.0/42'
+    assert engines == {'gfx': 1000000.0, 'compute': 500.0}
+    assert memory == 1024 * 1024 + 2 * 1024 ** 2
+    # Older drivers only report drm-memory-<region>
+    assert SystemMonitor._parse_drm_fdinfo('drm-client-id: 1\ndrm-memory-vram: 4 KiB\n')[2] == 4096
+    # Not a DRM client
+    assert SystemMonitor._parse_drm_fdinfo('pos:\t0\nflags:\t0\n') is None
+
+
+def test_pressure_collector(host):
+    collector = PressureCollector()
+    result = collector.collect()
+    assert result['available']
+    assert result['pressure']['cpu']['some']['avg10'] == 1.5
+    # No previous collection to compute rates against
+    assert result['pressure']['io']['some']['stall_percent'] is None
+    assert result['run_queue']['runnable'] == 2
+    assert result['scheduler']['available'] and len(result['scheduler']['per_cpu']) == 4
+    # The fixture's counters do not move, so the second collection sees zero stall
+    assert collector.collect()['pressure']['memory']['some']['stall_percent'] == 0.0
+
+
+def test_memory_collector(host):
+    result = MemoryCollector().collect()
+    assert result['summary']['total'] == 4096000 * 1024
+    assert result['summary']['used'] == (4096000 - 2048000) * 1024
+    assert result['paging']['pgmajfault']['total'] == 1200
+    assert [node['node'] for node in result['numa']] == [0, 1]
@@ -0,0 +1,68 @@
+import itertools
+from types import SimpleNamespace
+
+from src.utils import raspberry_pi
+from src.utils.raspberry_pi import (DETECT_RETRY_SECONDS, MAILBOX_SUCCESS, TAG_GET_THROTTLED, TAG_GET_VOLTAGE,
+                                    VideoCoreCollector, decode_throttled)
+
+
+def test_decode_throttled():
+    flags = decode_throttled(0x50005)
+    assert {name for name, value in flags.items() if value} == {
+        'under_voltage', 'currently_throttled', 'under_voltage_occurred', 'throttling_occurred'}
+    assert not any(decode_throttled(0).values())
+
+
+def test_mailbox_packs_tags_into_one_buffer(monkeypatch):
+    sent = []
+
+    def ioctl(fd, request, buffer, mutate):
+        sent.append(list(buffer))
+        buffer[1] = MAILBOX_SUCCESS
+        # Answer the voltage tag only; the throttled tag keeps its request code
+        buffer[4] |= MAILBOX_SUCCESS
+        buffer[6] = 1_200_000
+
+    monkeypatch.setattr(raspberry_pi, 'fcntl', SimpleNamespace(ioctl=ioctl))
+    monkeypatch.setattr(raspberry_pi.os, 'open', lambda path, flags: 99)
+    collector = VideoCoreCollector()
+    response = collector._mailbox([(TAG_GET_VOLTAGE, [1, 0]), (TAG_GET_THROTTLED, [0])])
+    assert sent == [[48, 0, TAG_GET_VOLTAGE, 8, 0, 1, 0, TAG_GET_THROTTLED, 4, 0, 0, 0]]
+    assert response == [[1, 1_200_000], None]
+    # The device stays open for the next call
+    collector._mailbox([(TAG_GET_THROTTLED, [0])])
+    assert collector._mailbox_fd == 99 and len(sent) == 2
+
+
+def test_failed_mailbox_call_returns_none(monkeypatch):
+    monkeypatch.setattr(raspberry_pi, 'fcntl', SimpleNamespace(ioctl=lambda *args: None))
+    monkeypatch.setattr(raspberry_pi.os, 'open', lambda path, flags: 99)
+    assert VideoCoreCollector()._mailbox([(TAG_GET_THROTTLED, [0])]) is None
+
+
+def test_free_heap_is_read_on_every_call(monkeypatch):
+    collector = VideoCoreCollector()
+    calls = itertools.count()
+    monkeypatch.setattr(collector, '_detect', lambda: True)
+    monkeypatch.setattr(collector, '_read_static', lambda: {'available': True, 'total_memory': '1024M'})
+    monkeypatch.setattr(collector, '_mailbox', lambda tags: None)
+    monkeypatch.setattr(collector, '_vcgencmd', lambda *args: f'{args[-1]}={next(calls)}M')
+    first, second = collector.collect(), collector.collect()
+    assert first['reloc_memory'] != second['reloc_memory']
+    assert first['malloc_memory'] != second['malloc_memory']
+    assert second['total_memory'] == '1024M'
+
+
+def test_unavailable_host_is_probed_again_after_the_backoff(monkeypatch):
+    collector = VideoCoreCollector()
+    clock = [100.0]
+    probes = []
+    monkeypatch.setattr(raspberry_pi.time, 'monotonic', lambda: clock[0])
+    monkeypatch.setattr(collector, '_detect', lambda: probes.append(clock[0]) or False)
+    assert collector.collect() == {'available': False}
+    clock[0] += DETECT_RETRY_SECONDS / 2
+    collector.collect()
+    assert probes == [100.0]
+    clock[0] += DETECT_RETRY_SECONDS
+    collector.collect()
+    assert len(probes) == 2
@@ -0,0 +1,91 @@
+import math
+
+import pytest
+
+from src.utils import rate_limit
+from src.utils.rate_limit import RateLimiter, TokenBucket, cost, parse_budgets, rate_limiter
+
+
+def make_limiter(client='', shared='', keys=()):
+    limiter = RateLimiter()
+    limiter.client_budgets = parse_budgets(client)
+    limiter.global_budgets = parse_budgets(shared)
+    limiter.keys = set(keys)
+    return limiter
+
+
+def test_parse_budgets():
+    assert parse_budgets('expensive=0.5/5, moderate=5') == {'expensive': (0.5, 5.0), 'moderate': (5.0, 5.0)}
+    # Without a burst the bucket holds one second's worth, at least one request
+    assert parse_budgets('cheap=0.2') == {'cheap': (0.2, 1.0)}
+    with pytest.raises(ValueError):
+        parse_budgets('costly=1')
+    with pytest.raises(ValueError):
+        cost('costly')
+
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(2.0, 2.0, now=0.0)
+    assert bucket.take(0.0) == 0.0
+    assert bucket.take(0.0) == 0.0
+    assert bucket.take(0.0) == pytest.approx(0.5)
+    assert bucket.take(0.25) == pytest.approx(0.25)
+    assert bucket.take(0.5) == 0.0
+    # Never more than the burst, however long it sat idle
+    bucket.take(100.0)
+    assert bucket.tokens == pytest.approx(1.0)
+
+
+def test_empty_bucket_without_rate_waits_forever():
+    bucket = TokenBucket(0.0, 1.0, now=0.0)
+    bucket.take(0.0)
+    assert bucket.take(10.0) == math.inf
+
+
+def test_cost_classes_have_separate_budgets():
+    limiter = make_limiter('expensive=0.001/1')
+    assert limiter.acquire('a', 'expensive') == 0.0
+    assert limiter.acquire('a', 'expensive') > 0
+    # Other classes and other clients are not charged
+    assert limiter.acquire('a', 'cheap') == 0.0
+    assert limiter.acquire('b', 'expensive') == 0.0
+
+
+def test_global_budget_caps_all_clients_and_refunds_rejections():
+    limiter = make_limiter('moderate=0.001/2', 'moderate=0.001/1')
+    assert limiter.acquire('a', 'moderate') == 0.0
+    assert limiter.acquire('b', 'moderate') > 0
+    # The rejected request got its per-client token back
+    assert limiter._buckets[('b', 'moderate')].tokens == pytest.approx(2.0, abs=0.01)
+
+
+def test_only_configured_api_keys_get_their_own_bucket():
+    limiter = make_limiter(keys=['secret'])
+    assert limiter.client_key('secret', '10.0.0.1') == 'key:secret'
+    assert limiter.client_key('invented', '10.0.0.1') == '10.0.0.1'
+    assert limiter.client_key(None, None) == 'unknown'
+
+
+def test_least_recently_used_buckets_are_dropped(monkeypatch):
+    monkeypatch.setattr(rate_limit, 'MAX_BUCKETS', 2)
+    limiter = make_limiter('cheap=1/1')
+    for client in ('a', 'b'):
+        limiter.acquire(client, 'cheap')
+    limiter.acquire('a', 'cheap')
+    limiter.acquire('c', 'cheap')
+    assert [client for client, _ in limiter._buckets] == ['a', 'c']
+
+
+def test_over_budget_request_gets_429(host, monkeypatch):
+    from app import create_app
+
+    monkeypatch.setattr(rate_limiter, 'client_budgets', parse_budgets('expensive=0.001/1'))
+    monkeypatch.setattr(rate_limiter, '_buckets', type(rate_limiter._buckets)())
+    client = create_app(background=False).test_client()
+    assert client.get('/api/system/').status_code == 200
+    response = client.get('/api/system/')
+    assert response.status_code == 429
+    assert response.get_json()['cost_class'] == 'expensive'
+    assert int(response.headers['Retry-After']) >= 1
+    # Cheap routes are not limited by the expensive budget
+    assert client.get('/api/collectors/').status_code == 200
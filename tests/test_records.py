@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from src.utils.records import GpuRecord, InterfaceRecord, PartitionRecord, ProcessRecord, json_default, materialize
+
+
+def make_process(pid=1, name='python', **fields):
+    return ProcessRecord(pid, name, 'root', 'running', 1000.0, 2048, 4096, 1.5, 12.5, 4, **fields)
+
+
+def test_process_record_round_trip():
+    record = make_process(read_rate=10.0, write_rate=0.0, num_fds=7)
+    data = record.to_dict()
+    assert data['memory_info'] == {'rss': 2048, 'vms': 4096, 'percent': 1.5}
+    assert data['cpu_info'] == {'percent': 12.5, 'num_threads': 4}
+    assert data['io'] == {'read_bytes_per_sec': 10.0, 'write_bytes_per_sec': 0.0}
+    # No GPU fields: gpu is null rather than a dict of nulls
+    assert data['gpu'] is None
+    assert ProcessRecord.from_dict(data).to_dict() == data
+    with_gpu = make_process(gpu_memory=512, gpu_utilization=None).to_dict()
+    assert with_gpu['gpu'] == {'memory_used': 512, 'utilization': None}
+
+
+def test_repeated_strings_are_interned():
+    first, second = make_process(1, ''.join(['ba', 'sh'])), make_process(2, ''.join(['b', 'ash']))
+    assert first.name is second.name
+    assert first.username is second.username
+
+
+def test_gpu_record_reports_only_the_fields_it_was_given():
+    assert GpuRecord(id=0, name='GPU', utilization=None).to_dict() == {'id': 0, 'name': 'GPU', 'utilization': None}
+    with pytest.raises(TypeError):
+        GpuRecord(id=0, fan_speed=50)
+
+
+def test_materialize_nested_records():
+    interface = InterfaceRecord('eth0', ((2, '10.0.0.2', '255.0.0.0', None, None),), None)
+    value = {
+        'partitions': (PartitionRecord('/dev/sda1', '/', 'ext4', 100, 40, 60, 40.0),),
+        'interfaces': {'eth0': interface},
+        'count': 1
+    }
+    assert materialize(value) == {
+        'partitions': [{'mountpoint': '/', 'filesystem': 'ext4', 'total': 100, 'used': 40, 'free': 60, 'percent': 40.0}],
+        'interfaces': {'eth0': {
+            'addresses': [{'family': 2, 'address': '10.0.0.2', 'netmask': '255.0.0.0', 'broadcast': None, 'ptp': None}],
+            'stats': {}
+        }},
+        'count': 1
+    }
+    assert json.loads(json.dumps(value, default=json_default)) == materialize(value)
+    with pytest.raises(TypeError):
+        json.dumps({'value': object()}, default=json_default)
+
+
+def test_routes_return_plain_dicts(host, client):
+    response = client.get('/api/processes/top?limit=3&by=memory')
+    assert response.status_code == 200
+    processes = response.get_json()['processes']
+    assert len(processes) == 3
+    assert {'pid', 'name', 'memory_info', 'cpu_info', 'io'} <= set(processes[0])
+    partitions = client.get('/api/storage/partitions').get_json()['partitions']
+    assert set(partitions['/dev/fakedisk0']) == {'mountpoint', 'filesystem', 'total', 'used', 'free', 'percent'}
+    addresses = client.get('/api/network/interfaces').get_json()['interfaces']['eth0']['addresses']
+    assert {'address': '192.0.2.2', 'broadcast': '192.0.2.255', 'family': '2',
+            'netmask': '255.255.255.0', 'ptp': None} in addresses
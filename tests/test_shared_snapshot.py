@@ -0,0 +1,107 @@
+import time
+
+import pytest
+
+from src.utils import shared_snapshot as shared_module
+from src.utils.collectors import Collector, registry
+from src.utils.instrumentation import metrics
+from src.utils.shared_snapshot import HEADER_SIZE, SEQUENCE, SEQUENCE_OFFSET, SharedSnapshot
+
+
+@pytest.fixture
+def pair(tmp_path):
+    """A writer and a reader mapping the same file"""
+    path = str(tmp_path / 'snapshot')
+    writer, reader = SharedSnapshot(), SharedSnapshot()
+    for snapshot in (writer, reader):
+        snapshot.path = path
+        snapshot.size = 64 * 1024
+        snapshot.collectors = []
+    writer._open()
+    yield writer, reader
+    for snapshot in (writer, reader):
+        if snapshot._map is not None:
+            snapshot._map.close()
+
+
+def test_round_trip(pair):
+    writer, reader = pair
+    assert reader.read_sample() is None
+    writer.publish({'timestamp': 'now', 'time': 1.0, 'cpu': {'cpu_usage_percent': 12.5}, 'memory': {'percent': 40}})
+    sample = reader.read_sample()
+    assert sample['cpu'] == {'cpu_usage_percent': 12.5}
+    assert sample['memory'] == {'percent': 40}
+    assert sample['sequence'] == 2
+
+    writer.publish({'timestamp': 'later', 'time': 2.0, 'cpu': {'cpu_usage_percent': 50}})
+    sample = reader.read_sample()
+    assert (sample['sequence'], sample['cpu'], 'memory' in sample) == (4, {'cpu_usage_percent': 50}, False)
+
+
+def test_torn_read_is_retried(pair, monkeypatch):
+    writer, reader = pair
+    writer.publish({'timestamp': 'now', 'time': 1.0, 'cpu': {'cpu_usage_percent': 1}})
+    writer.publish({'timestamp': 'now', 'time': 2.0, 'cpu': {'cpu_usage_percent': 2}})
+
+    class ScriptedSequence:
+        """The sequence a reader sees: moves on while the first copy is taken"""
+
+        def __init__(self, values):
+            self.values = list(values)
+
+        def unpack_from(self, buffer, offset):
+            if self.values:
+                return (self.values.pop(0),)
+            return SEQUENCE.unpack_from(buffer, offset)
+
+    # Before the copy sequence 2, after it 4: the copy may be torn and is retaken
+    monkeypatch.setattr(shared_module, 'SEQUENCE', ScriptedSequence([2, 4]))
+    sample = reader.read_sample()
+    assert (sample['sequence'], sample['cpu']) == (4, {'cpu_usage_percent': 2})
+
+
+def test_writer_mid_write_keeps_the_previous_sample(pair):
+    writer, reader = pair
+    writer.publish({'timestamp': 'now', 'time': 1.0, 'cpu': {'cpu_usage_percent': 1}})
+    assert reader.read_sample()['sequence'] == 2
+    # A writer that died (or is still writing) leaves the sequence odd
+    SEQUENCE.pack_into(writer._map, SEQUENCE_OFFSET, 3)
+    retries = metrics.snapshot()['counters'].get('shared_snapshot_retries', 0)
+    assert reader.read_sample()['sequence'] == 2
+    assert metrics.snapshot()['counters']['shared_snapshot_retries'] == retries + 1
+
+
+def test_corrupt_payload_is_rejected(pair):
+    writer, reader = pair
+    writer.publish({'timestamp': 'now', 'time': 1.0, 'cpu': {'cpu_usage_percent': 1}})
+    writer._map[HEADER_SIZE + 8] ^= 0xFF
+    assert reader.read_sample() is None
+
+
+def test_shared_only_collectors_are_published_beside_the_sample(pair, monkeypatch):
+    writer, reader = pair
+    monkeypatch.setitem(registry._collectors, 'test.listing', Collector('test.listing', lambda: [1, 2, 3]))
+    for snapshot in (writer, reader):
+        snapshot.collectors = ['test.listing']
+    sample = {'timestamp': 'now', 'time': time.time(), 'cpu': {'cpu_usage_percent': 1}}
+    writer.publish(sample)
+    # The sample itself (history, stream, persisted ring) does not grow
+    assert 'test.listing' not in sample
+    assert 'test.listing' not in reader.read_sample()
+    assert reader.get('test.listing', lambda: None, convert=tuple) == (1, 2, 3)
+    assert reader.read_sample(['test.listing'])['test.listing'] == [1, 2, 3]
+
+
+def test_fallback_runs_without_the_lock(pair):
+    writer, reader = pair
+
+    def compute():
+        # Another request (or the mirror) must be able to take the lock meanwhile
+        assert reader._lock.acquire(blocking=False)
+        reader._lock.release()
+        return 'local'
+
+    assert reader.get('cpu', compute) == 'local'
+    writer.publish({'timestamp': 'old', 'time': 1.0, 'cpu': {'cpu_usage_percent': 1}})
+    # Published, but older than max_age
+    assert reader.get('cpu', compute) == 'local'
@@ -0,0 +1,83 @@
+import threading
+import time
+
+import pytest
+
+from src.utils.instrumentation import metrics
+from src.utils.single_flight import SingleFlight, coalesced
+
+
+def run_concurrently(count, target):
+    results = [None] * count
+
+    def worker(index):
+        try:
+            results[index] = target()
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def collect():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {'value': len(calls)}
+
+    coalesced_before = metrics.counters.get('coalesced_calls', 0)
+    leader, results = run_concurrently(1, lambda: flight.do('key', collect))
+    started.wait(5)
+    followers, follower_results = run_concurrently(3, lambda: flight.do('key', collect))
+    # Followers count themselves before waiting for the leader
+    deadline = time.monotonic() + 5
+    while metrics.counters.get('coalesced_calls', 0) < coalesced_before + 3 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in leader + followers:
+        thread.join(5)
+    assert len(calls) == 1
+    assert all(result is results[0] for result in follower_results)
+    # Nothing is cached: the next call runs again
+    assert flight.do('key', collect) == {'value': 2}
+
+
+def test_error_reaches_every_waiter():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise RuntimeError('collection failed')
+
+    threads, results = run_concurrently(3, lambda: flight.do('key', fail))
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight._calls == {}
+
+
+def test_coalesced_keys_on_arguments():
+    calls = []
+
+    @coalesced
+    def square(value, scale=1):
+        """Docstring kept"""
+        calls.append(value)
+        return value * value * scale
+
+    assert square(3) == 9
+    assert square(3, scale=2) == 18
+    assert calls == [3, 3]
+    assert square.__doc__ == 'Docstring kept'
+    with pytest.raises(TypeError):
+        square()
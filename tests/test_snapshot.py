@@ -0,0 +1,81 @@
+from src.utils.snapshot import CPU_BASELINE_SIZE, FILE_HEADER_SIZE, SLOT_HEADER, SnapshotStore
+
+
+def make_store(directory, slots=4, slot_size=1024, baseline_size=4096):
+    store = SnapshotStore()
+    store.directory = str(directory)
+    store.slots = slots
+    store.slot_size = slot_size
+    store.baseline_size = baseline_size
+    return store
+
+
+def write_samples(directory, count, **geometry):
+    store = make_store(directory, **geometry)
+    store.open()
+    for index in range(count):
+        store._append_sample({'time': index, 'cpu': {'cpu_usage_percent': index}})
+    store._write_baseline('processes', 2 * CPU_BASELINE_SIZE, store.baseline_size, {'time': 1, 'processes': [[1, 2.0, 3.0]]})
+    store._write_baseline('processes', 2 * CPU_BASELINE_SIZE, store.baseline_size, {'time': 2, 'processes': [[1, 2.0, 4.0]]})
+    store.close()
+    return store
+
+
+def test_round_trip_keeps_the_newest_samples_in_order(tmp_path):
+    write_samples(tmp_path, 6)
+    samples, cpu, processes = make_store(tmp_path).open()
+    assert [sample['time'] for sample in samples] == [2, 3, 4, 5]
+    assert cpu is None
+    assert processes == {'time': 2, 'processes': [[1, 2.0, 4.0]]}
+
+
+def test_corrupt_slot_is_skipped(tmp_path):
+    store = write_samples(tmp_path, 4)
+    # Flip one payload byte of the slot holding sequence 2 (time 1)
+    offset = store._history_offset() + 2 * store.slot_size + SLOT_HEADER.size
+    with open(store.path, 'r+b') as f:
+        f.seek(offset)
+        byte = f.read(1)
+        f.seek(offset)
+        f.write(bytes([byte[0] ^ 0xFF]))
+    samples, _, _ = make_store(tmp_path).open()
+    assert [sample['time'] for sample in samples] == [0, 2, 3]
+
+
+def test_torn_baseline_falls_back_to_the_other_slot(tmp_path):
+    store = write_samples(tmp_path, 1)
+    # Sequence 2 went to slot 0 of the process baseline region; tear its payload
+    offset = FILE_HEADER_SIZE + 2 * CPU_BASELINE_SIZE + SLOT_HEADER.size
+    with open(store.path, 'r+b') as f:
+        f.seek(offset)
+        f.write(b'\x00' * 8)
+    _, _, processes = make_store(tmp_path).open()
+    assert processes['time'] == 1
+
+
+def test_changed_geometry_carries_samples_over(tmp_path):
+    write_samples(tmp_path, 4)
+    samples, _, _ = make_store(tmp_path, slots=2).open()
+    assert [sample['time'] for sample in samples] == [2, 3]
+    assert not (tmp_path / 'snapshot.bin.old').exists()
+
+
+def test_only_the_lock_holder_writes(tmp_path):
+    write_samples(tmp_path, 4)
+    writer = make_store(tmp_path)
+    writer.open()
+    assert writer.writer
+    before = (tmp_path / 'snapshot.bin').read_bytes()
+    reader = make_store(tmp_path, slots=2)
+    samples, _, processes = reader.open()
+    assert not reader.writer
+    assert [sample['time'] for sample in samples] == [2, 3]
+    assert processes['time'] == 2
+    reader.record({'time': 9})
+    # A different geometry does not make the reader replace the file
+    assert (tmp_path / 'snapshot.bin').read_bytes() == before
+    writer.close()
+    successor = make_store(tmp_path)
+    successor.open()
+    assert successor.writer
+    successor.close()